@@ -0,0 +1,133 @@
+"""
+Benchmark for GTest XML result parsing in the Tizen VTS harness.
+
+Generates synthetic GTest XML files with a configurable number of testcases and
+compares the tree-based parser the harness used to have (ET.parse plus a fully
+materialized dict) with the streaming parsers built on iter_gtest_xml().
+
+Each measurement runs in a fresh process so that the reported peak RSS belongs to
+that parser alone. Peak RSS is read with the 'resource' module (Linux/macOS only).
+
+Usage:
+    python3 benchmarks/bench_gtest_xml.py                 # 100k and 1M testcases
+    python3 benchmarks/bench_gtest_xml.py --cases 10000   # custom size(s)
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "harness"))
+import vts_harness # noqa: E402
+
+
+def generate_gtest_xml(path, num_cases, cases_per_suite=1000, failure_every=50, failure_text_size=512):
+    """
+    Writes a synthetic GTest XML file with num_cases testcases, spread over suites of
+    cases_per_suite testcases. Every failure_every-th testcase fails with a failure
+    message of failure_text_size bytes.
+    """
+    failure_text = ("Expected equality of these values:\n  actual\n  expected\n" * (failure_text_size // 48 + 1))[:failure_text_size]
+    num_suites = (num_cases + cases_per_suite - 1) // cases_per_suite
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<testsuites tests="{num_cases}" name="AllTests">\n')
+        case_index = 0
+        for suite_index in range(num_suites):
+            suite_cases = min(cases_per_suite, num_cases - case_index)
+            suite_failures = sum(1 for i in range(case_index, case_index + suite_cases) if i % failure_every == 0)
+            f.write(f'  <testsuite name="Suite{suite_index}" tests="{suite_cases}" failures="{suite_failures}" '
+                    f'disabled="0" errors="0" time="{suite_cases * 0.001:.3f}">\n')
+            for _ in range(suite_cases):
+                f.write(f'    <testcase name="Case{case_index}" status="run" result="completed" time="0.001" classname="Suite{suite_index}"')
+                if case_index % failure_every == 0:
+                    f.write(f'>\n      <failure message="Value mismatch" type=""><![CDATA[{failure_text}]]></failure>\n    </testcase>\n')
+                else:
+                    f.write(' />\n')
+                case_index += 1
+            f.write('  </testsuite>\n')
+        f.write('</testsuites>\n')
+
+
+def tree_parse_gtest_xml(xml_file_path):
+    """
+    The tree-based approach the harness used before streaming: the whole document is
+    built with ET.parse and every testcase is kept in a dict.
+    """
+    root = ET.parse(xml_file_path).getroot()
+    suites = root.findall("testsuite") or ([root] if root.tag == "testsuite" else [])
+    parsed = {"testsuites": []}
+    for suite in suites:
+        suite_data = dict(suite.attrib, testcases=[])
+        for case in suite.findall("testcase"):
+            failure = case.find("failure")
+            suite_data["testcases"].append({
+                "name": case.get("name"),
+                "status": case.get("status"),
+                "time": case.get("time"),
+                "failure": {"message": (failure.text or failure.get("message", "")).strip()} if failure is not None else None,
+            })
+        parsed["testsuites"].append(suite_data)
+    return parsed
+
+
+def _count_streamed_testcases(xml_file_path):
+    return sum(1 for record_type, _ in vts_harness.iter_gtest_xml(xml_file_path) if record_type == "testcase")
+
+
+PARSERS = {
+    "tree (ET.parse)": tree_parse_gtest_xml,
+    "parse_gtest_xml": vts_harness.parse_gtest_xml,
+    "summarize_gtest_xml": vts_harness.summarize_gtest_xml,
+    "iter_gtest_xml": _count_streamed_testcases,
+}
+
+
+def _measure(parser_name, xml_file_path, result_queue):
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    PARSERS[parser_name](xml_file_path)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    result_queue.put((elapsed, (peak_rss - baseline_rss) * scale))
+
+
+def measure(parser_name, xml_file_path):
+    """Runs one parser on one file in a fresh process; returns (seconds, peak RSS growth in bytes)."""
+    context = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+    result_queue = context.Queue()
+    process = context.Process(target=_measure, args=(parser_name, xml_file_path, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GTest XML parsing in the Tizen VTS harness.")
+    parser.add_argument("--cases", type=int, nargs="+", default=[100000, 1000000],
+                        help="Number(s) of testcases in the synthetic XML files (default: 100000 1000000).")
+    parser.add_argument("--parsers", nargs="+", choices=sorted(PARSERS), default=list(PARSERS),
+                        help="Parsers to benchmark (default: all).")
+    args = parser.parse_args()
+
+    print(f"{'cases':>10}  {'file MB':>8}  {'parser':<22}  {'time (s)':>9}  {'peak RSS MB':>11}")
+    with tempfile.TemporaryDirectory(prefix="vts_bench_xml_") as tmp_dir:
+        for num_cases in args.cases:
+            xml_file_path = os.path.join(tmp_dir, f"synthetic_{num_cases}_results.xml")
+            generate_gtest_xml(xml_file_path, num_cases)
+            file_mb = os.path.getsize(xml_file_path) / (1024 * 1024)
+            for parser_name in args.parsers:
+                elapsed, peak_rss = measure(parser_name, xml_file_path)
+                print(f"{num_cases:>10}  {file_mb:>8.1f}  {parser_name:<22}  {elapsed:>9.2f}  {peak_rss / (1024 * 1024):>11.1f}")
+            os.remove(xml_file_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Throughput benchmarks for the Tizen VTS harness, run against the fake SDB in
+benchmarks/fake_sdb.py instead of real devices.
+
+Benchmarks:
+    run_test_cold   'run_test' end to end on fresh fake devices (every executable pushed)
+    run_test_warm   the same run again (push cache hits, results overwritten)
+    parse           parse_gtest_xml on one large synthetic XML file
+    report          generate_html_report streamed from the same file
+    startup         'tizen_vts_cli.py --help' (interpreter start, imports, argument parsing)
+    list_tests      'list_tests' of the run_test executables, with a warm discovery cache
+
+Each benchmark runs in a fresh process, and its wall time and peak RSS (for
+run_test, that of the largest process: the harness or one of its SDB calls) are
+appended to a JSON Lines results file. startup and list_tests report the median
+of --startup-runs invocations. Every result is compared with the last
+recorded result of the same benchmark and configuration; a result slower or
+larger than that by more than --tolerance is reported as a regression, and the
+script then exits with status 1.
+
+Usage:
+    python3 benchmarks/bench_harness.py
+    python3 benchmarks/bench_harness.py --executables 50 --devices 4 --bandwidth 10e6 --shell-latency 0.02
+    python3 benchmarks/bench_harness.py --benchmarks parse report --xml-cases 1000000
+    python3 benchmarks/bench_harness.py --benchmarks startup list_tests --startup-runs 50
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+HARNESS_CLI = os.path.join(BENCHMARKS_DIR, "..", "harness", "tizen_vts_cli.py")
+FAKE_SDB = os.path.join(BENCHMARKS_DIR, "fake_sdb.py")
+DEFAULT_RESULTS_FILE = os.path.join(BENCHMARKS_DIR, "bench_results.jsonl")
+
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "harness"))
+import fake_sdb # noqa: E402
+import vts_harness # noqa: E402
+from bench_gtest_xml import generate_gtest_xml # noqa: E402
+
+BENCHMARKS = ("run_test_cold", "run_test_warm", "parse", "report", "startup", "list_tests")
+
+
+def _peak_rss_bytes(who):
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return resource.getrusage(who).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def _run_harness(work_dir, config, result_queue):
+    env = dict(os.environ,
+               FAKE_SDB_ROOT=os.path.join(work_dir, "devices"),
+               FAKE_SDB_DEVICES=str(config["devices"]),
+               FAKE_SDB_BANDWIDTH=str(config["bandwidth"]),
+               FAKE_SDB_SHELL_LATENCY=str(config["shell_latency"]),
+               FAKE_GTEST_CASES=str(config["cases"]),
+               FAKE_GTEST_RUNTIME=str(config["runtime"]),
+               FAKE_GTEST_FAILURE_EVERY=str(config["failure_every"]))
+    cmd = [sys.executable, HARNESS_CLI, "--sdb-path", FAKE_SDB, "--test-dir", os.path.join(work_dir, "bin"),
+           "--host-results-dir", os.path.join(work_dir, "results"), "run_test", "*", "--devices", "all",
+           *config["harness_args"]]
+    start = time.perf_counter()
+    completed = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        result_queue.put(RuntimeError(f"run_test failed with exit code {completed.returncode}:\n{completed.stderr}"))
+        return
+    # The harness is the only child waited for in this process.
+    result_queue.put((elapsed, _peak_rss_bytes(resource.RUSAGE_CHILDREN)))
+
+
+def _startup(cli_args, runs, result_queue):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, HARNESS_CLI, *cli_args], stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.PIPE, text=True, check=False)
+        timings.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            result_queue.put(RuntimeError(f"{' '.join(cli_args)} failed with exit code {completed.returncode}:\n"
+                                          f"{completed.stderr}"))
+            return
+    result_queue.put((statistics.median(timings), _peak_rss_bytes(resource.RUSAGE_CHILDREN)))
+
+
+def _parse(xml_file_path, result_queue):
+    baseline_rss = _peak_rss_bytes(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    vts_harness.parse_gtest_xml(xml_file_path)
+    result_queue.put((time.perf_counter() - start, _peak_rss_bytes(resource.RUSAGE_SELF) - baseline_rss))
+
+
+def _report(xml_file_path, result_queue):
+    baseline_rss = _peak_rss_bytes(resource.RUSAGE_SELF)
+    with tempfile.TemporaryDirectory(prefix="vts_bench_report_") as report_dir:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            vts_harness.generate_html_report(vts_harness.iter_gtest_xml(xml_file_path),
+                                               os.path.join(report_dir, "report.html"))
+        elapsed = time.perf_counter() - start
+    result_queue.put((elapsed, _peak_rss_bytes(resource.RUSAGE_SELF) - baseline_rss))
+
+
+def measure(target, *target_args):
+    """Runs target(*target_args, result_queue) in a fresh process; returns (seconds, peak RSS bytes)."""
+    context = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+    result_queue = context.Queue()
+    process = context.Process(target=target, args=(*target_args, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def load_previous_results(results_file):
+    """Returns the last recorded result per (benchmark, configuration) key."""
+    previous = {}
+    try:
+        with open(results_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    previous[(record["benchmark"], json.dumps(record["config"], sort_keys=True))] = record
+                except (ValueError, KeyError):
+                    continue
+    except FileNotFoundError:
+        pass
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Tizen VTS harness against a fake SDB.")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS),
+                        help="Benchmarks to run (default: all).")
+    parser.add_argument("--executables", type=int, default=20, help="Fake test executables per run (default: 20).")
+    parser.add_argument("--binary-size", type=int, default=2 * 1024 * 1024,
+                        help="Size of each fake test executable in bytes (default: 2 MiB).")
+    parser.add_argument("--cases", type=int, default=200, help="Testcases per fake executable (default: 200).")
+    parser.add_argument("--runtime", type=float, default=0.2,
+                        help="Seconds one fake executable takes to run (default: 0.2).")
+    parser.add_argument("--failure-every", type=int, default=50,
+                        help="Every N-th fake testcase fails; 0 for none (default: 50).")
+    parser.add_argument("--devices", type=int, default=2, help="Number of fake devices (default: 2).")
+    parser.add_argument("--bandwidth", type=float, default=40e6,
+                        help="Fake push/pull bandwidth in bytes per second; 0 for unlimited (default: 40e6).")
+    parser.add_argument("--shell-latency", type=float, default=0.01,
+                        help="Fake latency per SDB call and shell command in seconds (default: 0.01).")
+    parser.add_argument("--harness-args", nargs=argparse.REMAINDER, default=[],
+                        help="Further 'run_test' options, e.g. --harness-args --bundle --no-pipeline.")
+    parser.add_argument("--xml-cases", type=int, default=200000,
+                        help="Testcases in the XML file used by 'parse' and 'report' (default: 200000).")
+    parser.add_argument("--startup-runs", type=int, default=20,
+                        help="Invocations timed by 'startup' and 'list_tests'; the median is reported (default: 20).")
+    parser.add_argument("--results-file", default=DEFAULT_RESULTS_FILE,
+                        help=f"JSON Lines file the results are appended to (default: {DEFAULT_RESULTS_FILE}).")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative slowdown or RSS growth reported as a regression (default: 0.2).")
+    args = parser.parse_args()
+
+    run_config = {key: getattr(args, key) for key in ("executables", "binary_size", "cases", "runtime", "failure_every",
+                                                      "devices", "bandwidth", "shell_latency", "harness_args")}
+    xml_config = {"xml_cases": args.xml_cases}
+    startup_config = {"startup_runs": args.startup_runs, "executables": args.executables}
+    previous_results = load_previous_results(args.results_file)
+    recorded_at = datetime.datetime.now().isoformat(timespec="seconds")
+    regressions = []
+
+    print(f"{'benchmark':<14}  {'time (s)':>9}  {'throughput':>16}  {'peak RSS MB':>11}  {'vs. last':>16}")
+    with tempfile.TemporaryDirectory(prefix="vts_bench_harness_") as tmp_dir, \
+            open(args.results_file, "a", encoding="utf-8") as results_file:
+        run_dir = os.path.join(tmp_dir, "run")
+        os.makedirs(os.path.join(run_dir, "bin"))
+        for index in range(args.executables):
+            fake_sdb.write_fake_test(os.path.join(run_dir, "bin", f"fake{index:04d}_test"), args.binary_size)
+        # Backdated, so that the scan of the fresh directory may be cached (see vts_cli.discover_tests).
+        backdated = time.time() - 60
+        os.utime(os.path.join(run_dir, "bin"), (backdated, backdated))
+        xml_file_path = None
+
+        for benchmark in args.benchmarks:
+            if benchmark.startswith("run_test"):
+                if benchmark == "run_test_cold":
+                    for state_dir in ("devices", "results"):
+                        subprocess.run(["rm", "-rf", os.path.join(run_dir, state_dir)], check=True)
+                config = run_config
+                elapsed, peak_rss = measure(_run_harness, run_dir, run_config)
+                throughput = f"{args.executables * args.cases / elapsed:.0f} cases/s"
+            elif benchmark in ("startup", "list_tests"):
+                config = startup_config
+                cli_args = ["--help"]
+                if benchmark == "list_tests":
+                    os.makedirs(os.path.join(run_dir, "results"), exist_ok=True)
+                    cli_args = ["--test-dir", os.path.join(run_dir, "bin"),
+                                "--host-results-dir", os.path.join(run_dir, "results"), "list_tests"]
+                    measure(_startup, cli_args, 1) # Warms the discovery cache
+                elapsed, peak_rss = measure(_startup, cli_args, args.startup_runs)
+                throughput = f"{1 / elapsed:.0f} runs/s"
+            else:
+                if xml_file_path is None:
+                    xml_file_path = os.path.join(tmp_dir, "synthetic_results.xml")
+                    generate_gtest_xml(xml_file_path, args.xml_cases)
+                config = xml_config
+                elapsed, peak_rss = measure(_parse if benchmark == "parse" else _report, xml_file_path)
+                throughput = f"{args.xml_cases / elapsed:.0f} cases/s"
+
+            record = {"benchmark": benchmark, "config": config, "recorded_at": recorded_at,
+                      "seconds": round(elapsed, 4), "peak_rss_bytes": peak_rss}
+            results_file.write(json.dumps(record) + "\n")
+            last = previous_results.get((benchmark, json.dumps(config, sort_keys=True)))
+            comparison = ""
+            if last is not None:
+                time_change = elapsed / last["seconds"] - 1 if last["seconds"] else 0.0
+                rss_change = peak_rss / last["peak_rss_bytes"] - 1 if last["peak_rss_bytes"] else 0.0
+                comparison = f"{time_change:+.0%} / {rss_change:+.0%}"
+                if time_change > args.tolerance or rss_change > args.tolerance:
+                    regressions.append(benchmark)
+                    comparison += " !"
+            print(f"{benchmark:<14}  {elapsed:>9.2f}  {throughput:>16}  {peak_rss / (1024 * 1024):>11.1f}  {comparison:>16}")
+
+    print(f"Results appended to {args.results_file}")
+    if regressions:
+        print(f"Regressions (more than {args.tolerance:.0%} slower or larger than the last run): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
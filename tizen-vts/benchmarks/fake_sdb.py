@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Fake 'sdb' executable for benchmarking the Tizen VTS harness without a device.
+
+Pass it to the harness with --sdb-path. Each simulated device is a directory below
+FAKE_SDB_ROOT; absolute device paths under /opt/ and /sys/class/thermal/ are
+mapped into it (other paths, such as /proc, are the host's). 'devices',
+'push', 'pull', 'shell' (with a command, or as an interactive session read from
+stdin) and '-s <serial>' are supported; 'forward' fails, so --agent falls back to
+'sdb shell'.
+
+The transport is configured through environment variables, which the harness
+passes on unchanged:
+
+    FAKE_SDB_ROOT           Directory holding the simulated devices (required).
+    FAKE_SDB_DEVICES        Number of devices listed by 'sdb devices' (default: 1).
+    FAKE_SDB_BANDWIDTH      Push/pull bandwidth in bytes per second (default: 0, unlimited).
+    FAKE_SDB_SHELL_LATENCY  Seconds added to every SDB invocation and to every command
+                            sent over an interactive shell session (default: 0).
+
+Called as '<fake_sdb.py> --run-test ...', it instead acts as a GTest executable:
+it honours --gtest_output=xml:, --gtest_list_tests, --gtest_filter and
+GTEST_TOTAL_SHARDS/GTEST_SHARD_INDEX, prints GTest console markers and writes a
+GTest XML file.
+write_fake_test() creates test executables that do this on the "device":
+
+    FAKE_GTEST_CASES          Testcases per executable (default: 100).
+    FAKE_GTEST_RUNTIME        Seconds one full run of an executable takes (default: 0).
+    FAKE_GTEST_FAILURE_EVERY  Every N-th testcase fails (default: 0, none).
+"""
+import fnmatch
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+CASES_PER_SUITE = 100
+DEVICE_PATH_PATTERN = re.compile(r"(?<![\w/.])/(opt|sys/class/thermal)/")
+
+
+def _env_float(name, default=0.0):
+    return float(os.environ.get(name) or default)
+
+
+def _env_int(name, default=0):
+    return int(os.environ.get(name) or default)
+
+
+def device_serials():
+    return [f"fake-{index}" for index in range(max(1, _env_int("FAKE_SDB_DEVICES", 1)))]
+
+
+def write_fake_test(path, size=0):
+    """
+    Writes a fake GTest executable of at least size bytes that runs this script in
+    --run-test mode. The padding after the 'exec' line is random, like the content
+    of a real binary, and never read by the shell.
+    """
+    header = f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" --run-test "$@"\n'.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(os.urandom(max(0, size - len(header))))
+    os.chmod(path, 0o755)
+
+
+class FakeDevice:
+    """The directory of one simulated device and the transport timings to it."""
+
+    def __init__(self, serial):
+        self.root = os.path.join(os.environ["FAKE_SDB_ROOT"], serial)
+        self.bandwidth = _env_float("FAKE_SDB_BANDWIDTH")
+        self.shell_latency = _env_float("FAKE_SDB_SHELL_LATENCY")
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, device_path):
+        return os.path.join(self.root, device_path.lstrip("/"))
+
+    def map_command(self, command):
+        return DEVICE_PATH_PATTERN.sub(lambda match: f"{self.root}/{match.group(1)}/", command)
+
+    def _forward_output(self, stream):
+        """Copies a shell's output to stdout line by line, mapping paths back to device paths."""
+        host_prefix = f"{self.root}/opt/".encode("utf-8")
+        for line in iter(stream.readline, b""):
+            sys.stdout.buffer.write(line.replace(host_prefix, b"/opt/"))
+            sys.stdout.buffer.flush()
+
+    def transfer(self, source, destination):
+        started = time.monotonic()
+        shutil.copyfile(source, destination)
+        shutil.copymode(source, destination)
+        if self.bandwidth:
+            time.sleep(max(0.0, os.path.getsize(destination) / self.bandwidth - (time.monotonic() - started)))
+
+    def push(self, local_path, device_path):
+        target = self.path(device_path)
+        if device_path.endswith("/"):
+            target = os.path.join(target, os.path.basename(local_path))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        self.transfer(local_path, target)
+        print(f"1 file(s) pushed. 0 file(s) skipped.")
+        return 0
+
+    def pull(self, device_path, local_path):
+        if not os.path.isfile(self.path(device_path)):
+            print(f"error: remote object '{device_path}' does not exist", file=sys.stderr)
+            print("No such file or directory", file=sys.stderr)
+            return 1
+        self.transfer(self.path(device_path), local_path)
+        print("1 file(s) pulled. 0 file(s) skipped.")
+        return 0
+
+    def shell(self, command):
+        process = subprocess.Popen(["sh", "-c", self.map_command(command)], stdout=subprocess.PIPE, cwd=self.root)
+        self._forward_output(process.stdout)
+        return process.wait()
+
+    def shell_session(self):
+        """Forwards stdin to a shell, with device paths mapped and latency per write received."""
+        process = subprocess.Popen(["sh"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=self.root)
+        output_forwarder = threading.Thread(target=self._forward_output, args=(process.stdout,))
+        output_forwarder.start()
+        pending = b""
+        while True:
+            chunk = os.read(sys.stdin.fileno(), 65536)
+            if not chunk:
+                break
+            if self.shell_latency:
+                time.sleep(self.shell_latency)
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                process.stdin.write(self.map_command(line.decode("utf-8", errors="replace")).encode("utf-8") + b"\n")
+            process.stdin.flush()
+        process.stdin.close()
+        returncode = process.wait()
+        output_forwarder.join()
+        return returncode
+
+
+def sdb_main(argv):
+    serials = device_serials()
+    serial = serials[0]
+    if argv[:1] == ["-s"]:
+        serial, argv = argv[1], argv[2:]
+        if serial not in serials:
+            print(f"error: device '{serial}' not found", file=sys.stderr)
+            return 1
+    if not argv:
+        print("usage: sdb [-s <serial>] devices|push|pull|shell ...", file=sys.stderr)
+        return 1
+
+    command, operands = argv[0], argv[1:]
+    if command == "devices":
+        print("List of devices attached")
+        for device_serial in serials:
+            print(f"{device_serial}\tdevice\tfake-target")
+        return 0
+    if command == "forward":
+        print("error: forwarding is not supported by the fake sdb", file=sys.stderr)
+        return 1
+
+    device = FakeDevice(serial)
+    if device.shell_latency:
+        time.sleep(device.shell_latency)
+    if command == "push" and len(operands) == 2:
+        return device.push(*operands)
+    if command == "pull" and len(operands) == 2:
+        return device.pull(*operands)
+    if command == "shell":
+        return device.shell(" ".join(operands)) if operands else device.shell_session()
+    print(f"error: unsupported command: {' '.join(argv)}", file=sys.stderr)
+    return 1
+
+
+def gtest_filter_matches(gtest_filter, full_name):
+    """
+    Returns True if the testcase full_name ("Suite.Case") is selected by a GTest
+    filter: ':'-separated positive patterns, optionally followed by '-' and
+    ':'-separated negative patterns, with '*' and '?' wildcards.
+    """
+    positive, _, negative = gtest_filter.partition("-")
+    positive_patterns = [pattern for pattern in positive.split(":") if pattern] or ["*"]
+    negative_patterns = [pattern for pattern in negative.split(":") if pattern]
+    return (any(fnmatch.fnmatchcase(full_name, pattern) for pattern in positive_patterns)
+            and not any(fnmatch.fnmatchcase(full_name, pattern) for pattern in negative_patterns))
+
+
+def fake_test_main(argv):
+    num_cases = _env_int("FAKE_GTEST_CASES", 100)
+    runtime = _env_float("FAKE_GTEST_RUNTIME")
+    failure_every = _env_int("FAKE_GTEST_FAILURE_EVERY")
+    gtest_filter = next((arg[len("--gtest_filter="):] for arg in argv if arg.startswith("--gtest_filter=")), "*")
+    # Indexes are kept from the unfiltered list, so a testcase fails the same way whatever the filter.
+    case_names = [(index, f"FakeSuite{index // CASES_PER_SUITE}", f"Case{index}") for index in range(num_cases)]
+    case_names = [case for case in case_names if gtest_filter_matches(gtest_filter, f"{case[1]}.{case[2]}")]
+
+    if "--gtest_list_tests" in argv:
+        current_suite = None
+        for _, suite_name, case_name in case_names:
+            if suite_name != current_suite:
+                print(f"{suite_name}.")
+                current_suite = suite_name
+            print(f"  {case_name}")
+        return 0
+
+    xml_path = next((arg[len("--gtest_output=xml:"):] for arg in argv if arg.startswith("--gtest_output=xml:")), None)
+    total_shards = _env_int("GTEST_TOTAL_SHARDS", 1)
+    shard_index = _env_int("GTEST_SHARD_INDEX", 0)
+    # Like GTest, shards split the testcases selected by the filter.
+    selected = [case for position, case in enumerate(case_names) if position % total_shards == shard_index]
+    case_time = runtime / num_cases if num_cases else 0.0
+
+    print(f"[==========] Running {len(selected)} tests from {len({suite for _, suite, _ in selected})} test suites.", flush=True)
+    suites = {}
+    failures = 0
+    for index, suite_name, case_name in selected:
+        print(f"[ RUN      ] {suite_name}.{case_name}")
+        if case_time:
+            time.sleep(case_time)
+        failed = bool(failure_every) and index % failure_every == 0
+        failures += failed
+        print(f"[  {'FAILED' if failed else '    OK'}  ] {suite_name}.{case_name} ({case_time * 1000:.0f} ms)", flush=True)
+        suites.setdefault(suite_name, []).append((case_name, failed))
+    print(f"[==========] {len(selected)} tests ran.")
+
+    if xml_path:
+        with open(xml_path, "w", encoding="utf-8") as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites tests="{len(selected)}" failures="{failures}" name="AllTests">\n')
+            for suite_name, cases in suites.items():
+                suite_failures = sum(1 for _, failed in cases if failed)
+                f.write(f'  <testsuite name="{suite_name}" tests="{len(cases)}" failures="{suite_failures}" disabled="0" '
+                        f'errors="0" time="{case_time * len(cases):.3f}">\n')
+                for case_name, failed in cases:
+                    f.write(f'    <testcase name="{case_name}" status="run" result="completed" time="{case_time:.3f}" '
+                            f'classname="{suite_name}"')
+                    if failed:
+                        f.write('>\n      <failure message="Fake failure" type=""><![CDATA[Expected equality of these values:\n'
+                                '  actual\n  expected]]></failure>\n    </testcase>\n')
+                    else:
+                        f.write(" />\n")
+                f.write("  </testsuite>\n")
+            f.write("</testsuites>\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run-test"]:
+        sys.exit(fake_test_main(sys.argv[2:]))
+    sys.exit(sdb_main(sys.argv[1:]))
@@ -0,0 +1,152 @@
+"""
+Host-side stand-in for the on-device test runner agent (src/agent/vts_agent.cpp).
+
+Speaks the same protocol as the agent but runs the requested executables on the
+host, so that 'run_test --agent' can be exercised without a Tizen device. Absolute
+device paths in run requests (the executable, the XML output path and any
+--gtest_output=xml: argument) are mapped below --root.
+
+Usage:
+    python3 harness/vts_agent_standin.py --root /tmp/fake_device --port 5599
+    python3 harness/tizen_vts_cli.py run_test my_test --agent --agent-address 127.0.0.1:5599
+"""
+import argparse
+import os
+import re
+import signal
+import socket
+import subprocess
+import threading
+
+ASSIGNMENT_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+GTEST_OUTPUT_PREFIX = "--gtest_output=xml:"
+
+
+class StandinConnection:
+    """Serves the run requests of one harness connection."""
+
+    def __init__(self, sock, root):
+        self.sock = sock
+        self.root = root
+        self._send_lock = threading.Lock()
+        self._processes = {} # request id -> subprocess.Popen
+        self._processes_lock = threading.Lock()
+
+    def device_path(self, path):
+        """Maps an absolute device path below the stand-in root."""
+        return os.path.join(self.root, path.lstrip("/")) if self.root and path.startswith("/") else path
+
+    def send(self, data):
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def send_line(self, *fields):
+        self.send(("\t".join(fields) + "\n").encode("utf-8", errors="replace"))
+
+    def serve(self):
+        """Handles requests until the harness disconnects; returns False on QUIT."""
+        with self.sock.makefile("rb") as requests:
+            for raw_line in requests:
+                fields = raw_line.decode("utf-8", errors="replace").rstrip("\n").split("\t")
+                if fields[0] == "QUIT":
+                    self.kill_all()
+                    return False
+                if fields[0] == "RUN" and len(fields) >= 2:
+                    self.start_run(fields)
+                elif fields[0] == "PING" and len(fields) >= 2:
+                    self.send_line("PONG", fields[1])
+                elif fields[0] == "KILL" and len(fields) >= 2:
+                    with self._processes_lock:
+                        process = self._processes.get(fields[1])
+                    if process is not None:
+                        self.kill(process)
+        self.kill_all()
+        return True
+
+    def start_run(self, fields):
+        request_id = fields[1]
+        if len(fields) < 4:
+            self.send_line("ERR", request_id, "Malformed RUN request")
+            return
+        xml_path = self.device_path(fields[2])
+        words = fields[3:]
+        env = dict(os.environ)
+        while words and ASSIGNMENT_PATTERN.match(words[0]):
+            name, _, value = words.pop(0).partition("=")
+            env[name] = value
+        if not words:
+            self.send_line("ERR", request_id, "No executable in RUN request")
+            return
+        argv = [self.device_path(words[0])]
+        for word in words[1:]:
+            if word.startswith(GTEST_OUTPUT_PREFIX):
+                word = GTEST_OUTPUT_PREFIX + self.device_path(word[len(GTEST_OUTPUT_PREFIX):])
+            argv.append(word)
+
+        os.makedirs(os.path.dirname(xml_path), exist_ok=True)
+        if os.path.exists(xml_path):
+            os.remove(xml_path)
+        try:
+            os.chmod(argv[0], os.stat(argv[0]).st_mode | 0o111)
+            process = subprocess.Popen(argv, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, start_new_session=True)
+        except OSError as e:
+            self.send_line("ERR", request_id, f"{argv[0]}: {e}")
+            return
+        with self._processes_lock:
+            self._processes[request_id] = process
+        threading.Thread(target=self.finish_run, args=(request_id, process, xml_path), daemon=True).start()
+
+    def finish_run(self, request_id, process, xml_path):
+        try:
+            for raw_line in process.stdout:
+                self.send_line("OUT", request_id, raw_line.decode("utf-8", errors="replace").rstrip("\n"))
+            returncode = process.wait()
+            if os.path.isfile(xml_path):
+                with open(xml_path, "rb") as f:
+                    data = f.read()
+                self.send(f"XML\t{request_id}\t{len(data)}\n".encode("utf-8") + data)
+            # Like the agent: 128 + signal number for killed tests.
+            self.send_line("EXIT", request_id, str(returncode if returncode >= 0 else 128 - returncode))
+        except OSError:
+            pass # The harness disconnected
+        finally:
+            with self._processes_lock:
+                self._processes.pop(request_id, None)
+
+    def kill_all(self):
+        with self._processes_lock:
+            processes = list(self._processes.values())
+        for process in processes:
+            self.kill(process)
+
+    @staticmethod
+    def kill(process):
+        """Kills a test process and everything it started."""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass # Already finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host-side stand-in for the Tizen VTS on-device test runner agent.")
+    parser.add_argument("--port", type=int, default=5599, help="TCP port to listen on (default: 5599).")
+    parser.add_argument("--root", default="", help="Host directory that absolute device paths are mapped below.")
+    args = parser.parse_args()
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(("127.0.0.1", args.port))
+    listener.listen(1)
+    print(f"vts_agent stand-in listening on 127.0.0.1:{args.port} (device root: {args.root or '/'})", flush=True)
+    while True:
+        sock, _ = listener.accept()
+        with sock:
+            if not StandinConnection(sock, os.path.abspath(args.root) if args.root else "").serve():
+                break
+    listener.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+"""
+Command-line entry point of the Tizen VTS harness: the argument parser, test
+discovery and the plain 'list_tests' command.
+
+This module only imports what these need, so that listing tests (which CI
+scripts do many times per pipeline) starts quickly. The rest of the harness is
+in vts_harness, which is imported once a command needs it.
+"""
+import argparse
+import fnmatch # For test name pattern matching
+import json # Discovery cache persistence
+import os
+import stat # Required for checking execute permissions more robustly
+import sys
+import time
+
+# Default directory where compiled test executables are expected to be found,
+# relative to the location of this script.
+DEFAULT_TEST_BUILD_DIR = os.path.join(os.path.dirname(__file__), "..", "build", "bin")
+
+# Default remote directory on Tizen device for VTS tests
+DEFAULT_REMOTE_TEST_DIR = "/opt/usr/devicetests/vts/"
+# Default directory on the host machine to store fetched results and reports
+DEFAULT_HOST_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "..", "results")
+
+# Device-resident test runner agent used by --agent (see src/agent/vts_agent.cpp).
+# It is built outside the bin directory, so it is not mistaken for a test.
+DEFAULT_AGENT_BINARY = os.path.join(os.path.dirname(__file__), "..", "build", "agent", "vts_agent")
+
+# SDB executable path (can be overridden by --sdb-path argument)
+SDB_EXECUTABLE = "sdb"
+
+# Codecs of compressed transfers (--compress, see vts_harness.DeviceTransfer)
+TRANSFER_CODEC_NAMES = ("gzip", "xz")
+
+# Cached scans of test directories (see discover_tests), in the host results
+# directory. A directory modified less than DISCOVERY_CACHE_MIN_AGE seconds before
+# its scan may still change within the same mtime tick, so that scan is not cached.
+DISCOVERY_CACHE_FILENAME = "test_discovery.json"
+DISCOVERY_CACHE_MIN_AGE = 2
+
+
+def discover_tests(test_dir, cache_path=None):
+    """
+    Discovers executable files in the specified directory.
+    These are assumed to be compiled GTest executables.
+
+    With cache_path, the result is cached there by the directory's mtime, which
+    changes whenever an entry is added, removed or renamed, so unchanged
+    directories are not scanned again. Changing only the permissions of a file
+    leaves the mtime alone; remove the cache file after a 'chmod'.
+    """
+    if not os.path.isdir(test_dir):
+        print(f"Error: Test directory '{test_dir}' not found.")
+        return []
+
+    dir_key = os.path.abspath(test_dir)
+    dir_mtime_ns = os.stat(test_dir).st_mtime_ns
+    cache = {}
+    if cache_path is not None:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            entry = cache.get(dir_key) if isinstance(cache, dict) else None
+            if isinstance(entry, dict) and entry.get("mtime_ns") == dir_mtime_ns and isinstance(entry.get("tests"), list):
+                return entry["tests"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable test discovery cache '{cache_path}': {e}")
+        if not isinstance(cache, dict):
+            cache = {}
+
+    test_executables = []
+    for item in os.listdir(test_dir):
+        item_path = os.path.join(test_dir, item)
+        # Check if it's a file and if it's executable by the owner
+        if os.path.isfile(item_path):
+            mode = os.stat(item_path).st_mode
+            if mode & stat.S_IXUSR: # Check for owner execute permission
+                 test_executables.append(item)
+
+    if (cache_path is not None and os.path.isdir(os.path.dirname(cache_path))
+            and time.time_ns() - dir_mtime_ns > DISCOVERY_CACHE_MIN_AGE * 1_000_000_000):
+        cache[dir_key] = {"mtime_ns": dir_mtime_ns, "tests": test_executables}
+        try:
+            with open(f"{cache_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=1, sort_keys=True)
+            os.replace(f"{cache_path}.tmp", cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write test discovery cache '{cache_path}': {e}")
+    return test_executables
+
+
+def discovery_cache_path(args):
+    """Returns the path of the test discovery cache used by the commands of args."""
+    return os.path.join(args.host_results_dir, DISCOVERY_CACHE_FILENAME)
+
+
+def list_tests_action(args):
+    """
+    Action to list discovered test executables, and with --testcases or
+    --gtest_filter the testcases they contain according to the test inventory
+    (see vts_harness.list_testcases_action).
+    """
+    print(f"Scanning for tests in: {os.path.abspath(args.test_dir)}...")
+    tests = fnmatch.filter(discover_tests(args.test_dir, discovery_cache_path(args)), args.test_pattern)
+    if not tests:
+        print("No tests found. Ensure tests are compiled and present in the specified directory.")
+        return
+    if not (args.testcases or args.gtest_filter):
+        print("Available tests:")
+        for test_name in tests:
+            print(f"  - {test_name}")
+        return
+
+    import vts_harness # Only needed for testcases; see the module docstring
+    vts_harness.list_testcases_action(args, tests)
+
+
+def _harness_action(action_name):
+    """Returns an action that runs the vts_harness function action_name, importing it only then."""
+    def action(args):
+        import vts_harness
+        getattr(vts_harness, action_name)(args)
+    return action
+
+
+def _add_list_tests_arguments(list_parser):
+    """Adds the arguments of the 'list_tests' command."""
+    list_parser.add_argument(
+        "test_pattern",
+        nargs="?",
+        default="*",
+        help="Name or pattern of the test executable(s) to list. (default: all)"
+    )
+    list_parser.add_argument(
+        "--testcases",
+        action="store_true",
+        help="Also list the testcases of each executable, from the test inventory. Executables\nnot in the inventory are listed with --gtest_list_tests on the host, or on the device."
+    )
+    list_parser.add_argument(
+        "--gtest_filter",
+        default=None,
+        metavar="<GTEST_FILTER_PATTERN>",
+        help="Only list the testcases selected by this GTest filter, and the executables\ncontaining any (implies --testcases)."
+    )
+
+
+def _add_run_test_arguments(run_parser):
+    """Adds the arguments of the 'run_test' command."""
+    run_parser.add_argument("test_pattern", help="Name or pattern (e.g., 'sample_*_test') of the test executable(s) to run.")
+    run_parser.add_argument(
+        "--gtest_filter",
+        default=None,
+        metavar="<GTEST_FILTER_PATTERN>",
+        help="GTest filter pattern to select specific tests within the executable (e.g., 'TestSuite.*', '*Positive*')."
+    )
+    run_parser.add_argument(
+        "--devices",
+        default=None,
+        metavar="<ID,ID,...|all>",
+        help="Comma-separated list of device IDs to run on in parallel, or 'all' to use\nevery online device reported by 'sdb devices'. Overrides --target-id."
+    )
+    run_parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Split each matched executable into N GTest shards (GTEST_TOTAL_SHARDS/GTEST_SHARD_INDEX).\nShards are spread over the --devices; with fewer devices than shards, several\nshards run concurrently on one device. Shard results are merged into one report."
+    )
+    run_parser.add_argument(
+        "--force-push",
+        action="store_true",
+        help="Always push test executables, even if the push cache shows that the device\nalready has an identical copy."
+    )
+    run_parser.add_argument(
+        "--no-persistent-shell",
+        dest="persistent_shell",
+        action="store_false",
+        help="Start a new 'sdb shell' process for every device command instead of reusing\none long-lived shell session per device."
+    )
+    run_parser.add_argument(
+        "--no-pipeline",
+        dest="pipeline",
+        action="store_false",
+        help="Run push, test execution and result fetching strictly one after another on each device,\ninstead of pushing the next test and fetching the previous results while a test runs."
+    )
+    run_parser.add_argument(
+        "--agent",
+        action="store_true",
+        help="Run tests through a test runner agent deployed to each device once per run and reached\nover 'sdb forward', instead of separate 'sdb shell' and 'sdb pull' calls per test."
+    )
+    run_parser.add_argument(
+        "--agent-binary",
+        default=DEFAULT_AGENT_BINARY,
+        help=f"Agent executable built for the device. (default: {DEFAULT_AGENT_BINARY})"
+    )
+    run_parser.add_argument(
+        "--agent-address",
+        default=None,
+        metavar="HOST:PORT",
+        help="Use the agent already listening at HOST:PORT for all devices instead of starting one,\ne.g. harness/vts_agent_standin.py for testing without a device."
+    )
+    run_parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="Deploy all matched executables to each device as one compressed archive, and\nfetch all XML results back as one archive instead of one pull per result file."
+    )
+    run_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the device's test output while it runs and report per-testcase progress\nlive. If the XML results cannot be fetched, results parsed from the console\noutput are used instead."
+    )
+    run_parser.add_argument(
+        "--events-file",
+        default=None,
+        metavar="<PATH>",
+        help="Write live per-testcase events as JSON Lines to this file (implies --stream)."
+    )
+    run_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Kill a test executable (or shard) that runs longer than this, mark the\ntestcase it was running as timed out and continue with the remaining work."
+    )
+    run_parser.add_argument(
+        "--testcase-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Treat a testcase that produces no output for this long as hung: kill it,\nmark it as timed out and run the rest of the executable (or shard) without it."
+    )
+    run_parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Re-run only the failed testcases of an executable, up to N times. Testcases that pass\non a retry are reported as flaky, the others as consistently failing. (default: 0)"
+    )
+    run_parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Cancel all pending tests on all devices as soon as an executable fails\n(after retries). Tests already running are completed."
+    )
+    run_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip executables that passed in an earlier --incremental run and are unchanged since\n(same binary, device and --gtest_filter); their cached results are reported instead."
+    )
+    run_parser.add_argument(
+        "--no-inventory",
+        dest="inventory",
+        action="store_false",
+        help="With --gtest_filter, do not use the test inventory to skip executables that contain\nno matching testcase."
+    )
+    run_parser.add_argument(
+        "--no-history",
+        dest="history",
+        action="store_false",
+        help="Neither record the results of this run in the run history database\nnor use it to run the longest executables first."
+    )
+    run_parser.add_argument(
+        "--compress",
+        nargs="?",
+        const="gzip",
+        choices=TRANSFER_CODEC_NAMES,
+        default=None,
+        help="Compress test executables for the push and decompress them on the device, push\nchanged executables as block deltas against the version on the device where\npossible, and pull results compressed. Uses gzip unless 'xz' is given; files are\nsent raw if the device lacks the tool. Prints transfer statistics at the end."
+    )
+    run_parser.add_argument(
+        "--telemetry-interval",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="While each executable runs, sample the device's CPU load (/proc/stat), memory use\n(/proc/meminfo) and thermal zone temperatures at this interval, with one shell\nread per sample. The samples are shown as timelines in the reports."
+    )
+    run_parser.add_argument(
+        "--max-device-temp",
+        type=float,
+        default=None,
+        metavar="CELSIUS",
+        help="Before each test, check the device's hottest thermal zone; a device at or above\nthis temperature takes no further tests until it has cooled down, while the\nother devices keep running the queue."
+    )
+    run_parser.add_argument(
+        "--no-executable-reports",
+        dest="executable_reports",
+        action="store_false",
+        help="Do not write an HTML report per test executable; the run report (HTML, JSON and\nJUnit XML) then covers the run, even for a single executable."
+    )
+    run_parser.add_argument(
+        "--report-workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Number of processes that parse results and write reports while the devices keep\nrunning tests; 0 processes them in the harness itself. (default: number of CPUs)"
+    )
+    run_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every stage (discover, mkdir, push, chmod, execute, pull, parse, report) per test\nand device, count bytes transferred and SDB processes spawned, print a summary and\nwrite profile_<timestamp>.json and a Chrome trace to the host results directory."
+    )
+
+
+def _add_query_arguments(query_parser):
+    """Adds the arguments of the 'query' command."""
+    query_parser.add_argument(
+        "query",
+        choices=["failures", "trend", "slowest"],
+        help="'failures': runs in which testcases failed, timed out or were flaky;\n'trend': pass rate per run; 'slowest': testcases with the highest average duration."
+    )
+    query_parser.add_argument(
+        "--test",
+        default="*",
+        help="Glob pattern for the 'Suite.Case' names of the testcases to include (default: all)."
+    )
+    query_parser.add_argument(
+        "--runs",
+        type=int,
+        default=20,
+        help="Number of most recent runs to include (default: 20)."
+    )
+    query_parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Number of testcases listed by 'slowest' (default: 20)."
+    )
+
+
+# Commands: name -> (help, function adding its arguments, action)
+COMMANDS = {
+    "list_tests": ("List all available local test executables from the --test-dir.",
+                   _add_list_tests_arguments, list_tests_action),
+    "run_test": ("Run test executable(s) matching a pattern on a Tizen device.",
+                 _add_run_test_arguments, _harness_action("run_test_action")),
+    "query": ("Query the results of earlier runs recorded by 'run_test'.",
+              _add_query_arguments, _harness_action("query_action")),
+}
+
+
+def build_parser(commands=None):
+    """
+    Returns the argument parser. Only the arguments of the given commands (all if
+    None) are added; the others are listed without them, which is enough to
+    parse a command line for one of the given commands.
+    """
+    parser = argparse.ArgumentParser(
+        description="Tizen Vendor Test Suite (VTS) CLI Harness. "\
+                    "Manages deployment and execution of tests on Tizen devices, and processes results.",
+        formatter_class=argparse.RawTextHelpFormatter 
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="count",
+        default=0,
+        help="Increase output verbosity. Can be used multiple times (e.g., -v, -vv)."
+    )
+    parser.add_argument(
+        "--test-dir",
+        default=DEFAULT_TEST_BUILD_DIR,
+        help=f"Directory containing compiled local test executables.\n(default: {DEFAULT_TEST_BUILD_DIR})"
+    )
+    parser.add_argument(
+        "--sdb-path",
+        default=None, 
+        help=f"Path to the SDB executable.\n(default: '{SDB_EXECUTABLE}' from PATH if not specified)"
+    )
+    parser.add_argument(
+        "-s", "--target-id",
+        default=None,
+        help="Target Tizen device ID (serial number or emulator ID, e.g., emulator-26101)\nif multiple devices/emulators are connected."
+    )
+    parser.add_argument(
+        "--host-results-dir",
+        default=DEFAULT_HOST_RESULTS_DIR,
+        help=f"Directory on the host to store fetched XML results and HTML reports.\n(default: {DEFAULT_HOST_RESULTS_DIR})"
+    )
+    parser.add_argument(
+        "--remote-test-root",
+        default=DEFAULT_REMOTE_TEST_DIR,
+        help=f"Root directory on the Tizen device for VTS tests and results.\n(default: {DEFAULT_REMOTE_TEST_DIR})"
+    )
+
+    subparsers = parser.add_subparsers(dest="command", title="Available commands", 
+                                     help="Command to execute. Use '<command> --help' for more details.")
+    subparsers.required = True
+    for name, (help_text, add_arguments, action) in COMMANDS.items():
+        command_parser = subparsers.add_parser(name, help=help_text)
+        if commands is None or name in commands:
+            add_arguments(command_parser)
+        command_parser.set_defaults(func=action)
+    return parser
+
+
+def main(argv=None):
+    """
+    Main function to parse arguments and dispatch actions.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    # Any word naming a command may be the command (or merely an option value), so
+    # the arguments of all commands named are added; if none is named, all are.
+    commands = {arg for arg in argv if arg in COMMANDS} or None
+    args = build_parser(commands).parse_args(argv)
+    # --sdb-path is applied per command by vts_harness.execute_sdb_command.
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
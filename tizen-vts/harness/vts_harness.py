@@ -0,0 +1,4407 @@
+"""
+The Tizen VTS harness: deployment, execution and result processing of tests on
+Tizen devices. Its command line is defined in vts_cli, which imports this module
+only for the commands that need it; run it through tizen_vts_cli.py.
+"""
+import argparse
+import contextlib # No-op profiling stages
+import os
+import stat # Required for checking execute permissions more robustly
+import subprocess # For executing SDB commands
+import xml.etree.ElementTree as ET # For parsing GTest XML
+import datetime # For report timestamps
+import fnmatch # For test name pattern matching
+import gzip # Compressed transfers (--compress)
+import html # Escaping in HTML reports
+import hashlib # Content hashes for the push cache
+import heapq # Slowest testcases of a run
+import json # Push cache persistence
+import lzma # xz-compressed transfers (--compress xz)
+import multiprocessing # Start method of the result processing workers
+import queue # Work queue shared by per-device workers
+import re # Parsing of streamed GTest console output
+import shlex
+import socket # Connection to the on-device test runner agent
+import sqlite3 # Run history
+import shutil
+import tarfile # Bundled deployment of test executables and results
+import tempfile
+import threading # Per-device worker threads
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from vts_cli import (DEFAULT_AGENT_BINARY, DEFAULT_HOST_RESULTS_DIR, DEFAULT_REMOTE_TEST_DIR, DEFAULT_TEST_BUILD_DIR,
+                     SDB_EXECUTABLE, discover_tests, discovery_cache_path)
+
+# Subdirectory for results on the remote device
+DEFAULT_REMOTE_RESULTS_DIR = os.path.join(DEFAULT_REMOTE_TEST_DIR, "results")
+
+
+# Host-side record of what was last pushed to each device (see PushCache)
+PUSH_CACHE_FILENAME = "push_cache.json"
+
+
+# Testcase rows per page for suites too large to show inline in an HTML report
+REPORT_ROWS_PER_PAGE = 1000
+# Slowest testcases listed in the run report, and the length failure messages are
+# cut to there (see RunSummary)
+RUN_REPORT_SLOWEST_TESTCASES = 50
+RUN_REPORT_FAILURE_MESSAGE_CHARS = 2000
+
+# SQLite database in the host results directory holding run history
+HISTORY_DB_FILENAME = "vts_history.db"
+# Retries are skipped for executables with more failed testcases than this, since
+# the --gtest_filter listing them would get unreasonably long.
+RETRY_MAX_FAILED_TESTS = 200
+
+# Cached '--gtest_list_tests' listings of the test executables, in the host results
+# directory, and how long listing one executable on the host may take (seconds)
+INVENTORY_CACHE_FILENAME = "test_inventory.json"
+INVENTORY_LIST_TIMEOUT = 30
+
+# Record of passed results reused by --incremental, in the host results directory
+INCREMENTAL_CACHE_FILENAME = "incremental_cache.json"
+INCREMENTAL_RESULTS_DIRNAME = "incremental"
+
+# Archive used on the device for bundled deployment (--bundle)
+TEST_BUNDLE_FILENAME = "vts_tests_bundle.tar.gz"
+
+# Compressed and delta transfers (--compress, see DeviceTransfer): files smaller
+# than TRANSFER_COMPRESS_MIN_BYTES are sent raw, compressed files are only sent if
+# at most TRANSFER_MAX_RATIO of their size, and deltas are built from blocks of
+# TRANSFER_DELTA_BLOCK_SIZE bytes against copies of the last pushed binaries kept
+# in TRANSFER_BASES_DIRNAME of the host results directory.
+TRANSFER_COMPRESS_MIN_BYTES = 64 * 1024
+TRANSFER_MAX_RATIO = 0.9
+TRANSFER_DELTA_BLOCK_SIZE = 64 * 1024
+TRANSFER_DELTA_MAX_RUNS = 32 # Ranges of changed blocks patched with one 'dd' each
+TRANSFER_BASES_DIRNAME = "transfer_bases"
+TRANSFER_CODECS = {"gzip": (".gz", gzip.open), "xz": (".xz", lzma.open)} # Same names as vts_cli.TRANSFER_CODEC_NAMES
+
+# Seconds to wait for a persistent SDB shell session to start or shut down
+SDB_SESSION_START_TIMEOUT = 15
+
+
+# Hang detection (--timeout/--testcase-timeout): the remote test prints its PID
+# behind this marker, the watchdog polls at this interval (seconds), and the local
+# SDB process is killed if it has not returned this long after the remote kill.
+REMOTE_PID_MARKER = "__VTS_PID__ "
+WATCHDOG_POLL_INTERVAL = 0.5
+TIMEOUT_KILL_GRACE = 10
+# An executable is run in at most this many segments after --testcase-timeout kills
+# a hung testcase; the rest of it is then given up.
+TESTCASE_TIMEOUT_MAX_SEGMENTS = 20
+
+
+# Device-resident test runner agent used by --agent (see vts_cli.DEFAULT_AGENT_BINARY)
+DEFAULT_REMOTE_AGENT_PATH = os.path.join(DEFAULT_REMOTE_TEST_DIR, "agent", "vts_agent")
+AGENT_DEVICE_PORT = 5599
+
+# Device health sampling (--telemetry-interval/--max-device-temp, see DeviceMonitor).
+# One sample is a single shell read of the aggregate 'cpu' line of /proc/stat, the
+# memory totals of /proc/meminfo and every thermal zone; zone temperatures above
+# TELEMETRY_MILLIDEGREE_MIN are in millidegrees. A device too hot for its next test
+# is checked again every TELEMETRY_COOLDOWN_POLL seconds. Samples of each run are
+# written next to its results, with TELEMETRY_FILE_SUFFIX instead of "_results.xml".
+TELEMETRY_SAMPLE_COMMAND = ("head -n 1 /proc/stat; grep -E '^Mem(Total|Available):' /proc/meminfo; "
+                            "cat /sys/class/thermal/thermal_zone*/temp 2>/dev/null; true")
+TELEMETRY_MILLIDEGREE_MIN = 1000
+TELEMETRY_COOLDOWN_POLL = 10
+TELEMETRY_FILE_SUFFIX = "_telemetry.json"
+
+# --- Logging Helper ---
+def log_verbose(message, args, level=1):
+    """Prints a verbose message if the verbosity level is met."""
+    if args.verbose >= level:
+        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"{timestamp} VERBOSE: {message}")
+
+def list_testcases_action(args, tests):
+    """
+    Lists the testcases of the test executables tests (see vts_cli.list_tests_action)
+    according to the test inventory, only those selected by --gtest_filter if given.
+    """
+    try:
+        os.makedirs(args.host_results_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Error creating host results directory '{args.host_results_dir}': {e}")
+        return
+    args.force_push = False
+    args.push_cache = PushCache(os.path.join(args.host_results_dir, PUSH_CACHE_FILENAME))
+    args.deployments = DeploymentTracker()
+    try:
+        listings = _list_testcases(tests, args)
+    finally:
+        args.push_cache.save()
+
+    print("Available tests:")
+    total_selected = 0
+    for test_name in tests:
+        suites = listings[test_name]
+        if suites is None:
+            print(f"  - {test_name}: testcases unknown (could not be listed on the host or the device)")
+            continue
+        selected = selected_testcases(suites, args.gtest_filter)
+        if args.gtest_filter and not selected:
+            continue
+        total_selected += len(selected)
+        print(f"  - {test_name}: {len(selected)} testcase(s)")
+        for full_name in selected:
+            print(f"      {full_name}")
+    print(f"{total_selected} testcase(s)"
+          f"{f' matching --gtest_filter {args.gtest_filter!r}' if args.gtest_filter else ''}.")
+
+
+def _list_testcases(test_names, args):
+    """
+    Returns the testcase listings of test_names (see TestInventory.testcases),
+    listing executables that are not in the inventory yet on the host or on the
+    device in args.target_id.
+    """
+    inventory = TestInventory(os.path.join(args.host_results_dir, INVENTORY_CACHE_FILENAME))
+    listings = inventory.testcases(args.test_dir, test_names, args)
+    inventory.save()
+    unlisted = sum(1 for suites in listings.values() if suites is None)
+    log_verbose(f"Test inventory: {len(test_names) - inventory.listed - unlisted} cached, {inventory.listed} listed, "
+                f"{unlisted} could not be listed", args)
+    return listings
+
+
+def _tests_with_selected_cases(test_names, target_id, args):
+    """
+    Returns the test_names that contain at least one testcase selected by
+    --gtest_filter according to the test inventory. Executables that could not be
+    listed are kept.
+    """
+    list_args = argparse.Namespace(**vars(args))
+    list_args.target_id = target_id
+    listings = _list_testcases(test_names, list_args)
+    kept_tests = []
+    skipped_tests = []
+    for test_name in test_names:
+        suites = listings[test_name]
+        if suites is None:
+            kept_tests.append(test_name)
+            continue
+        selected_count = len(selected_testcases(suites, args.gtest_filter))
+        log_verbose(f"'{test_name}': {selected_count} testcase(s) selected by --gtest_filter", args)
+        (kept_tests if selected_count else skipped_tests).append(test_name)
+    if skipped_tests:
+        print(f"Skipping {len(skipped_tests)} test(s) without testcases matching --gtest_filter "
+              f"'{args.gtest_filter}': {', '.join(skipped_tests)}")
+    return kept_tests
+
+def query_action(args):
+    """
+    Action to query the run history recorded by run_test: failure history,
+    pass-rate trend or slowest testcases over the last --runs runs.
+    """
+    db_path = os.path.join(args.host_results_dir, HISTORY_DB_FILENAME)
+    if not os.path.isfile(db_path):
+        print(f"No run history found at '{db_path}'. It is recorded by 'run_test' unless --no-history is given.")
+        return
+    try:
+        history = RunHistory(db_path)
+    except sqlite3.Error as e:
+        print(f"Error opening run history database '{db_path}': {e}")
+        return
+
+    def format_time(timestamp):
+        return datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+    try:
+        if args.query == "failures":
+            rows = history.failure_history(args.test, args.runs)
+            print(f"Failures of '{args.test}' in the last {args.runs} run(s): {len(rows)}")
+            for run_id, started_at, executable, test, result in rows:
+                print(f"  run {run_id:<6} {format_time(started_at)}  {result:<8} {executable}: {test}")
+        elif args.query == "trend":
+            print(f"Pass rate of '{args.test}' in the last {args.runs} run(s):")
+            print(f"  {'run':<6} {'started':<19} {'passed':>7} {'failed':>7} {'flaky':>6} {'skipped':>8} {'pass rate':>10}")
+            for run_id, started_at, passed, failed, flaky, skipped in history.pass_rate_trend(args.test, args.runs):
+                executed = passed + failed + flaky
+                pass_rate = f"{100.0 * passed / executed:.1f}%" if executed else "n/a"
+                print(f"  {run_id:<6} {format_time(started_at):<19} {passed:>7} {failed:>7} {flaky:>6} {skipped:>8} {pass_rate:>10}")
+        else:
+            print(f"Slowest testcases matching '{args.test}' in the last {args.runs} run(s):")
+            print(f"  {'avg (s)':>9} {'max (s)':>9} {'runs':>5}  testcase")
+            for executable, test, average, maximum, count in history.slowest_testcases(args.test, args.runs, args.limit):
+                print(f"  {average:>9.3f} {maximum:>9.3f} {count:>5}  {executable}: {test}")
+    except sqlite3.Error as e:
+        print(f"Error querying run history database '{db_path}': {e}")
+    finally:
+        history.close()
+
+
+def run_test_action(args):
+    """
+    Action to run a specified test.
+    This involves:
+    1. Constructing the full path to the local test executable.
+    2. Pushing it to the Tizen device using SDB.
+    3. Executing it on the device via SDB shell.
+    4. Fetching XML results from the device.
+    5. Parsing the XML results.
+    6. Generating a basic HTML report for each.
+    """
+    if args.telemetry_interval is not None and args.telemetry_interval <= 0:
+        print("Error: --telemetry-interval must be greater than 0.")
+        return
+    args.profiler = StageProfiler() if args.profile else None
+    with _profile_stage(args, "discover"):
+        all_tests = discover_tests(args.test_dir, discovery_cache_path(args))
+    if not all_tests:
+        print(f"No test executables found in directory: {os.path.abspath(args.test_dir)}")
+        return
+
+    matched_tests = fnmatch.filter(all_tests, args.test_pattern)
+
+    if not matched_tests:
+        print(f"No test executables found matching pattern: '{args.test_pattern}' in directory: {os.path.abspath(args.test_dir)}")
+        return
+
+    print(f"Found {len(matched_tests)} test(s) matching pattern '{args.test_pattern}': {', '.join(matched_tests)}")
+    if args.gtest_filter:
+        log_verbose(f"GTest filter '{args.gtest_filter}' will be applied to each matched test.", args)
+    print("-" * 30)
+
+    try:
+        target_ids = resolve_target_ids(args)
+    except RuntimeError as e:
+        print(f"Error querying connected devices: {e}")
+        return
+    if not target_ids:
+        print("No target devices available. Check 'sdb devices' or the --devices option.")
+        return
+    if len(target_ids) > 1:
+        print(f"Distributing tests across {len(target_ids)} device(s): {', '.join(target_ids)}")
+
+    # Ensure host results directory exists (can be done once here)
+    if not os.path.exists(args.host_results_dir):
+        try:
+            os.makedirs(args.host_results_dir)
+            log_verbose(f"Created host results directory: {args.host_results_dir}", args)
+        except OSError as e:
+            print(f"Error creating host results directory '{args.host_results_dir}': {e}. Aborting.")
+            return
+
+    args.push_cache = PushCache(os.path.join(args.host_results_dir, PUSH_CACHE_FILENAME))
+    args.deployments = DeploymentTracker()
+    if args.gtest_filter and args.inventory:
+        # Executables without a selected testcase would only be pushed to run nothing.
+        matched_tests = _tests_with_selected_cases(matched_tests, target_ids[0], args)
+        if not matched_tests:
+            print("No test executables contain testcases matching the --gtest_filter.")
+            args.push_cache.save()
+            return
+    args.run_history = None
+    if args.history:
+        try:
+            args.run_history = RunHistory(os.path.join(args.host_results_dir, HISTORY_DB_FILENAME))
+            args.run_history.begin_run(args.test_pattern, args.gtest_filter, target_ids)
+        except sqlite3.Error as e:
+            print(f"Warning: Cannot open the run history database, continuing without it: {e}")
+    args.incremental_cache = None
+    cached_results = {}
+    tests_to_run = matched_tests
+    if args.incremental:
+        args.incremental_cache = IncrementalCache(os.path.join(args.host_results_dir, INCREMENTAL_CACHE_FILENAME),
+                                                  os.path.join(args.host_results_dir, INCREMENTAL_RESULTS_DIRNAME))
+        for test_name in matched_tests:
+            cached_entry = args.incremental_cache.lookup(test_name, target_ids, args)
+            if cached_entry is not None:
+                cached_results[test_name] = cached_entry
+        tests_to_run = [test_name for test_name in matched_tests if test_name not in cached_results]
+        print(f"Incremental: reusing the passed results of {len(cached_results)} unchanged test(s), "
+              f"running {len(tests_to_run)}.")
+        for test_name in cached_results:
+            log_verbose(f"Unchanged since its last passed run: {test_name}", args)
+
+    args.sdb_sessions = SdbSessionPool() if args.persistent_shell else None
+    args.device_agents = DeviceAgentPool(args.agent_binary, args.agent_address) if args.agent else None
+    args.event_log = TestEventLog(args.events_file) if args.events_file else None
+    args.result_processor = ResultProcessor(os.cpu_count() if args.report_workers is None else args.report_workers, args)
+    args.transfer = (DeviceTransfer(args.compress, os.path.join(args.host_results_dir, TRANSFER_BASES_DIRNAME),
+                                    args.push_cache) if args.compress else None)
+    args.device_monitor = (DeviceMonitor(args.telemetry_interval, args.max_device_temp)
+                           if args.telemetry_interval or args.max_device_temp is not None else None)
+    # JUnit fragments of the executables, joined into the run's JUnit file at the end
+    args.junit_dir = tempfile.mkdtemp(prefix="junit_", dir=args.host_results_dir)
+    try:
+        outcomes = _run_tests_on_devices(tests_to_run, target_ids, args) if tests_to_run else []
+        if cached_results:
+            outcomes.extend(_report_cached_results(cached_results, args))
+    finally:
+        args.result_processor.close()
+        args.push_cache.save()
+        if args.transfer:
+            args.transfer.close()
+        if args.incremental_cache:
+            args.incremental_cache.save()
+        if args.event_log:
+            args.event_log.close()
+        if args.run_history:
+            args.run_history.close()
+        if args.device_agents:
+            args.device_agents.close(args)
+        if args.sdb_sessions:
+            args.sdb_sessions.close()
+    log_verbose(f"Push cache: {args.push_cache.hits} hit(s), {args.push_cache.misses} miss(es)"
+                f"{' (--force-push)' if args.force_push else ''}", args)
+    if args.transfer:
+        args.transfer.print_summary()
+    if args.device_monitor:
+        args.device_monitor.print_summary()
+    successful_tests = sum(1 for _, _, succeeded in outcomes if succeeded)
+    failed_tests = len(outcomes) - successful_tests
+
+    if len(matched_tests) > 1:
+        print("\n--- Overall Summary ---")
+        print(f"Total tests processed: {len(outcomes)}")
+        print(f"Successful workflows: {successful_tests}")
+        print(f"Failed/Skipped workflows: {failed_tests}")
+        if cached_results:
+            print(f"Reused cached results: {len(cached_results)}")
+        if len(target_ids) > 1:
+            for target_id in target_ids:
+                device_outcomes = [succeeded for _, devices, succeeded in outcomes if target_id in devices]
+                print(f"  {target_id}: {len(device_outcomes)} run, {device_outcomes.count(False)} failed/skipped")
+        print(f"Testcases: {args.result_processor.summary.summary_line()}")
+        print("----------------------")
+
+    run_summary = args.result_processor.summary
+    if run_summary.executables and (len(matched_tests) > 1 or not args.executable_reports):
+        for report_path in run_summary.write_reports(args.host_results_dir):
+            print(f"Run report written to: {os.path.abspath(report_path)}")
+    shutil.rmtree(args.junit_dir, ignore_errors=True)
+
+    if args.profiler is not None:
+        _write_profile(args.profiler, args)
+
+
+def _write_profile(profiler, args):
+    """Prints the stage summary of a --profile run and writes its JSON and Chrome trace files."""
+    profiler.print_summary()
+    try:
+        profile_path = create_timestamped_file(args.host_results_dir, "profile", ".json")
+        trace_path = f"{os.path.splitext(profile_path)[0]}_trace.json"
+        profiler.write_json(profile_path)
+        profiler.write_chrome_trace(trace_path)
+    except OSError as e:
+        print(f"Warning: Could not write the profile: {e}")
+        return
+    print(f"Profile written to: {os.path.abspath(profile_path)}")
+    print(f"Chrome trace written to: {os.path.abspath(trace_path)} (open in chrome://tracing or ui.perfetto.dev)")
+
+
+def discover_devices(args):
+    """
+    Returns the serials of all devices reported as online by 'sdb devices'.
+    """
+    # 'sdb devices' must not be scoped to a single target.
+    query_args = argparse.Namespace(**vars(args))
+    query_args.target_id = None
+    result = execute_sdb_command([SDB_EXECUTABLE, "devices"], query_args)
+
+    devices = []
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        # Lines look like: "<serial>   device   <model>". Skip the header and
+        # devices in 'offline'/'unauthorized' state.
+        if len(fields) >= 2 and fields[1] == "device":
+            devices.append(fields[0])
+    return devices
+
+
+def resolve_target_ids(args):
+    """
+    Resolves the list of devices a run should use.
+
+    '--devices all' discovers every online device, '--devices a,b' uses the given
+    serials and, without --devices, the single --target-id (or SDB's default device)
+    is used. A value of None stands for "SDB's default device".
+    """
+    devices_option = getattr(args, "devices", None)
+    if not devices_option:
+        return [args.target_id]
+    if devices_option == "all":
+        devices = discover_devices(args)
+        log_verbose(f"Discovered devices: {devices}", args)
+        return devices
+    return [device.strip() for device in devices_option.split(",") if device.strip()]
+
+
+def _run_tests_on_devices(test_names, target_ids, args):
+    """
+    Runs the given test executables using worker threads bound to devices.
+
+    Work units are handed out from a shared queue, so an idle device always picks up
+    the next pending unit. Without --shards a unit is a whole executable and each
+    device gets one worker. With --shards N every executable is split into N GTest
+    shards; if there are fewer devices than shards, each device gets several workers
+    so its shards run as concurrent processes.
+
+    With --bundle, each device first receives all executables in one archive, and
+    each worker fetches all of its XML results in one archive once the queue is
+    drained; reports are generated after that pull. Otherwise, unless pipelining is
+    disabled with --no-pipeline, each worker claims the next unit when it starts a
+    run and pushes its executable in the background, while the results of the
+    previous unit are fetched and reported in the background too. Fetched results
+    are parsed and reported by args.result_processor (see ResultProcessor).
+
+    With --max-device-temp, a device checks its temperature before each unit; if it
+    is too hot, the unit goes back to the queue for the other devices and the
+    device waits until it has cooled down (see DeviceMonitor).
+
+    Returns a list of (test_name, target_ids, succeeded) tuples in completion order,
+    where target_ids holds every device that ran a part of the executable.
+    """
+    total_shards = max(1, getattr(args, "shards", 1) or 1)
+    bundle = getattr(args, "bundle", False)
+    if getattr(args, "deployments", None) is None:
+        args.deployments = DeploymentTracker() # Shared by the device workers' copies of args
+    pipeline = getattr(args, "pipeline", False)
+
+    incremental_cache = getattr(args, "incremental_cache", None)
+    result_processor = getattr(args, "result_processor", None) or ResultProcessor(0, args)
+    device_monitor = getattr(args, "device_monitor", None)
+    run_history = getattr(args, "run_history", None)
+    if run_history is not None:
+        # Longest predicted executables first: with idle devices pulling from the
+        # queue, this greedily balances the devices by predicted cost.
+        test_names = run_history.order_longest_first(test_names, args.gtest_filter)
+        for test_name in test_names:
+            predicted = run_history.predicted_duration(test_name, args.gtest_filter)
+            log_verbose(f"Scheduled '{test_name}': predicted "
+                        f"{'unknown (no history)' if predicted is None else f'{predicted:.1f}s'}", args)
+
+    work_queue = queue.Queue()
+    for test_name in test_names:
+        if total_shards == 1:
+            work_queue.put((test_name, None))
+        else:
+            for shard_index in range(total_shards):
+                work_queue.put((test_name, shard_index))
+
+    outcomes = []
+    outcomes_lock = threading.Lock()
+    abort_event = threading.Event()
+    fail_fast_triggered = threading.Event()
+    shard_results = {test_name: {} for test_name in test_names} # shard_index -> (target_id, local XML path)
+
+    def report_executable(test_executable_name, local_xml_filepaths, devices, device_args):
+        retry_results = None
+        if getattr(device_args, "retries", 0) and not abort_event.is_set():
+            retry_results = _retry_failed_tests(test_executable_name, local_xml_filepaths, device_args)
+
+        def on_reported(succeeded, tally):
+            passed = succeeded and tally is not None and tally.passed
+            if incremental_cache is not None:
+                # The XML of a run that needed retries still holds its failures, so it is
+                # not reused; the executable runs again next time.
+                incremental_cache.update(test_executable_name, devices, local_xml_filepaths, passed and not retry_results,
+                                         device_args)
+            check_fail_fast(test_executable_name, passed)
+            with outcomes_lock:
+                outcomes.append((test_executable_name, devices, succeeded))
+
+        # Parsing and the report are left to the result processor, so the device can move on.
+        result_processor.submit(test_executable_name, local_xml_filepaths, device_args, retry_results=retry_results,
+                                on_done=on_reported)
+
+    def check_fail_fast(test_executable_name, passed):
+        if passed or not getattr(args, "fail_fast", False):
+            return
+        with outcomes_lock:
+            first_failure = not fail_fast_triggered.is_set()
+            fail_fast_triggered.set()
+        if first_failure:
+            print(f"  --fail-fast: '{test_executable_name}' failed; cancelling the remaining work.")
+        abort_event.set()
+
+    def complete_unit(test_executable_name, shard_index, target_id, local_xml_filepath, device_args):
+        if shard_index is None:
+            if local_xml_filepath is not None:
+                report_executable(test_executable_name, [local_xml_filepath], (target_id,), device_args)
+                return
+            check_fail_fast(test_executable_name, False)
+            with outcomes_lock:
+                outcomes.append((test_executable_name, (target_id,), False))
+            return
+
+        with outcomes_lock:
+            shards = shard_results[test_executable_name]
+            shards[shard_index] = (target_id, local_xml_filepath)
+            all_shards_done = len(shards) == total_shards
+        if all_shards_done:
+            # The worker finishing the last shard merges and reports for the executable.
+            shard_xml_paths = [shards[index][1] for index in range(total_shards)]
+            shard_devices = tuple(dict.fromkeys(device for device, _ in shards.values()))
+            if None in shard_xml_paths:
+                print(f"  Not all shards of '{test_executable_name}' produced results; skipping its report.")
+                check_fail_fast(test_executable_name, False)
+                with outcomes_lock:
+                    outcomes.append((test_executable_name, shard_devices, False))
+            else:
+                report_executable(test_executable_name, shard_xml_paths, shard_devices, device_args)
+
+    def take_unit():
+        if abort_event.is_set():
+            return None
+        try:
+            return work_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def fetch_and_complete_unit(test_executable_name, shard_index, target_id, local_xml_filepath, device_args):
+        # Timed-out units already point at their console results on the host.
+        if local_xml_filepath is not None and not _is_console_results_path(local_xml_filepath):
+            local_xml_filepath = _fetch_test_results(local_xml_filepath, device_args)
+        complete_unit(test_executable_name, shard_index, target_id, local_xml_filepath, device_args)
+
+    def device_worker(target_id):
+        device_args = argparse.Namespace(**vars(args))
+        device_args.target_id = target_id
+        # Held while a test of this worker runs; retries of the previous test, run by
+        # the results stage, take it too, so they never overlap the next test.
+        device_args.execution_slot = threading.Lock()
+        pending_units = [] # Units whose XML results await the bundled pull
+        # Pipelining overlaps each run with pushing the next unit and with fetching
+        # and reporting the previous one, one stage thread each.
+        pipelined = pipeline and not bundle
+        push_stage = ThreadPoolExecutor(max_workers=1) if pipelined else None
+        results_stage = ThreadPoolExecutor(max_workers=1) if pipelined else None
+        results_futures = []
+        try:
+            if bundle:
+                _deploy_test_bundle(test_names, device_args)
+            unit = take_unit()
+            while unit is not None:
+                if device_monitor is not None and device_monitor.overheated(device_args):
+                    work_queue.put(unit) # Left to the cooler devices
+                    if not device_monitor.wait_until_cool(device_args,
+                                                          lambda: abort_event.is_set() or work_queue.empty()):
+                        break
+                    unit = take_unit()
+                    continue
+                test_executable_name, shard_index = unit
+                next_unit = take_unit() if pipelined else None
+                if next_unit is not None:
+                    push_stage.submit(_prefetch_test_deployment, next_unit[0], device_args)
+                unit_label = test_executable_name if shard_index is None else f"{test_executable_name} (shard {shard_index + 1}/{total_shards})"
+                log_verbose(f"[{target_id or 'default'}] Picked up '{unit_label}' "
+                            f"({work_queue.qsize()} remaining in queue)", device_args)
+                with device_args.execution_slot:
+                    local_xml_filepath = _deploy_run_and_fetch(test_executable_name, device_args, shard_index=shard_index,
+                                                               total_shards=total_shards,
+                                                               fetch_results=not (bundle or pipelined))
+                if bundle:
+                    pending_units.append((test_executable_name, shard_index, local_xml_filepath))
+                elif pipelined:
+                    results_futures.append(results_stage.submit(fetch_and_complete_unit, test_executable_name, shard_index,
+                                                                target_id, local_xml_filepath, device_args))
+                else:
+                    complete_unit(test_executable_name, shard_index, target_id, local_xml_filepath, device_args)
+                print("-" * 30) # Separator for each test's output
+
+                unit = next_unit if pipelined else take_unit()
+                if unit is not None and abort_event.is_set():
+                    work_queue.put(unit) # Claimed ahead but never run
+                    unit = None
+
+            for future in results_futures:
+                future.result() # Re-raises errors from the results stage
+
+            if pending_units:
+                # Timed-out units already point at their console results on the host.
+                device_xml_paths = [path for _, _, path in pending_units if path and not _is_console_results_path(path)]
+                fetched_paths = fetch_results_bundle(device_xml_paths, device_args) if device_xml_paths else set()
+                for test_executable_name, shard_index, local_xml_filepath in pending_units:
+                    if local_xml_filepath in device_xml_paths and local_xml_filepath not in fetched_paths:
+                        local_xml_filepath = _console_results_fallback(local_xml_filepath)
+                    complete_unit(test_executable_name, shard_index, target_id, local_xml_filepath, device_args)
+        except FileNotFoundError:
+            # SDB itself is missing; no other worker can make progress either.
+            abort_event.set()
+            raise
+        finally:
+            if pipelined:
+                push_stage.shutdown()
+                results_stage.shutdown()
+
+    slots_per_device = 1 if total_shards == 1 else -(-total_shards // len(target_ids))
+    workers = [target_id for target_id in target_ids for _ in range(slots_per_device)]
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        futures = [executor.submit(device_worker, target_id) for target_id in workers]
+    result_processor.wait()
+    for future in futures:
+        future.result() # Re-raises errors such as a missing SDB executable
+
+    if fail_fast_triggered.is_set():
+        cancelled_tests = set()
+        while not work_queue.empty():
+            cancelled_tests.add(work_queue.get_nowait()[0])
+        cancelled_tests.update(name for name, shards in shard_results.items() if shards and len(shards) < total_shards)
+        if cancelled_tests:
+            print(f"--fail-fast: cancelled {len(cancelled_tests)} test(s): {', '.join(sorted(cancelled_tests))}")
+    return outcomes
+
+
+class RunHistory:
+    """
+    Stores the results of every run in an SQLite database in the host results
+    directory: the duration of each executable, used to predict it for scheduling,
+    and the result and duration of each testcase, read by the 'query' command.
+
+    Executable runs are stored per (executable, --gtest_filter), together with the
+    number of shards they were split into, so that a shard's duration times the
+    shard count estimates the whole executable. Testcase names are interned in the
+    testcases table, so a stored testcase result is a row of numbers, indexed both
+    by testcase (for its history) and by run (for the latest runs).
+    """
+
+    # Number of most recent runs averaged for a prediction
+    PREDICTION_WINDOW = 5
+    # Testcase results are stored as their index in this tuple.
+    RESULTS = ("passed", "failed", "skipped", "timeout", "flaky", "unknown")
+    FAILED_RESULTS = ("failed", "timeout", "flaky")
+
+    def __init__(self, db_path, run_id=None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Device threads and ResultProcessor callbacks share the connection.
+        self._connection = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self.run_id = run_id
+        with self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY,
+                    started_at REAL NOT NULL,
+                    test_pattern TEXT,
+                    gtest_filter TEXT,
+                    target_ids TEXT
+                );
+                CREATE TABLE IF NOT EXISTS executable_runs (
+                    executable TEXT NOT NULL,
+                    gtest_filter TEXT NOT NULL,
+                    target_id TEXT,
+                    shards INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    recorded_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS executable_runs_by_name
+                    ON executable_runs (executable, gtest_filter, recorded_at);
+                CREATE TABLE IF NOT EXISTS testcases (
+                    id INTEGER PRIMARY KEY,
+                    executable TEXT NOT NULL,
+                    suite TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    UNIQUE (executable, suite, name)
+                );
+                CREATE TABLE IF NOT EXISTS testcase_results (
+                    testcase_id INTEGER NOT NULL,
+                    run_id INTEGER NOT NULL,
+                    result INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    PRIMARY KEY (testcase_id, run_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS testcase_results_by_run ON testcase_results (run_id);
+                -- Superseded by testcases/testcase_results
+                DROP TABLE IF EXISTS testcase_durations;
+            """)
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(executable_runs)")]
+            if "run_id" not in columns:
+                self._connection.execute("ALTER TABLE executable_runs ADD COLUMN run_id INTEGER")
+
+    def begin_run(self, test_pattern, gtest_filter, target_ids):
+        """Starts a new run; the results recorded from now on belong to it."""
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (started_at, test_pattern, gtest_filter, target_ids) VALUES (?, ?, ?, ?)",
+                (time.time(), test_pattern, gtest_filter or "", ",".join(target_id or "default" for target_id in target_ids)))
+            self.run_id = cursor.lastrowid
+
+    def record_executable_run(self, executable, gtest_filter, shards, duration, target_id=None):
+        """Records the wall-clock duration of one run of an executable (or of one of its shards)."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO executable_runs (executable, gtest_filter, target_id, shards, duration, recorded_at, run_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (executable, gtest_filter or "", target_id, shards, duration, time.time(), self.run_id))
+
+    def recording_testcases(self, executable, records, batch_size=10000):
+        """
+        Passes records (as yielded by iter_gtest_xml) through unchanged while storing
+        the result and duration of every testcase in the current run, in batches so
+        memory use stays bounded.
+        """
+        batch = []
+        suite_name = "UnknownSuite"
+        for record_type, record in records:
+            if record_type == "testsuite":
+                suite_name = record.get("name", "UnknownSuite")
+            elif self.run_id is not None:
+                batch.append(self.testcase_row(executable, suite_name, record))
+                if len(batch) >= batch_size:
+                    self._insert_testcases(batch)
+                    batch = []
+            yield record_type, record
+        if batch:
+            self._insert_testcases(batch)
+
+    @classmethod
+    def testcase_row(cls, executable, suite_name, record):
+        """Returns the (executable, suite, name, result code, duration) row of a testcase record."""
+        result = record.get("result", "unknown")
+        try:
+            duration = float(record.get("time", "0"))
+        except ValueError:
+            duration = 0.0
+        return (executable, suite_name, record.get("name", "UnknownCase"),
+                cls.RESULTS.index(result if result in cls.RESULTS else "unknown"), duration)
+
+    @classmethod
+    def collecting_testcases(cls, executable, records, rows):
+        """
+        Passes records through unchanged while appending their testcase rows to the
+        list rows, for record_testcases() in the process owning the database (see
+        ResultProcessor).
+        """
+        suite_name = "UnknownSuite"
+        for record_type, record in records:
+            if record_type == "testsuite":
+                suite_name = record.get("name", "UnknownSuite")
+            else:
+                rows.append(cls.testcase_row(executable, suite_name, record))
+            yield record_type, record
+
+    def record_testcases(self, rows, batch_size=10000):
+        """Stores testcase rows collected by collecting_testcases() in the current run."""
+        if self.run_id is None:
+            return
+        for start in range(0, len(rows), batch_size):
+            self._insert_testcases(rows[start:start + batch_size])
+
+    def _insert_testcases(self, rows):
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO testcases (executable, suite, name) VALUES (?, ?, ?)",
+                                         (row[:3] for row in rows))
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO testcase_results (testcase_id, run_id, result, duration) "
+                "SELECT id, ?, ?, ? FROM testcases WHERE executable = ? AND suite = ? AND name = ?",
+                ((self.run_id, result_code, duration, executable, suite, name)
+                 for executable, suite, name, result_code, duration in rows))
+
+    def predicted_duration(self, executable, gtest_filter):
+        """Returns the predicted duration in seconds of a whole executable run, or None if unknown."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT duration * shards FROM executable_runs WHERE executable = ? AND gtest_filter = ? "
+                "ORDER BY recorded_at DESC LIMIT ?",
+                (executable, gtest_filter or "", self.PREDICTION_WINDOW)).fetchall()
+        if not rows:
+            return None
+        return sum(row[0] for row in rows) / len(rows)
+
+    def order_longest_first(self, test_names, gtest_filter):
+        """
+        Returns test_names ordered by predicted duration, longest first. Executables
+        without history come first, since they may well be the longest.
+        """
+        predictions = {name: self.predicted_duration(name, gtest_filter) for name in test_names}
+        return sorted(test_names, key=lambda name: (predictions[name] is not None, -(predictions[name] or 0.0)))
+
+    def _query(self, sql, parameters):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _first_run_id(self, last_runs):
+        """Returns the id of the oldest of the last_runs most recent runs."""
+        return self._query("SELECT COALESCE(MIN(id), 0) FROM (SELECT id FROM runs ORDER BY id DESC LIMIT ?)",
+                           (last_runs,))[0][0]
+
+    def failure_history(self, test_pattern, last_runs):
+        """
+        Returns (run_id, started_at, executable, test, result) rows for the failed,
+        timed-out and flaky results of the testcases whose "Suite.Case" name matches
+        the glob test_pattern in the last_runs most recent runs, newest first.
+        """
+        failed_codes = [self.RESULTS.index(result) for result in self.FAILED_RESULTS]
+        rows = self._query(
+            "SELECT r.id, r.started_at, t.executable, t.suite || '.' || t.name, res.result "
+            "FROM testcases t JOIN testcase_results res ON res.testcase_id = t.id JOIN runs r ON r.id = res.run_id "
+            f"WHERE t.suite || '.' || t.name GLOB ? AND res.run_id >= ? AND res.result IN ({','.join('?' * len(failed_codes))}) "
+            "ORDER BY r.id DESC, t.executable, t.suite, t.name",
+            (test_pattern, self._first_run_id(last_runs), *failed_codes))
+        return [(run_id, started_at, executable, test, self.RESULTS[result])
+                for run_id, started_at, executable, test, result in rows]
+
+    def pass_rate_trend(self, test_pattern, last_runs):
+        """
+        Returns (run_id, started_at, passed, failed, flaky, skipped) rows counting the
+        results of the testcases matching test_pattern in each of the last_runs most
+        recent runs, oldest first. Timed-out testcases count as failed.
+        """
+        codes = {result: self.RESULTS.index(result) for result in self.RESULTS}
+        testcase_filter = "" if test_pattern == "*" else \
+            "AND res.testcase_id IN (SELECT id FROM testcases WHERE suite || '.' || name GLOB ?) "
+        parameters = [codes["passed"], codes["failed"], codes["timeout"], codes["flaky"], codes["skipped"],
+                      self._first_run_id(last_runs)]
+        if test_pattern != "*":
+            parameters.append(test_pattern)
+        return self._query(
+            "SELECT r.id, r.started_at, SUM(res.result = ?), SUM(res.result IN (?, ?)), SUM(res.result = ?), SUM(res.result = ?) "
+            "FROM testcase_results res JOIN runs r ON r.id = res.run_id "
+            f"WHERE res.run_id >= ? {testcase_filter}"
+            "GROUP BY r.id ORDER BY r.id",
+            parameters)
+
+    def slowest_testcases(self, test_pattern, last_runs, limit):
+        """
+        Returns (executable, test, average seconds, maximum seconds, runs) rows for the
+        limit testcases matching test_pattern with the highest average duration in
+        the last_runs most recent runs.
+        """
+        testcase_filter = "" if test_pattern == "*" else "AND t.suite || '.' || t.name GLOB ? "
+        parameters = [self._first_run_id(last_runs)]
+        if test_pattern != "*":
+            parameters.append(test_pattern)
+        parameters.append(limit)
+        return self._query(
+            "SELECT t.executable, t.suite || '.' || t.name, AVG(res.duration), MAX(res.duration), COUNT(*) "
+            "FROM testcase_results res JOIN testcases t ON t.id = res.testcase_id "
+            f"WHERE res.run_id >= ? {testcase_filter}"
+            "GROUP BY res.testcase_id ORDER BY AVG(res.duration) DESC LIMIT ?",
+            parameters)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class IncrementalCache:
+    """
+    Remembers, per test executable and device, the results of the last run that
+    passed, so that --incremental can skip executables that have not changed since.
+
+    A result is reused only if its fingerprint matches: the SHA-256 of the local
+    executable, the device and the --gtest_filter. Copies of the result XML files
+    are kept in results_dir, since the regular result files are overwritten by
+    every run. The index is persisted as JSON on the host.
+    """
+
+    def __init__(self, cache_path, results_dir):
+        self.cache_path = cache_path
+        self.results_dir = results_dir
+        self._lock = threading.Lock()
+        self._entries = {}
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                self._entries = entries
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable incremental cache '{cache_path}': {e}")
+
+    @staticmethod
+    def _entry_key(test_name, target_id):
+        return f"{target_id or 'default'}/{test_name}"
+
+    @staticmethod
+    def fingerprint(test_name, target_id, args):
+        """Returns the fingerprint of running test_name on target_id with the current options."""
+        binary_sha256 = args.push_cache.local_hash(os.path.join(args.test_dir, test_name))
+        fingerprint_source = json.dumps([test_name, binary_sha256, target_id or "default", args.gtest_filter or ""])
+        return hashlib.sha256(fingerprint_source.encode("utf-8")).hexdigest()
+
+    def lookup(self, test_name, target_ids, args):
+        """
+        Returns the cache entry (with "target_id", "recorded_at" and "result_files")
+        of a passed run of the unchanged test_name on one of target_ids, or None.
+        """
+        for target_id in target_ids:
+            with self._lock:
+                entry = self._entries.get(self._entry_key(test_name, target_id))
+            if entry is None:
+                continue
+            try:
+                if entry["fingerprint"] != self.fingerprint(test_name, target_id, args):
+                    continue
+            except OSError:
+                return None
+            if all(os.path.isfile(path) for path in entry["result_files"]):
+                return dict(entry, target_id=target_id)
+        return None
+
+    def update(self, test_name, target_ids, local_xml_filepaths, passed, args):
+        """
+        Records the results of a run of test_name on target_ids if it passed, or
+        forgets any previously recorded results for these devices otherwise.
+        """
+        for target_id in target_ids:
+            entry_key = self._entry_key(test_name, target_id)
+            if not passed:
+                with self._lock:
+                    self._entries.pop(entry_key, None)
+                continue
+            target_dir = os.path.join(self.results_dir, target_id or "default")
+            try:
+                os.makedirs(target_dir, exist_ok=True)
+                result_files = []
+                for local_xml_filepath in local_xml_filepaths:
+                    cached_filepath = os.path.join(target_dir, os.path.basename(local_xml_filepath))
+                    shutil.copyfile(local_xml_filepath, cached_filepath)
+                    result_files.append(cached_filepath)
+                entry = {
+                    "fingerprint": self.fingerprint(test_name, target_id, args),
+                    "recorded_at": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    "result_files": result_files,
+                }
+            except OSError as e:
+                print(f"Warning: Could not cache the results of '{test_name}': {e}")
+                entry = None
+            with self._lock:
+                if entry is None:
+                    self._entries.pop(entry_key, None)
+                else:
+                    self._entries[entry_key] = entry
+
+    def save(self):
+        """Writes the cache index back to disk."""
+        try:
+            with self._lock:
+                serialized = json.dumps(self._entries, indent=1, sort_keys=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                f.write(serialized)
+        except OSError as e:
+            print(f"Warning: Could not write incremental cache '{self.cache_path}': {e}")
+
+
+class TestInventory:
+    """
+    Index of the testcases inside each test executable, built from the executable's
+    '--gtest_list_tests' output and persisted as JSON on the host.
+
+    An executable is listed on the host if it runs there, and otherwise on the
+    device in args.target_id (which requires pushing it first). A listing is reused
+    as long as the executable's size and mtime are unchanged; if they changed but
+    its SHA-256 did not (e.g. a rebuild with identical output), the listing is kept
+    as well. Executables that could not be listed are not cached, so they are
+    retried on the next call.
+    """
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.listed = 0 # Executables whose listing had to be (re)built
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        self._device_unavailable = False
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                self._entries = entries
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable test inventory '{cache_path}': {e}")
+
+    def testcases(self, test_dir, test_names, args):
+        """
+        Returns {test_name: {suite: [case, ...]}} for test_names in test_dir, listing
+        the executables without a current cached listing in parallel. An executable
+        that could not be listed maps to None.
+        """
+        inventory = {}
+        to_list = []
+        for test_name in test_names:
+            local_test_path = os.path.abspath(os.path.join(test_dir, test_name))
+            suites = self._cached_suites(local_test_path)
+            if suites is None:
+                to_list.append((test_name, local_test_path))
+            inventory[test_name] = suites
+        if to_list:
+            log_verbose(f"Listing the testcases of {len(to_list)} executable(s) with --gtest_list_tests", args)
+            with ThreadPoolExecutor(max_workers=min(8, len(to_list))) as executor:
+                listings = executor.map(lambda item: self._list_testcases(item[0], item[1], args), to_list)
+                for (test_name, local_test_path), suites in zip(to_list, listings):
+                    inventory[test_name] = suites
+        return inventory
+
+    def _cached_suites(self, local_test_path):
+        """Returns the cached listing of local_test_path if it is still current, otherwise None."""
+        with self._lock:
+            entry = self._entries.get(local_test_path)
+        if entry is None:
+            return None
+        try:
+            file_stat = os.stat(local_test_path)
+            if entry["size"] == file_stat.st_size and entry["mtime"] == file_stat.st_mtime:
+                return entry["suites"]
+            if entry["size"] != file_stat.st_size or entry["sha256"] != _file_sha256(local_test_path):
+                return None
+        except OSError:
+            return None
+        with self._lock:
+            entry["mtime"] = file_stat.st_mtime
+            self._dirty = True
+        return entry["suites"]
+
+    def _list_testcases(self, test_name, local_test_path, args):
+        try:
+            file_stat = os.stat(local_test_path)
+            sha256 = _file_sha256(local_test_path)
+        except OSError as e:
+            log_verbose(f"Cannot read '{test_name}' to list its testcases: {e}", args)
+            return None
+        output = self._list_on_host(local_test_path, args)
+        if output is None:
+            output = self._list_on_device(test_name, local_test_path, args)
+        if output is None:
+            return None
+        suites = parse_gtest_list_tests(output)
+        with self._lock:
+            self.listed += 1
+            self._entries[local_test_path] = {"size": file_stat.st_size, "mtime": file_stat.st_mtime,
+                                              "sha256": sha256, "suites": suites}
+            self._dirty = True
+        return suites
+
+    def _list_on_host(self, local_test_path, args):
+        """Returns the --gtest_list_tests output of running the executable on the host, or None."""
+        try:
+            result = subprocess.run([local_test_path, "--gtest_list_tests"], capture_output=True, text=True,
+                                    errors="replace", timeout=INVENTORY_LIST_TIMEOUT, check=False)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            # E.g. "Exec format error" for executables built for the device.
+            log_verbose(f"Cannot list '{os.path.basename(local_test_path)}' on the host: {e}", args, level=2)
+            return None
+        if result.returncode != 0:
+            log_verbose(f"Listing '{os.path.basename(local_test_path)}' on the host failed "
+                        f"with exit code {result.returncode}", args, level=2)
+            return None
+        return result.stdout
+
+    def _list_on_device(self, test_name, local_test_path, args):
+        """Returns the --gtest_list_tests output of running the executable on the device, or None."""
+        with self._lock:
+            if self._device_unavailable:
+                return None
+        remote_test_executable_path = os.path.join(DEFAULT_REMOTE_TEST_DIR, "bin", test_name)
+        try:
+            _ensure_test_deployed(local_test_path, remote_test_executable_path, args)
+            list_cmd = f"chmod +x {remote_test_executable_path} && {remote_test_executable_path} --gtest_list_tests"
+            result = execute_sdb_command([SDB_EXECUTABLE, "shell", list_cmd], args)
+        except FileNotFoundError as e:
+            # Without SDB no other executable can be listed on the device either.
+            with self._lock:
+                self._device_unavailable = True
+            log_verbose(f"Cannot list tests on the device: {e}", args)
+            return None
+        except RuntimeError as e:
+            log_verbose(f"Listing '{test_name}' on the device failed: {e}", args)
+            return None
+        return result.stdout
+
+    def save(self):
+        """Writes the inventory back to disk if it changed."""
+        try:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                serialized = json.dumps(self._entries, indent=1, sort_keys=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                f.write(serialized)
+        except OSError as e:
+            print(f"Warning: Could not write test inventory '{self.cache_path}': {e}")
+
+
+def _file_sha256(path):
+    """Returns the SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_gtest_list_tests(output):
+    """
+    Parses the output of a GTest executable's '--gtest_list_tests' into
+    {suite: [case, ...]}. Suites are unindented lines ending in '.', their cases
+    the indented lines below; '# GetParam() = ...' style comments are dropped.
+    """
+    suites = {}
+    cases = None
+    for line in output.splitlines():
+        name = line.split("#", 1)[0].rstrip()
+        if not name.strip():
+            continue
+        if not line[0].isspace():
+            cases = suites.setdefault(name[:-1], []) if name.endswith(".") else None
+        elif cases is not None:
+            cases.append(name.strip())
+    return suites
+
+
+def gtest_filter_matcher(gtest_filter):
+    """
+    Returns a function telling whether a "Suite.Case" name is selected by
+    gtest_filter, following GTest's rules: ':'-separated positive patterns, then
+    optionally '-' and negative patterns, with '*' and '?' as wildcards. Disabled
+    testcases (DISABLED_ prefix on the suite or case) are never selected, as GTest
+    does not run them by default.
+    """
+    positive, _, negative = (gtest_filter or "*").partition("-")
+
+    def compile_patterns(patterns):
+        regexes = [re.escape(pattern).replace(r"\*", ".*").replace(r"\?", ".") for pattern in patterns.split(":") if pattern]
+        return re.compile(f"^(?:{'|'.join(regexes)})$") if regexes else None
+
+    positive_re = compile_patterns(positive or "*")
+    negative_re = compile_patterns(negative)
+
+    def matches(full_name):
+        suite_name, _, case_name = full_name.partition(".")
+        if suite_name.startswith("DISABLED_") or case_name.startswith("DISABLED_"):
+            return False
+        return bool(positive_re.match(full_name)) and not (negative_re and negative_re.match(full_name))
+    return matches
+
+
+def selected_testcases(suites, gtest_filter):
+    """Returns the "Suite.Case" names in a listing (see parse_gtest_list_tests) selected by gtest_filter."""
+    matches = gtest_filter_matcher(gtest_filter)
+    return [full_name for full_name in (f"{suite}.{case}" for suite, cases in suites.items() for case in cases)
+            if matches(full_name)]
+
+
+def _report_cached_results(cached_results, args):
+    """
+    Writes the reports of the executables skipped by --incremental from their cached
+    results, marked as such. Returns their (test_name, (), succeeded) outcomes.
+    """
+    # Cached results are already in the run history.
+    report_args = argparse.Namespace(**vars(args))
+    report_args.run_history = None
+    outcomes = []
+    for test_name, entry in cached_results.items():
+        print(f"Reporting cached results of '{test_name}'")
+        note = (f"Cached results: '{test_name}' is unchanged since it passed on "
+                f"{entry['target_id'] or 'the default device'} at {entry['recorded_at']} and was not run again.")
+        tally = ResultTally()
+        succeeded = _report_test_results(test_name, entry["result_files"], report_args, tally=tally, note=note)
+        if getattr(args, "result_processor", None) is not None:
+            args.result_processor.summary.add(test_name, tally)
+        outcomes.append((test_name, (), succeeded))
+    return outcomes
+
+
+class DeploymentTracker:
+    """
+    Remembers which executables were deployed to which device during one run
+    (args.deployments), and serializes pushes of the same executable to the same
+    device, so that concurrent shards neither push it twice nor overwrite it while
+    another shard is running it.
+    """
+
+    def __init__(self):
+        self.deployed = set() # (target_id, remote path)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def lock(self, deploy_key):
+        """Returns the lock serializing deployments of deploy_key."""
+        with self._locks_guard:
+            return self._locks.setdefault(deploy_key, threading.Lock())
+
+
+def _deployments(args):
+    """
+    Returns the DeploymentTracker of the run in args, or a new one that tracks a
+    single deployment if the caller did not set up args.deployments.
+    """
+    deployments = getattr(args, "deployments", None)
+    return deployments if deployments is not None else DeploymentTracker()
+
+
+def _ensure_test_deployed(local_test_path, remote_test_executable_path, args):
+    """
+    Pushes a test executable to the device in args.target_id once per run (see
+    DeploymentTracker). Pushes are skipped when the push cache shows the device
+    already has an identical copy, unless --force-push is given.
+    """
+    deployments = _deployments(args)
+    deploy_key = (args.target_id, remote_test_executable_path)
+    with deployments.lock(deploy_key):
+        if deploy_key in deployments.deployed:
+            log_verbose(f"'{os.path.basename(local_test_path)}' already deployed in this run; skipping push.", args)
+            return
+        push_cache = getattr(args, "push_cache", None)
+        if push_cache is None:
+            push_file_to_device(local_test_path, remote_test_executable_path, args)
+        elif not args.force_push and push_cache.is_current(local_test_path, remote_test_executable_path, args):
+            log_verbose(f"'{os.path.basename(local_test_path)}' is unchanged on the device; skipping push.", args)
+        else:
+            push_file_to_device(local_test_path, remote_test_executable_path, args)
+            push_cache.record_push(local_test_path, remote_test_executable_path, args)
+        deployments.deployed.add(deploy_key)
+
+
+def _deploy_test_bundle(test_names, args):
+    """
+    Deploys test executables to the device in args.target_id with a single archive:
+    the executables that are not already current on the device are packed into one
+    compressed tarball on the host, pushed with one 'sdb push' and unpacked and made
+    executable with one shell command.
+
+    Executables deployed this way are skipped by _ensure_test_deployed(). If the
+    bundle cannot be deployed, they are left to be pushed individually.
+    """
+    remote_bin_dir = os.path.join(DEFAULT_REMOTE_TEST_DIR, "bin")
+    deployments = _deployments(args)
+    bundle_key = (args.target_id, "<bundle>")
+    with deployments.lock(bundle_key):
+        if bundle_key in deployments.deployed:
+            return # Another worker on this device already deployed the bundle
+
+        push_cache = getattr(args, "push_cache", None)
+        to_push = []
+        for test_name in test_names:
+            local_test_path = os.path.join(args.test_dir, test_name)
+            remote_test_executable_path = os.path.join(remote_bin_dir, test_name)
+            if not os.path.isfile(local_test_path):
+                continue # Reported when the test itself is run
+            if push_cache is not None and not args.force_push and push_cache.is_current(local_test_path, remote_test_executable_path, args):
+                deployments.deployed.add((args.target_id, remote_test_executable_path))
+            else:
+                to_push.append((test_name, local_test_path, remote_test_executable_path))
+        deployments.deployed.add(bundle_key)
+
+        if not to_push:
+            log_verbose("All test executables are already current on the device; no bundle needed.", args)
+            return
+
+        remote_bundle_path = os.path.join(DEFAULT_REMOTE_TEST_DIR, TEST_BUNDLE_FILENAME)
+        fd, local_bundle_path = tempfile.mkstemp(suffix=".tar.gz", prefix="vts_bundle_")
+        os.close(fd)
+        try:
+            with tarfile.open(local_bundle_path, "w:gz") as bundle:
+                for test_name, local_test_path, _ in to_push:
+                    bundle.add(local_test_path, arcname=test_name)
+            log_verbose(f"Deploying {len(to_push)} test executable(s) as one bundle "
+                        f"({os.path.getsize(local_bundle_path)} bytes)", args)
+
+            with _profile_stage(args, "mkdir", TEST_BUNDLE_FILENAME):
+                execute_sdb_command([SDB_EXECUTABLE, "shell", f"mkdir -p {remote_bin_dir}"], args)
+            with _profile_stage(args, "push", TEST_BUNDLE_FILENAME, nbytes=os.path.getsize(local_bundle_path)):
+                execute_sdb_command([SDB_EXECUTABLE, "push", local_bundle_path, remote_bundle_path], args)
+            remote_paths = " ".join(remote_path for _, _, remote_path in to_push)
+            unpack_cmd = (f"tar -xzf {remote_bundle_path} -C {remote_bin_dir} && "
+                          f"chmod +x {remote_paths} && rm -f {remote_bundle_path}")
+            with _profile_stage(args, "chmod", TEST_BUNDLE_FILENAME):
+                execute_sdb_command([SDB_EXECUTABLE, "shell", unpack_cmd], args)
+        except RuntimeError as e:
+            print(f"  Warning: Bundled deployment failed, falling back to individual pushes: {e}")
+            return
+        finally:
+            os.remove(local_bundle_path)
+
+        for test_name, local_test_path, remote_test_executable_path in to_push:
+            if push_cache is not None:
+                push_cache.record_push(local_test_path, remote_test_executable_path, args)
+            deployments.deployed.add((args.target_id, remote_test_executable_path))
+        print(f"  Deployed {len(to_push)} test executable(s) to '{args.target_id or 'default device'}' in one bundle.")
+
+
+def _deploy_run_and_fetch(test_executable_name, args, shard_index=None, total_shards=1, fetch_results=True,
+                          retry_attempt=None):
+    """
+    Pushes a test executable, runs it (or one of its GTest shards) on the device and
+    fetches the XML results to the host.
+    Returns the local path of the fetched XML file, or None if any step failed.
+    With fetch_results=False the XML is left on the device and the returned path is
+    where fetch_results_bundle() or _fetch_test_results() will place it. Results of a retry_attempt are kept
+    in a separate file, and its duration is not recorded in the run history.
+    """
+    # Create a copy of args for this specific test run to correctly set 'test_name' attribute
+    # This 'test_name' is used by some underlying functions implicitly.
+    current_run_args = argparse.Namespace(**vars(args))
+    current_run_args.test_name = test_executable_name 
+
+    local_test_path = os.path.join(current_run_args.test_dir, current_run_args.test_name)
+
+    log_verbose(f"Starting workflow for test: {current_run_args.test_name}", current_run_args)
+    log_verbose(f"Local path: {os.path.abspath(local_test_path)}", current_run_args)
+
+    if not os.path.isfile(local_test_path):
+        print(f"  Error: Test executable '{current_run_args.test_name}' not found at '{os.path.abspath(local_test_path)}'. Skipping.")
+        return None
+    mode = os.stat(local_test_path).st_mode
+    if not (mode & stat.S_IXUSR):
+        print(f"  Error: Test '{current_run_args.test_name}' at '{local_test_path}' is not executable. Skipping.")
+        return None
+    
+    remote_test_executable_path = os.path.join(DEFAULT_REMOTE_TEST_DIR, "bin", current_run_args.test_name)
+    
+    try:
+        _ensure_test_deployed(local_test_path, remote_test_executable_path, current_run_args)
+
+        test_base_name = os.path.splitext(current_run_args.test_name)[0]
+        if retry_attempt is not None:
+            remote_xml_filename = f"{test_base_name}_retry{retry_attempt}_results.xml"
+        elif shard_index is None:
+            remote_xml_filename = f"{test_base_name}_results.xml"
+        else:
+            remote_xml_filename = f"{test_base_name}_shard{shard_index}_results.xml"
+        local_xml_filepath = os.path.join(current_run_args.host_results_dir, remote_xml_filename)
+        # Only console results of this run may stand in for XML results that cannot be fetched.
+        try:
+            os.remove(_console_results_path(local_xml_filepath))
+        except FileNotFoundError:
+            pass
+        run_started = time.monotonic()
+        with _telemetry_sampling(current_run_args) as telemetry_samples:
+            console_results = run_test_on_device(remote_test_executable_path, DEFAULT_REMOTE_RESULTS_DIR,
+                                                 remote_xml_filename, current_run_args, shard_index=shard_index,
+                                                 total_shards=total_shards)
+        log_verbose(f"Test '{current_run_args.test_name}' execution completed on device.", current_run_args)
+        if telemetry_samples is not None:
+            # Written even without samples, so no stale samples of an earlier run are reported.
+            current_run_args.device_monitor.write_samples(_telemetry_path(local_xml_filepath), telemetry_samples,
+                                                          current_run_args)
+        # A retry only runs the failed testcases, so its duration predicts nothing.
+        if retry_attempt is None and getattr(current_run_args, "run_history", None) is not None:
+            current_run_args.run_history.record_executable_run(current_run_args.test_name, current_run_args.gtest_filter,
+                                                               total_shards, time.monotonic() - run_started,
+                                                               current_run_args.target_id)
+
+        if console_results is not None and console_results.cases:
+            # Kept as a fallback in case the XML cannot be fetched.
+            console_results.write_xml(_console_results_path(local_xml_filepath))
+            if console_results.timed_out:
+                # A killed test writes no (or only partial) XML; the console results are complete.
+                print(f"  '{current_run_args.test_name}' timed out; reporting the results parsed from its console output.")
+                return _console_results_path(local_xml_filepath)
+
+        if not fetch_results:
+            return local_xml_filepath
+        return _fetch_test_results(local_xml_filepath, current_run_args) # None fails the workflow for this test.
+
+    except RuntimeError as e:
+        print(f"  Error during SDB operation or test execution for '{current_run_args.test_name}': {e}") # Keep non-verbose
+        return None
+    except FileNotFoundError as e: # Specifically for SDB executable not found
+        print(f"  Error: SDB executable ('{current_run_args.sdb_path or SDB_EXECUTABLE}') not found. Aborting all tests.")
+        raise # Re-raise to stop the entire run_test_action
+
+
+def _fetch_test_results(local_xml_filepath, args):
+    """
+    Fetches the XML results of a test run on the device to local_xml_filepath.
+    Returns local_xml_filepath, the console-derived results if the fetch failed and
+    they exist, or None.
+    """
+    device_agents = getattr(args, "device_agents", None)
+    if device_agents is not None and device_agents.take_received_results(args.target_id, local_xml_filepath):
+        log_verbose(f"Results XML received from the device agent: {local_xml_filepath}", args)
+        # Received while the test ran, so the transfer time is part of "execute".
+        with _profile_stage(args, "pull", os.path.basename(local_xml_filepath),
+                            nbytes=os.path.getsize(local_xml_filepath)):
+            pass
+        return local_xml_filepath
+    remote_xml_filepath = os.path.join(DEFAULT_REMOTE_RESULTS_DIR, os.path.basename(local_xml_filepath))
+    if fetch_file_from_device(remote_xml_filepath, local_xml_filepath, args):
+        log_verbose(f"Results XML fetched to {local_xml_filepath}", args)
+        return local_xml_filepath
+    print(f"  Failed to fetch test results XML from '{remote_xml_filepath}'.") # Keep non-verbose
+    return _console_results_fallback(local_xml_filepath)
+
+
+def _prefetch_test_deployment(test_executable_name, args):
+    """
+    Pushes a test executable to the device ahead of its run. Problems are not reported
+    here; _deploy_run_and_fetch() runs into and reports them when the test is run.
+    """
+    local_test_path = os.path.join(args.test_dir, test_executable_name)
+    if not (os.path.isfile(local_test_path) and os.access(local_test_path, os.X_OK)):
+        return
+    log_verbose(f"Pushing '{test_executable_name}' ahead of its run", args)
+    try:
+        _ensure_test_deployed(local_test_path, os.path.join(DEFAULT_REMOTE_TEST_DIR, "bin", test_executable_name), args)
+    except (RuntimeError, FileNotFoundError) as e:
+        log_verbose(f"Early push of '{test_executable_name}' failed: {e}", args)
+
+
+def _retry_failed_tests(test_executable_name, local_xml_filepaths, args):
+    """
+    Re-runs only the failed testcases of an executable, selected with --gtest_filter,
+    up to args.retries times, and classifies them.
+
+    Returns a dict mapping the full name ("Suite.Case") of every failed testcase to
+    ("flaky", attempt) if it passed in the given retry attempt or to
+    ("failed", attempts) if it failed in all attempts. Returns None if there was
+    nothing to retry.
+
+    Each attempt holds args.execution_slot (see _run_tests_on_devices) while it
+    runs, so a retry started by the pipelined results stage waits for the test the
+    device is running and delays the next one.
+    """
+    tally = ResultTally()
+    try:
+        for local_xml_filepath in local_xml_filepaths:
+            for _ in tally.track(iter_gtest_xml(local_xml_filepath)):
+                pass
+    except (FileNotFoundError, ET.ParseError, ValueError):
+        return None # Reported by _report_test_results()
+    if not tally.failed_tests:
+        return None
+    if len(tally.failed_tests) > RETRY_MAX_FAILED_TESTS:
+        print(f"  Not retrying '{test_executable_name}': {len(tally.failed_tests)} testcases failed "
+              f"(more than {RETRY_MAX_FAILED_TESTS}).")
+        return None
+
+    retry_results = {}
+    remaining_tests = list(dict.fromkeys(tally.failed_tests))
+    for attempt in range(1, args.retries + 1):
+        if not remaining_tests:
+            break
+        print(f"  Retrying {len(remaining_tests)} failed testcase(s) of '{test_executable_name}' "
+              f"(attempt {attempt}/{args.retries})")
+        retry_args = argparse.Namespace(**vars(args))
+        retry_args.gtest_filter = ":".join(remaining_tests)
+        with getattr(args, "execution_slot", None) or contextlib.nullcontext():
+            retry_xml_filepath = _deploy_run_and_fetch(test_executable_name, retry_args, retry_attempt=attempt)
+        if retry_xml_filepath is None:
+            continue
+        passed_tests = set()
+        try:
+            suite_name = "UnknownSuite"
+            for record_type, record in iter_gtest_xml(retry_xml_filepath):
+                if record_type == "testsuite":
+                    suite_name = record["name"]
+                elif record["result"] == "passed":
+                    passed_tests.add(f"{suite_name}.{record['name']}")
+        except (FileNotFoundError, ET.ParseError, ValueError) as e:
+            print(f"  Failed to parse the retry results of '{test_executable_name}': {e}")
+        for test in remaining_tests:
+            if test in passed_tests:
+                retry_results[test] = ("flaky", attempt)
+        remaining_tests = [test for test in remaining_tests if test not in passed_tests]
+
+    for test in remaining_tests:
+        retry_results[test] = ("failed", args.retries)
+    flaky_count = sum(1 for classification, _ in retry_results.values() if classification == "flaky")
+    print(f"  Retries of '{test_executable_name}': {flaky_count} flaky, "
+          f"{len(remaining_tests)} consistently failing.")
+    return retry_results
+
+
+def _apply_retry_results(records, retry_results):
+    """
+    Marks the failed testcases in records (see iter_gtest_xml) that passed on retry
+    as "flaky", and notes the number of attempts on those that kept failing.
+    """
+    suite_name = "UnknownSuite"
+    for record_type, record in records:
+        if record_type == "testsuite":
+            suite_name = record.get("name", "UnknownSuite")
+        else:
+            retry_result = retry_results.get(f"{suite_name}.{record.get('name', 'UnknownCase')}")
+            if retry_result is not None and record.get("result") in ("failed", "timeout"):
+                classification, attempts = retry_result
+                failure = dict(record.get("failure") or {})
+                if classification == "flaky":
+                    prefix = f"Flaky: passed on retry {attempts}. First failure:"
+                    record = dict(record, result="flaky")
+                else:
+                    prefix = f"Consistently failing: failed in all {attempts + 1} attempts. First failure:"
+                failure["message"] = f"{prefix}\n{failure.get('message', 'No message')}"
+                record = dict(record, failure=failure)
+        yield record_type, record
+
+
+def _console_results_path(local_xml_filepath):
+    """Returns where results parsed from the console output are kept for a result file."""
+    return local_xml_filepath.replace("_results.xml", "_console_results.xml")
+
+
+def _is_console_results_path(local_xml_filepath):
+    """Returns True if local_xml_filepath holds results parsed from console output."""
+    return local_xml_filepath.endswith("_console_results.xml")
+
+
+def _console_results_fallback(local_xml_filepath):
+    """
+    Returns the path of the console-derived results for local_xml_filepath if the
+    test was run with --stream and they exist, otherwise None. Console results of
+    earlier runs are removed when a run starts (see _deploy_run_and_fetch), so only
+    those of the current run are used.
+    """
+    console_xml_filepath = _console_results_path(local_xml_filepath)
+    if not os.path.isfile(console_xml_filepath):
+        return None
+    print(f"  Using results parsed from the console output instead: {console_xml_filepath}")
+    return console_xml_filepath
+
+
+def _report_test_results(test_executable_name, local_xml_filepaths, args, tally=None, note=None, retry_results=None):
+    """
+    Writes the HTML report of one test executable from its fetched XML result file(s).
+    A single file is streamed straight into the report; several files (one per GTest
+    shard) are merged into a single result first.
+    If given, tally (a ResultTally) counts the reported results, note is shown at
+    the top of the report and retry_results (see _retry_failed_tests) classify the
+    failed testcases. With args.junit_dir set, the results are also written there as
+    a JUnit fragment (see JUnitFragmentWriter); with args.executable_reports unset,
+    they are only tallied and no HTML report is written.
+    With args.telemetry_interval set, the device telemetry sampled during the run(s)
+    is shown as timelines in the report and kept in the tally.
+    Returns True unless the results could not be reported at all.
+    """
+    telemetry = []
+    if getattr(args, "telemetry_interval", None):
+        for index, local_xml_filepath in enumerate(local_xml_filepaths):
+            run_telemetry = load_telemetry(_telemetry_path(local_xml_filepath))
+            if run_telemetry is not None:
+                label = run_telemetry["device"] if len(local_xml_filepaths) == 1 else f"shard {index + 1} ({run_telemetry['device']})"
+                telemetry.append(dict(run_telemetry, label=label))
+    if tally is not None:
+        tally.telemetry = telemetry
+    report_filepath = None
+
+    if len(local_xml_filepaths) == 1:
+        log_verbose(f"Parsing XML result file: {local_xml_filepaths[0]}", args)
+        results = iter_gtest_xml(local_xml_filepaths[0])
+    else:
+        parsed_shards = []
+        for local_xml_filepath in local_xml_filepaths:
+            log_verbose(f"Parsing XML result file: {local_xml_filepath}", args)
+            parsed_shards.append(parse_gtest_xml(local_xml_filepath))
+        results = merge_gtest_results(parsed_shards) if all(parsed_shards) else None
+
+    try:
+        if results is None:
+            raise ValueError("one or more shard results could not be parsed")
+        if isinstance(results, dict):
+            results = iter_parsed_results(results)
+        if retry_results:
+            results = _apply_retry_results(results, retry_results)
+        if getattr(args, "run_history", None) is not None:
+            results = args.run_history.recording_testcases(test_executable_name, results)
+        elif getattr(args, "testcase_rows", None) is not None:
+            results = RunHistory.collecting_testcases(test_executable_name, results, args.testcase_rows)
+        if tally is not None:
+            results = tally.track(results)
+        junit_filepath = None
+        if getattr(args, "junit_dir", None):
+            junit_filepath = os.path.join(args.junit_dir, f"{test_executable_name}.xml")
+            results = JUnitFragmentWriter(junit_filepath, test_executable_name).writing(results)
+        if getattr(args, "profiler", None) is not None:
+            results = args.profiler.timed_records(results, test_executable_name, args.target_id)
+        if not getattr(args, "executable_reports", True):
+            with _profile_stage(args, "report", test_executable_name):
+                for _ in results:
+                    pass
+            if tally is not None:
+                tally.junit_filepath = junit_filepath
+            return True
+        report_filepath = create_timestamped_file(args.host_results_dir,
+                                                  f"{os.path.splitext(test_executable_name)[0]}_report", ".html")
+        log_verbose(f"Generating HTML report: {report_filepath}", args)
+        with _profile_stage(args, "report", test_executable_name):
+            generate_html_report(results, report_filepath, note=note, telemetry=telemetry)
+        if tally is not None:
+            tally.report_filepath = report_filepath
+            tally.junit_filepath = junit_filepath
+        print(f"  HTML Test Report generated at: {os.path.abspath(report_filepath)}") # Keep non-verbose
+    except (FileNotFoundError, ET.ParseError, ValueError) as e:
+        print(f"  Failed to parse GTest XML results for '{test_executable_name}': {e}") # Keep non-verbose
+        # Consider returning False here if parsing is critical for success
+        if report_filepath is not None and os.path.isfile(report_filepath) and not os.path.getsize(report_filepath):
+            os.remove(report_filepath) # Only reserved the report's name
+    except OSError as e:
+        print(f"  Error creating the HTML report for '{test_executable_name}': {e}")
+
+    return True # Workflow for this test succeeded
+
+
+class ResultProcessor:
+    """
+    Parses fetched XML results and writes their HTML reports in a pool of worker
+    processes, so that this CPU-bound work neither competes for the GIL with the
+    threads driving the devices nor delays their next push or run.
+
+    Results are submitted as soon as they are fetched; on_done is called with
+    (succeeded, tally) once an executable has been reported. Only the small
+    ResultTally of each executable comes back from the workers, and these are
+    folded into the run's summary (see RunSummary). With workers=0 (or if no pool
+    can be started), results are processed in the submitting thread.
+
+    Workers never open the run history database: they return the testcase rows of
+    each executable, which are stored through the run's own RunHistory. They are
+    started by a fork server (or spawned), not forked from the harness, whose
+    device threads may hold locks at any moment that a forked child would inherit.
+    """
+
+    def __init__(self, workers, args):
+        self.summary = RunSummary()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._executor = None
+        if workers:
+            try:
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(max_workers=workers,
+                                                     mp_context=multiprocessing.get_context(start_method))
+            except (OSError, NotImplementedError, ValueError) as e:
+                print(f"Warning: Cannot start result processing workers, processing results inline: {e}")
+        self._run_history = getattr(args, "run_history", None)
+        self._profiler = getattr(args, "profiler", None)
+
+    def submit(self, test_executable_name, local_xml_filepaths, args, retry_results=None, note=None, on_done=None):
+        """Reports the results of one executable (see _report_test_results)."""
+        with self._lock:
+            self._pending += 1
+        if self._executor is None:
+            tally = ResultTally()
+            try:
+                succeeded = _report_test_results(test_executable_name, local_xml_filepaths, args, tally=tally,
+                                                 note=note, retry_results=retry_results)
+            except Exception:
+                self._finish(test_executable_name, False, None, on_done)
+                raise
+            self._finish(test_executable_name, succeeded, tally, on_done)
+            return
+
+        worker_args = argparse.Namespace(host_results_dir=args.host_results_dir, verbose=args.verbose,
+                                         target_id=args.target_id, junit_dir=getattr(args, "junit_dir", None),
+                                         executable_reports=getattr(args, "executable_reports", True),
+                                         telemetry_interval=getattr(args, "telemetry_interval", None))
+        profiler_started = self._profiler.started if self._profiler is not None else None
+        future = self._executor.submit(_process_results_in_worker, test_executable_name, list(local_xml_filepaths),
+                                       worker_args, retry_results, note, self._run_history is not None,
+                                       profiler_started)
+        future.add_done_callback(lambda done: self._collect(test_executable_name, done, on_done))
+
+    def _collect(self, test_executable_name, future, on_done):
+        try:
+            succeeded, tally, spans, testcase_rows = future.result()
+        except Exception as e:
+            print(f"  Failed to process the results of '{test_executable_name}': {e}")
+            succeeded, tally, spans, testcase_rows = False, None, [], None
+        if testcase_rows:
+            try:
+                self._run_history.record_testcases(testcase_rows)
+            except sqlite3.Error as e:
+                print(f"  Warning: Cannot record the testcases of '{test_executable_name}' in the run history: {e}")
+        if spans and self._profiler is not None:
+            self._profiler.merge_spans(spans)
+        self._finish(test_executable_name, succeeded, tally, on_done)
+
+    def _finish(self, test_executable_name, succeeded, tally, on_done):
+        try:
+            if tally is not None:
+                with self._lock:
+                    self.summary.add(test_executable_name, tally)
+            if on_done is not None:
+                on_done(succeeded, tally)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._idle.notify_all()
+
+    def wait(self):
+        """Waits until all submitted results have been reported."""
+        with self._lock:
+            while self._pending:
+                self._idle.wait()
+
+    def close(self):
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+def _process_results_in_worker(test_executable_name, local_xml_filepaths, args, retry_results, note, record_history,
+                               profiler_started):
+    """
+    Reports the results of one executable in a ResultProcessor worker process.
+    With record_history, the testcase rows for the run history are collected (see
+    RunHistory.collecting_testcases). Returns (succeeded, tally, profiler spans,
+    testcase rows or None).
+    """
+    threading.current_thread().name = f"ResultWorker-{os.getpid()}"
+    args.run_history = None
+    args.testcase_rows = [] if record_history else None
+    args.profiler = StageProfiler(started=profiler_started) if profiler_started is not None else None
+    tally = ResultTally()
+    succeeded = _report_test_results(test_executable_name, local_xml_filepaths, args, tally=tally,
+                                     note=note, retry_results=retry_results)
+    return succeeded, tally, args.profiler.spans if args.profiler is not None else [], args.testcase_rows
+
+
+def execute_sdb_command(sdb_cmd_list, args, check=True, output_callback=None, on_process_start=None):
+    """
+    Executes an SDB command using subprocess.
+
+    Plain 'shell <command>' invocations are sent over a persistent SDB shell session
+    when one is available (see SdbSessionPool); any other command, or a shell
+    command whose session fails, runs as a separate SDB process.
+
+    Args:
+        sdb_cmd_list (list): The SDB command and its arguments as a list of strings.
+                             The first element should be the SDB executable.
+        args: Parsed command-line arguments, used to access sdb_path and target_id.
+        check (bool): If True, raises RuntimeError if the command fails.
+        output_callback (callable): If given, called with each line of stdout as soon
+                                    as it is read, while the command is still running.
+        on_process_start (callable): If given, the command always runs as its own SDB
+                                     process, which is passed to this callback once
+                                     started (e.g. so that it can be killed).
+
+    Returns:
+        subprocess.CompletedProcess: The result of the command execution.
+
+    Raises:
+        RuntimeError: If the SDB command returns a non-zero exit code and check is True.
+        FileNotFoundError: If the SDB executable is not found.
+    """
+    effective_sdb_executable = args.sdb_path or SDB_EXECUTABLE
+    
+    # Base command
+    full_cmd = [effective_sdb_executable]
+
+    # Add target ID if specified
+    if args.target_id:
+        full_cmd.extend(["-s", args.target_id])
+    
+    # Add the rest of the SDB command (already includes sdb_executable placeholder)
+    full_cmd.extend(sdb_cmd_list[1:])
+
+    process = None
+    session_pool = getattr(args, "sdb_sessions", None)
+    if (session_pool is not None and on_process_start is None and session_pool.available(args.target_id)
+            and len(sdb_cmd_list) == 3 and sdb_cmd_list[1] == "shell"):
+        log_verbose(f"Executing SDB (persistent shell): {' '.join(full_cmd)}", args, level=1)
+        process = session_pool.run(sdb_cmd_list[2], args, output_callback=output_callback) # None if the session is unusable
+
+    if process is None:
+        log_verbose(f"Executing SDB: {' '.join(full_cmd)}", args, level=1)
+        if getattr(args, "profiler", None) is not None:
+            args.profiler.count_sdb_process(args.target_id)
+        try:
+            if output_callback is None and on_process_start is None:
+                process = subprocess.run(full_cmd, capture_output=True, text=True, check=False)
+            else:
+                process = _run_streaming_subprocess(full_cmd, output_callback, on_process_start)
+        except FileNotFoundError:
+            # This exception is raised if SDB_EXECUTABLE itself is not found
+            raise FileNotFoundError(f"SDB executable not found at '{effective_sdb_executable}'. "
+                                    "Please ensure it's in your PATH or specify it with --sdb-path.")
+
+    if process.stderr and args.verbose > 1:
+        log_verbose(f"SDB STDERR for command {' '.join(full_cmd)}:\n{process.stderr.strip()}", args, level=2)
+    
+    if check and process.returncode != 0:
+        error_message = (
+            f"SDB command failed with exit code {process.returncode}.\n"
+            f"Command: {' '.join(full_cmd)}\n"
+            f"Stdout: {process.stdout.strip()}\n"
+            f"Stderr: {process.stderr.strip()}" # Stderr is included here for all users on error
+        )
+        raise RuntimeError(error_message)
+    return process
+
+
+def _run_streaming_subprocess(full_cmd, output_callback=None, on_process_start=None):
+    """
+    Runs a command like subprocess.run(capture_output=True), but passes every line
+    of stdout to output_callback as soon as it is read, and the started process to
+    on_process_start.
+    """
+    process = subprocess.Popen(full_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, bufsize=1, errors="replace")
+    if on_process_start is not None:
+        on_process_start(process)
+    stderr_chunks = []
+    # stderr is drained in the background so a chatty command cannot block on it.
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    stderr_reader.start()
+    stdout_lines = []
+    for line in process.stdout:
+        stdout_lines.append(line)
+        if output_callback is not None:
+            output_callback(line)
+    process.wait()
+    stderr_reader.join()
+    return subprocess.CompletedProcess(full_cmd, process.returncode, stdout="".join(stdout_lines), stderr="".join(stderr_chunks))
+
+
+class SdbSessionError(Exception):
+    """Raised when a persistent SDB shell session can no longer be used."""
+
+
+class SdbShellSession:
+    """
+    A long-lived 'sdb shell' process for one target, over which shell commands are
+    run one at a time instead of spawning a new SDB process for each of them.
+
+    Every command is followed by an 'echo' of a per-session sentinel and the
+    command's exit status, so the output of each command can be framed and its exit
+    code recovered. The sentinel is split by quotes in the command text, so an
+    echoed command line (interactive shells echo input) never matches it.
+    The command's stderr is merged into its stdout.
+    """
+
+    _SENTINEL_PREFIX = "__VTS_DONE_"
+
+    def __init__(self, args):
+        self.target_id = args.target_id
+        session_cmd = [args.sdb_path or SDB_EXECUTABLE]
+        if args.target_id:
+            session_cmd.extend(["-s", args.target_id])
+        session_cmd.append("shell")
+
+        self._sentinel = f"{self._SENTINEL_PREFIX}{os.urandom(8).hex()}"
+        self._lines = queue.Queue()
+        self._process = subprocess.Popen(session_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.STDOUT, text=True, bufsize=1, errors="replace")
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+        # Disable echo and prompts on interactive (pty) shells, and wait until the
+        # shell answers before the session is handed out.
+        self.run("stty -echo 2>/dev/null; PS1=''; PS2=''; export PS1 PS2", timeout=SDB_SESSION_START_TIMEOUT)
+
+    def _read_output(self):
+        for line in self._process.stdout:
+            self._lines.put(line)
+        self._lines.put(None) # EOF: the SDB shell has exited
+
+    def run(self, command, timeout=None, output_callback=None):
+        """
+        Runs a shell command in the session and returns a subprocess.CompletedProcess.
+        If output_callback is given, it is called with each output line as it arrives.
+        Raises SdbSessionError if the session dies or does not answer within timeout.
+        """
+        quoted_sentinel = f'"{self._SENTINEL_PREFIX}""{self._sentinel[len(self._SENTINEL_PREFIX):]}"'
+        try:
+            # stdin is redirected so the command cannot consume the following commands.
+            self._process.stdin.write(f"{{ {command}\n}} </dev/null 2>&1; echo {quoted_sentinel} $?\n")
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise SdbSessionError(f"Cannot write to SDB shell session: {e}")
+
+        output_lines = []
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                raise SdbSessionError(f"No response from SDB shell session within {timeout}s")
+            if line is None:
+                raise SdbSessionError("SDB shell session exited unexpectedly")
+            line = line.replace("\r", "")
+            sentinel_pos = line.find(self._sentinel)
+            if sentinel_pos == -1:
+                output_lines.append(line)
+                if output_callback is not None:
+                    output_callback(line)
+                continue
+            # Output that did not end with a newline precedes the sentinel on the same line.
+            output_lines.append(line[:sentinel_pos])
+            try:
+                returncode = int(line[sentinel_pos + len(self._sentinel):].strip())
+            except ValueError:
+                raise SdbSessionError(f"Malformed command trailer from SDB shell session: {line.strip()}")
+            return subprocess.CompletedProcess(command, returncode, stdout="".join(output_lines), stderr="")
+
+    def close(self):
+        """Ends the session, killing the SDB process if it does not exit promptly."""
+        try:
+            self._process.stdin.write("exit\n")
+            self._process.stdin.close()
+            self._process.wait(timeout=SDB_SESSION_START_TIMEOUT)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+
+
+class SdbSessionPool:
+    """
+    Hands out persistent SDB shell sessions per target. A session is used by one
+    caller at a time; concurrent callers on the same target (e.g. several shards on
+    one device) get additional sessions. If a session cannot be started or breaks,
+    persistent sessions are disabled for that target and run() returns None so that
+    the caller falls back to one SDB process per command.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle_sessions = {} # target_id -> [SdbShellSession]
+        self._all_sessions = []
+        self._disabled_targets = set()
+
+    def available(self, target_id):
+        """Returns False once persistent sessions have been disabled for target_id."""
+        with self._lock:
+            return target_id not in self._disabled_targets
+
+    def run(self, command, args, timeout=None, output_callback=None):
+        """
+        Runs a shell command on the device in args.target_id over a pooled session.
+        Returns a subprocess.CompletedProcess, or None if the caller should fall back.
+        """
+        target_id = args.target_id
+        with self._lock:
+            if target_id in self._disabled_targets:
+                return None
+            idle_sessions = self._idle_sessions.setdefault(target_id, [])
+            session = idle_sessions.pop() if idle_sessions else None
+
+        try:
+            if session is None:
+                log_verbose(f"Opening persistent SDB shell session for '{target_id or 'default'}'", args, level=2)
+                if getattr(args, "profiler", None) is not None:
+                    args.profiler.count_sdb_process(target_id)
+                session = SdbShellSession(args)
+                with self._lock:
+                    self._all_sessions.append(session)
+            result = session.run(command, timeout=timeout, output_callback=output_callback)
+        except (SdbSessionError, OSError) as e:
+            log_verbose(f"Persistent SDB shell unavailable for '{target_id or 'default'}' ({e}); "
+                        "falling back to one SDB process per command.", args)
+            with self._lock:
+                self._disabled_targets.add(target_id)
+            if session is not None:
+                session.close()
+            return None
+
+        with self._lock:
+            self._idle_sessions[target_id].append(session)
+        return result
+
+    def close(self):
+        """Closes all sessions opened by the pool."""
+        with self._lock:
+            sessions, self._all_sessions = self._all_sessions, []
+            self._idle_sessions = {}
+        for session in sessions:
+            session.close()
+
+
+class DeviceAgentError(Exception):
+    """Raised when the on-device test runner agent cannot be started or reached."""
+
+
+class DeviceAgent:
+    """
+    Connection to the test runner agent on one device (see src/agent/vts_agent.cpp
+    for the protocol).
+
+    Run requests from all workers of a device share the connection and are told
+    apart by id. A reader thread dispatches the agent's messages: console output
+    to the caller's callback, result files straight into the host results
+    directory, and exit codes.
+    """
+
+    def __init__(self, address):
+        try:
+            self._sock = socket.create_connection(address, timeout=SDB_SESSION_START_TIMEOUT)
+        except OSError as e:
+            raise DeviceAgentError(f"Cannot connect to the agent at {address[0]}:{address[1]}: {e}")
+        self._sock.settimeout(None)
+        self._reader_file = self._sock.makefile("rb")
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._runs = {} # request id -> state of a running request
+        self._next_id = 0
+        self._broken = None
+        self._received_results = set() # Local paths of the result files received
+        threading.Thread(target=self._read_messages, daemon=True).start()
+        # 'sdb forward' accepts connections even if nothing listens on the device, so
+        # the connection only counts once the agent answers.
+        self._ping()
+
+    def _new_request(self, **state):
+        with self._lock:
+            if self._broken:
+                raise DeviceAgentError(self._broken)
+            self._next_id += 1
+            request_id = str(self._next_id)
+            state.update(lines=[], returncode=None, error=None, done=threading.Event())
+            self._runs[request_id] = state
+        return request_id, state
+
+    def _ping(self):
+        request_id, state = self._new_request(output_callback=None, local_xml_filepath=None)
+        try:
+            self._send("PING", request_id)
+            state["done"].wait(SDB_SESSION_START_TIMEOUT)
+        finally:
+            with self._lock:
+                self._runs.pop(request_id, None)
+        if state["returncode"] != 0:
+            self._sock.close()
+            raise DeviceAgentError(self._broken or "The agent does not respond.")
+
+    def _send(self, *fields):
+        try:
+            with self._send_lock:
+                self._sock.sendall(("\t".join(fields) + "\n").encode("utf-8"))
+        except OSError as e:
+            raise DeviceAgentError(f"Lost the connection to the agent: {e}")
+
+    def _read_messages(self):
+        try:
+            for raw_line in self._reader_file:
+                kind, _, rest = raw_line.decode("utf-8", errors="replace").rstrip("\n").partition("\t")
+                request_id, _, payload = rest.partition("\t")
+                with self._lock:
+                    run = self._runs.get(request_id)
+                if kind == "XML":
+                    self._receive_file(int(payload), run)
+                elif run is None:
+                    continue
+                elif kind == "OUT":
+                    run["lines"].append(payload + "\n")
+                    if run["output_callback"] is not None:
+                        run["output_callback"](payload + "\n")
+                elif kind == "EXIT":
+                    run["returncode"] = int(payload)
+                    run["done"].set()
+                elif kind == "PONG":
+                    run["returncode"] = 0
+                    run["done"].set()
+                elif kind == "ERR":
+                    run["error"] = payload
+                    run["done"].set()
+            self._broken = "The agent closed the connection."
+        except (OSError, ValueError) as e:
+            self._broken = f"Lost the connection to the agent: {e}"
+        with self._lock:
+            runs = list(self._runs.values())
+        for run in runs:
+            run["done"].set()
+
+    def _receive_file(self, size, run):
+        """Reads a result file of size bytes from the connection into the run's local path."""
+        partial_path = f"{run['local_xml_filepath']}.part" if run is not None else None
+        output_file = open(partial_path, "wb") if partial_path else None
+        try:
+            remaining = size
+            while remaining > 0:
+                chunk = self._reader_file.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    raise OSError("connection closed while receiving a result file")
+                if output_file is not None:
+                    output_file.write(chunk)
+                remaining -= len(chunk)
+        finally:
+            if output_file is not None:
+                output_file.close()
+        if run is not None:
+            os.replace(partial_path, run["local_xml_filepath"])
+            with self._lock:
+                self._received_results.add(run["local_xml_filepath"])
+
+    def take_received_results(self, local_xml_filepath):
+        """Returns True (once) if the result file local_xml_filepath was received."""
+        with self._lock:
+            if local_xml_filepath not in self._received_results:
+                return False
+            self._received_results.discard(local_xml_filepath)
+            return True
+
+    def run(self, cmd_parts, remote_xml_path, local_xml_filepath, output_callback=None, check_timeout=None):
+        """
+        Runs a test command (leading VAR=value assignments, the executable and its
+        arguments) on the device. Its result file remote_xml_path is stored at
+        local_xml_filepath. check_timeout, if given, is polled while the test runs;
+        once it returns a reason, the test is killed.
+
+        Returns:
+            tuple: (subprocess.CompletedProcess, timeout reason or None)
+        """
+        with self._lock:
+            self._received_results.discard(local_xml_filepath)
+        request_id, run = self._new_request(output_callback=output_callback, local_xml_filepath=local_xml_filepath)
+        try:
+            self._send("RUN", request_id, remote_xml_path, *cmd_parts)
+            timeout_reason = None
+            while not run["done"].wait(WATCHDOG_POLL_INTERVAL):
+                if check_timeout is None or timeout_reason is not None:
+                    continue
+                timeout_reason = check_timeout()
+                if timeout_reason is not None:
+                    self._send("KILL", request_id)
+                    if not run["done"].wait(TIMEOUT_KILL_GRACE):
+                        raise DeviceAgentError("The agent did not stop the timed-out test.")
+        finally:
+            with self._lock:
+                self._runs.pop(request_id, None)
+        if run["error"] is not None:
+            raise DeviceAgentError(run["error"])
+        if run["returncode"] is None:
+            raise DeviceAgentError(self._broken or "The agent did not report an exit code.")
+        result = subprocess.CompletedProcess(cmd_parts, run["returncode"], stdout="".join(run["lines"]), stderr="")
+        return result, timeout_reason
+
+    def close(self):
+        """Asks the agent to exit and closes the connection."""
+        try:
+            if not self._broken:
+                self._send("QUIT")
+        except DeviceAgentError:
+            pass
+        self._sock.close()
+
+
+class DeviceAgentPool:
+    """
+    Starts and hands out one DeviceAgent per target.
+
+    The agent binary is pushed like a test executable, started in the background
+    over 'sdb shell' and reached through 'sdb forward'. With an address, the agent
+    already listening there (e.g. harness/vts_agent_standin.py) is used for every
+    target instead. If an agent cannot be started or breaks, it is disabled for that
+    target and client() returns None, so that the caller falls back to 'sdb shell'.
+    """
+
+    def __init__(self, agent_binary, address=None):
+        self.agent_binary = agent_binary
+        self.address = None
+        if address:
+            host, _, port = address.rpartition(":")
+            self.address = (host or "127.0.0.1", int(port))
+        self._lock = threading.Lock()
+        self._agents = {} # target_id -> DeviceAgent, or None once disabled
+        self._target_locks = {}
+        self._forwarded_ports = {} # target_id -> host port
+
+    def client(self, args):
+        """Returns the agent of args.target_id, starting it on first use, or None."""
+        target_id = args.target_id
+        with self._lock:
+            target_lock = self._target_locks.setdefault(target_id, threading.Lock())
+        with target_lock:
+            if target_id not in self._agents:
+                try:
+                    self._agents[target_id] = self._start_agent(args)
+                    log_verbose(f"Connected to the test runner agent on '{target_id or 'default'}'", args)
+                except (DeviceAgentError, RuntimeError) as e:
+                    self._report_disabled(target_id, e)
+                    self._agents[target_id] = None
+            return self._agents[target_id]
+
+    def _start_agent(self, args):
+        if self.address is not None:
+            return DeviceAgent(self.address)
+        if not os.path.isfile(self.agent_binary):
+            raise DeviceAgentError(f"Agent binary not found at '{os.path.abspath(self.agent_binary)}'; "
+                                   "build it with scripts/build_tests.sh.")
+        _ensure_test_deployed(self.agent_binary, DEFAULT_REMOTE_AGENT_PATH, args)
+        start_cmd = f"chmod +x {DEFAULT_REMOTE_AGENT_PATH} && {DEFAULT_REMOTE_AGENT_PATH} --port {AGENT_DEVICE_PORT} --daemon"
+        log_verbose(f"Starting the test runner agent: {start_cmd}", args)
+        # Fails if an agent from an earlier session is still listening; connecting tells.
+        start_result = execute_sdb_command([SDB_EXECUTABLE, "shell", start_cmd], args, check=False)
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            host_port = probe.getsockname()[1]
+        execute_sdb_command([SDB_EXECUTABLE, "forward", f"tcp:{host_port}", f"tcp:{AGENT_DEVICE_PORT}"], args)
+        with self._lock:
+            self._forwarded_ports[args.target_id] = host_port
+        try:
+            return DeviceAgent(("127.0.0.1", host_port))
+        except DeviceAgentError as e:
+            raise DeviceAgentError(f"{e} (agent start output: {start_result.stdout.strip()!r})")
+
+    def _report_disabled(self, target_id, reason):
+        print(f"  Warning: Device agent unavailable for '{target_id or 'default'}' ({reason}); "
+              "falling back to 'sdb shell'.")
+
+    def disable(self, target_id, reason, args):
+        """Stops using the agent of target_id after it failed."""
+        with self._lock:
+            agent = self._agents.get(target_id)
+            self._agents[target_id] = None
+        if agent is not None:
+            self._report_disabled(target_id, reason)
+            agent.close()
+
+    def take_received_results(self, target_id, local_xml_filepath):
+        """Returns True (once) if the agent of target_id delivered local_xml_filepath."""
+        with self._lock:
+            agent = self._agents.get(target_id)
+        return agent is not None and agent.take_received_results(local_xml_filepath)
+
+    def close(self, args):
+        """Stops all agents and removes the port forwards."""
+        with self._lock:
+            agents, self._agents = self._agents, {}
+            forwarded_ports, self._forwarded_ports = self._forwarded_ports, {}
+        for agent in agents.values():
+            if agent is not None:
+                agent.close()
+        for target_id, host_port in forwarded_ports.items():
+            forward_args = argparse.Namespace(**vars(args))
+            forward_args.target_id = target_id
+            try:
+                execute_sdb_command([SDB_EXECUTABLE, "forward", "--remove", f"tcp:{host_port}"], forward_args, check=False)
+            except FileNotFoundError:
+                pass
+
+
+def push_file_to_device(local_path, remote_path, args):
+    """
+    Pushes a file from the host to the Tizen device using SDB.
+    Creates the remote directory if it doesn't exist.
+
+    Args:
+        local_path (str): Path to the local file.
+        remote_path (str): Full path to the destination on the device.
+        args: Parsed command-line arguments.
+    """
+    remote_dir = os.path.dirname(remote_path)
+    
+    # Create remote directory
+    # SDB shell mkdir behavior: if path is /opt/usr/foo/bar, then /opt/usr/foo must exist.
+    # `mkdir -p` handles creation of parent directories.
+    mkdir_cmd = [SDB_EXECUTABLE, "shell", f"mkdir -p {remote_dir}"]
+    log_verbose(f"Ensuring remote directory exists: {remote_dir}", args)
+    test_name = os.path.basename(local_path)
+    with _profile_stage(args, "mkdir", test_name):
+        execute_sdb_command(mkdir_cmd, args)
+
+    # Push the file, compressed or as a delta with --compress
+    push_cmd = [SDB_EXECUTABLE, "push", local_path, remote_path]
+    log_verbose(f"Pushing {local_path} to {remote_path}", args)
+    transfer = getattr(args, "transfer", None)
+    with _profile_stage(args, "push", test_name, nbytes=os.path.getsize(local_path)) as stage:
+        if transfer is not None:
+            stage["bytes"] = transfer.push(local_path, remote_path, args)
+        else:
+            execute_sdb_command(push_cmd, args)
+    log_verbose(f"File '{os.path.basename(local_path)}' pushed successfully to '{remote_path}'.", args)
+
+
+class PushCache:
+    """
+    Tracks the content of test executables deployed to each device, so that
+    byte-identical binaries are not pushed again.
+
+    The authoritative check is a single batched 'sha256sum' over the remote bin
+    directory, run once per device per invocation. If the device cannot provide
+    checksums, the host-side record of the last push to that target is used instead.
+    Local file hashes are cached by path, size and mtime to avoid rehashing large
+    binaries on every run. The cache is persisted as JSON on the host.
+    """
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._device_listings = {} # target key -> {remote_path: sha256} or None if unavailable
+        self._device_listing_locks = {}
+        self._data = {"local_hashes": {}, "targets": {}}
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data.get("local_hashes"), dict) and isinstance(data.get("targets"), dict):
+                self._data = data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable push cache '{cache_path}': {e}")
+
+    @staticmethod
+    def _target_key(args):
+        return args.target_id or "default"
+
+    def local_hash(self, local_path):
+        """Returns the SHA-256 of a local file, reusing the cached value if the file is unchanged."""
+        abs_path = os.path.abspath(local_path)
+        file_stat = os.stat(abs_path)
+        with self._lock:
+            entry = self._data["local_hashes"].get(abs_path)
+        if entry and entry.get("size") == file_stat.st_size and entry.get("mtime") == file_stat.st_mtime:
+            return entry["sha256"]
+
+        sha256 = _file_sha256(abs_path)
+        with self._lock:
+            self._data["local_hashes"][abs_path] = {"size": file_stat.st_size, "mtime": file_stat.st_mtime, "sha256": sha256}
+        return sha256
+
+    def _device_listing(self, remote_dir, args):
+        """Returns {remote_path: sha256} for remote_dir on the device, or None if unavailable."""
+        listing_key = (self._target_key(args), remote_dir)
+        with self._lock:
+            listing_lock = self._device_listing_locks.setdefault(listing_key, threading.Lock())
+        with listing_lock:
+            if listing_key not in self._device_listings:
+                checksum_cmd = [SDB_EXECUTABLE, "shell", f"sha256sum {remote_dir}/* 2>/dev/null"]
+                log_verbose(f"Querying checksums of deployed binaries in {remote_dir}", args)
+                result = execute_sdb_command(checksum_cmd, args, check=False)
+                listing = {}
+                for line in result.stdout.splitlines():
+                    fields = line.strip().split(None, 1)
+                    if len(fields) == 2 and len(fields[0]) == 64:
+                        listing[fields[1].lstrip("*")] = fields[0]
+                # An empty listing with a non-zero exit code means the remote directory
+                # is empty/missing or sha256sum is not available; only trust the device
+                # if it produced output or reported success.
+                self._device_listings[listing_key] = listing if (listing or result.returncode == 0) else None
+            return self._device_listings[listing_key]
+
+    def remote_hash(self, remote_path, args, verified_only=False):
+        """
+        Returns the SHA-256 of the file at remote_path on the device, as reported by
+        the device or, unless verified_only, as recorded at its last push; None if unknown.
+        """
+        device_listing = self._device_listing(os.path.dirname(remote_path), args)
+        if device_listing is not None:
+            return device_listing.get(remote_path)
+        if verified_only:
+            return None
+        with self._lock:
+            return self._data["targets"].get(self._target_key(args), {}).get(remote_path)
+
+    def deployed_hashes(self):
+        """Returns the SHA-256 of every file recorded as deployed to any device."""
+        with self._lock:
+            return {sha256 for target in self._data["targets"].values() for sha256 in target.values()}
+
+    def is_current(self, local_path, remote_path, args):
+        """Returns True if the device already has an identical copy of local_path at remote_path."""
+        local_sha256 = self.local_hash(local_path)
+        remote_sha256 = self.remote_hash(remote_path, args)
+        with self._lock:
+            if remote_sha256 == local_sha256:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def record_push(self, local_path, remote_path, args):
+        """Records that local_path has just been pushed to remote_path on the device."""
+        local_sha256 = self.local_hash(local_path)
+        target_key = self._target_key(args)
+        remote_dir = os.path.dirname(remote_path)
+        with self._lock:
+            self._data["targets"].setdefault(target_key, {})[remote_path] = local_sha256
+            device_listing = self._device_listings.get((target_key, remote_dir))
+            if device_listing is not None:
+                device_listing[remote_path] = local_sha256
+
+    def save(self):
+        """Writes the cache back to disk."""
+        try:
+            with self._lock:
+                serialized = json.dumps(self._data, indent=1, sort_keys=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                f.write(serialized)
+        except OSError as e:
+            print(f"Warning: Could not write push cache '{self.cache_path}': {e}")
+
+
+class DeviceTransfer:
+    """
+    Compressed and delta-aware pushes and pulls (--compress), for setups where the
+    bandwidth to the devices is the bottleneck.
+
+    Files are compressed on the host (once per content, however many devices they
+    are pushed to) and decompressed on the device, if the device has a matching
+    decompressor and compression saves enough. A binary that changed only in a
+    few blocks is sent as those blocks: the delta is computed against a copy of
+    the version last pushed, kept in the host results directory, and is only used
+    when the device reports that exact version; the patched file's checksum is
+    verified before it replaces the old one. Pulled files are compressed on the
+    device with gzip where available. Anything that cannot be sent compressed
+    falls back to a plain 'sdb push'/'sdb pull'.
+    """
+
+    def __init__(self, codec, bases_dir, push_cache=None):
+        self.codec = codec
+        self.bases_dir = bases_dir
+        self.push_cache = push_cache
+        self.stats = {} # kind ("push raw", "push delta", ...) -> {"files", "bytes", "sent_bytes"}
+        self._lock = threading.Lock()
+        self._device_tools = {} # target key -> set of compression tools on the device
+        self._artifact_locks = {}
+        self._artifacts = {} # (sha256, codec) -> compressed local file, or None if not worth sending
+        self._temp_dir = tempfile.mkdtemp(prefix="vts_transfer_")
+
+    def _count(self, kind, nbytes, sent_bytes):
+        with self._lock:
+            entry = self.stats.setdefault(kind, {"files": 0, "bytes": 0, "sent_bytes": 0})
+            entry["files"] += 1
+            entry["bytes"] += nbytes
+            entry["sent_bytes"] += sent_bytes
+
+    def _tools(self, args):
+        """Returns the compression tools available on the device in args.target_id, probed once."""
+        target_key = args.target_id or "default"
+        with self._lock:
+            tools = self._device_tools.get(target_key)
+        if tools is None:
+            probe_cmd = [SDB_EXECUTABLE, "shell",
+                         "for tool in gzip xz; do command -v $tool >/dev/null 2>&1 && echo $tool; done; true"]
+            result = execute_sdb_command(probe_cmd, args, check=False)
+            tools = {line.strip() for line in result.stdout.splitlines()} & set(TRANSFER_CODECS)
+            log_verbose(f"Compression tools on '{target_key}': {', '.join(sorted(tools)) or 'none'}", args)
+            with self._lock:
+                self._device_tools[target_key] = tools
+        return tools
+
+    def _compress(self, local_path, key, codec):
+        """Returns a compressed copy of local_path, made once per key, or None if it saves too little."""
+        with self._lock:
+            artifact_lock = self._artifact_locks.setdefault((key, codec), threading.Lock())
+        with artifact_lock:
+            if (key, codec) not in self._artifacts:
+                extension, codec_open = TRANSFER_CODECS[codec]
+                compressed_path = os.path.join(self._temp_dir, f"{key}{extension}")
+                with open(local_path, "rb") as source, codec_open(compressed_path, "wb") as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+                if os.path.getsize(compressed_path) > TRANSFER_MAX_RATIO * os.path.getsize(local_path):
+                    os.remove(compressed_path)
+                    compressed_path = None
+                self._artifacts[(key, codec)] = compressed_path
+            return self._artifacts[(key, codec)]
+
+    def push(self, local_path, remote_path, args):
+        """Pushes local_path to remote_path as a delta, compressed or raw; returns the bytes sent."""
+        size = os.path.getsize(local_path)
+        codec = self.codec if size >= TRANSFER_COMPRESS_MIN_BYTES and self.codec in self._tools(args) else None
+        local_sha256 = self.push_cache.local_hash(local_path) if self.push_cache is not None else _file_sha256(local_path)
+        kind, sent_bytes = "push raw", None
+        if codec is not None:
+            kind, sent_bytes = "push delta", self._push_delta(local_path, local_sha256, remote_path, codec, args)
+            compressed_path = self._compress(local_path, local_sha256, codec) if sent_bytes is None else None
+            if compressed_path is not None:
+                remote_compressed_path = remote_path + TRANSFER_CODECS[codec][0]
+                execute_sdb_command([SDB_EXECUTABLE, "push", compressed_path, remote_compressed_path], args)
+                execute_sdb_command([SDB_EXECUTABLE, "shell",
+                                     f"{codec} -dc {remote_compressed_path} > {remote_path}.tmp && "
+                                     f"mv {remote_path}.tmp {remote_path} && rm -f {remote_compressed_path}"], args)
+                kind, sent_bytes = "push compressed", os.path.getsize(compressed_path)
+        if sent_bytes is None:
+            execute_sdb_command([SDB_EXECUTABLE, "push", local_path, remote_path], args)
+            kind, sent_bytes = "push raw", size
+        self._count(kind, size, sent_bytes)
+        self._keep_base(local_path, local_sha256)
+        return sent_bytes
+
+    def _keep_base(self, local_path, local_sha256):
+        """Keeps a copy of a pushed file as the base of later deltas against it."""
+        base_path = os.path.join(self.bases_dir, local_sha256)
+        if os.path.getsize(local_path) < TRANSFER_COMPRESS_MIN_BYTES or os.path.exists(base_path):
+            return
+        partial_path = f"{base_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.bases_dir, exist_ok=True)
+            shutil.copyfile(local_path, partial_path)
+            os.replace(partial_path, base_path)
+        except OSError as e:
+            print(f"  Warning: Cannot keep '{local_path}' as the base of later deltas: {e}")
+
+    def _delta(self, local_path, base_path, delta_key):
+        """
+        Returns (delta file, runs) for local_path against base_path, made once per
+        delta_key: the changed blocks of local_path concatenated, and the (first block,
+        number of blocks) of each range of changed blocks.
+        """
+        with self._lock:
+            delta_lock = self._artifact_locks.setdefault((delta_key, "delta"), threading.Lock())
+        with delta_lock:
+            if (delta_key, "delta") not in self._artifacts:
+                delta_path = os.path.join(self._temp_dir, f"{delta_key}.delta")
+                runs = []
+                with open(local_path, "rb") as new_file, open(base_path, "rb") as base_file, \
+                        open(delta_path, "wb") as delta_file:
+                    block_index = 0
+                    while True:
+                        block = new_file.read(TRANSFER_DELTA_BLOCK_SIZE)
+                        if not block:
+                            break
+                        if block != base_file.read(TRANSFER_DELTA_BLOCK_SIZE):
+                            delta_file.write(block)
+                            if runs and sum(runs[-1]) == block_index:
+                                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+                            else:
+                                runs.append((block_index, 1))
+                        block_index += 1
+                self._artifacts[(delta_key, "delta")] = (delta_path, runs)
+            return self._artifacts[(delta_key, "delta")]
+
+    def _push_delta(self, local_path, local_sha256, remote_path, codec, args):
+        """
+        Sends only the blocks of local_path that differ from the version on the device
+        and patches the remote file with 'dd'. Returns the bytes sent, or None if no
+        delta can be used (the caller then pushes the whole file).
+        """
+        if self.push_cache is None:
+            return None
+        remote_sha256 = self.push_cache.remote_hash(remote_path, args, verified_only=True)
+        if not remote_sha256 or remote_sha256 == local_sha256:
+            return None
+        base_path = os.path.join(self.bases_dir, remote_sha256)
+        if not os.path.isfile(base_path):
+            return None
+
+        delta_key = f"{remote_sha256[:16]}-{local_sha256[:16]}"
+        delta_path, runs = self._delta(local_path, base_path, delta_key)
+        changed_blocks = sum(count for _, count in runs)
+        total_blocks = -(-os.path.getsize(local_path) // TRANSFER_DELTA_BLOCK_SIZE)
+        if len(runs) > TRANSFER_DELTA_MAX_RUNS or changed_blocks > total_blocks // 2:
+            log_verbose(f"'{os.path.basename(local_path)}' changed in {changed_blocks} of {total_blocks} block(s) "
+                        f"({len(runs)} range(s)); pushing it whole.", args)
+            return None
+        sent_path = self._compress(delta_path, delta_key, codec) or delta_path
+        remote_delta_path = f"{remote_path}.delta"
+        remote_sent_path = remote_delta_path + (TRANSFER_CODECS[codec][0] if sent_path != delta_path else "")
+
+        patch_steps = [f"cp {remote_path} {remote_path}.new",
+                       f"dd if=/dev/null of={remote_path}.new bs=1 seek={os.path.getsize(local_path)} count=0 2>/dev/null"]
+        if remote_sent_path != remote_delta_path:
+            patch_steps.insert(0, f"{codec} -dc {remote_sent_path} > {remote_delta_path}")
+        delta_block = 0
+        for first_block, count in runs:
+            patch_steps.append(f"dd if={remote_delta_path} of={remote_path}.new bs={TRANSFER_DELTA_BLOCK_SIZE} "
+                               f"skip={delta_block} seek={first_block} count={count} conv=notrunc 2>/dev/null")
+            delta_block += count
+        patch_steps.append(f"sha256sum {remote_path}.new")
+        log_verbose(f"Pushing '{os.path.basename(local_path)}' as a delta of {changed_blocks} of {total_blocks} "
+                    f"block(s), {os.path.getsize(sent_path)} bytes", args)
+        try:
+            execute_sdb_command([SDB_EXECUTABLE, "push", sent_path, remote_sent_path], args)
+            result = execute_sdb_command([SDB_EXECUTABLE, "shell", " && ".join(patch_steps)], args, check=False)
+            # The patched file only replaces the old one if it is exactly the new binary.
+            patched = local_sha256 in result.stdout
+            finish_cmd = (f"mv {remote_path}.new {remote_path}" if patched else f"rm -f {remote_path}.new") + \
+                         f"; rm -f {remote_delta_path} {remote_sent_path}"
+            execute_sdb_command([SDB_EXECUTABLE, "shell", finish_cmd], args, check=patched)
+        except RuntimeError as e:
+            print(f"  Warning: Delta push of '{os.path.basename(local_path)}' failed, pushing it whole: {e}")
+            return None
+        if not patched:
+            print(f"  Warning: Delta of '{os.path.basename(local_path)}' did not reproduce the binary, pushing it whole.")
+            return None
+        return os.path.getsize(sent_path)
+
+    def pull(self, remote_path, local_path, args):
+        """Pulls remote_path to local_path, gzip-compressed if the device can; returns the bytes received."""
+        if "gzip" in self._tools(args):
+            remote_compressed_path = f"{remote_path}.gz"
+            compress_cmd = (f"[ $(wc -c < {remote_path}) -ge {TRANSFER_COMPRESS_MIN_BYTES} ] && "
+                            f"gzip -c {remote_path} > {remote_compressed_path}")
+            if execute_sdb_command([SDB_EXECUTABLE, "shell", compress_cmd], args, check=False).returncode == 0:
+                compressed_local_path = f"{local_path}.gz"
+                try:
+                    execute_sdb_command([SDB_EXECUTABLE, "pull", remote_compressed_path, compressed_local_path], args)
+                    with gzip.open(compressed_local_path, "rb") as source, open(local_path, "wb") as target:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+                    received_bytes = os.path.getsize(compressed_local_path)
+                finally:
+                    execute_sdb_command([SDB_EXECUTABLE, "shell", f"rm -f {remote_compressed_path}"], args, check=False)
+                    if os.path.exists(compressed_local_path):
+                        os.remove(compressed_local_path)
+                self._count("pull compressed", os.path.getsize(local_path), received_bytes)
+                return received_bytes
+        execute_sdb_command([SDB_EXECUTABLE, "pull", remote_path, local_path], args)
+        size = os.path.getsize(local_path)
+        self._count("pull raw", size, size)
+        return size
+
+    def print_summary(self):
+        if not self.stats:
+            return
+        print("\n--- Transfers ---")
+        for kind in sorted(self.stats):
+            entry = self.stats[kind]
+            ratio = entry["sent_bytes"] / entry["bytes"] if entry["bytes"] else 1.0
+            print(f"  {kind:<16} {entry['files']:>5} file(s)  {entry['bytes'] / 1e6:>10.2f} MB  "
+                  f"sent as {entry['sent_bytes'] / 1e6:>10.2f} MB ({ratio:.0%})")
+        total_bytes = sum(entry["bytes"] for entry in self.stats.values())
+        total_sent = sum(entry["sent_bytes"] for entry in self.stats.values())
+        print(f"  Saved {(total_bytes - total_sent) / 1e6:.2f} MB of {total_bytes / 1e6:.2f} MB.")
+        print("-----------------")
+
+    def close(self):
+        """Removes the compressed artifacts and the delta bases no device is known to have any more."""
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+        if self.push_cache is None or not os.path.isdir(self.bases_dir):
+            return
+        deployed = self.push_cache.deployed_hashes()
+        for base_name in os.listdir(self.bases_dir):
+            if base_name not in deployed:
+                try:
+                    os.remove(os.path.join(self.bases_dir, base_name))
+                except OSError:
+                    pass
+
+
+def run_test_on_device(remote_test_executable_path, target_remote_results_dir, target_xml_filename, args,
+                       shard_index=None, total_shards=1):
+    """
+    Runs a GTest executable on the Tizen device via SDB.
+
+    Args:
+        remote_test_executable_path (str): Full path to the test executable on the device.
+        target_remote_results_dir (str): Directory on the device to store GTest XML results.
+        target_xml_filename (str): The filename for the XML output on the device.
+        args: Parsed command-line arguments.
+        shard_index (int): If given, only this GTest shard (0-based) of the executable is run,
+                           using GTest's GTEST_TOTAL_SHARDS/GTEST_SHARD_INDEX variables.
+        total_shards (int): Total number of shards the executable is split into.
+
+    Returns:
+        GTestConsoleParser: With --stream, the per-testcase results parsed from the
+                            console output while the test ran; otherwise None.
+    """
+    xml_output_path = f"{target_remote_results_dir}/{target_xml_filename}"
+
+    # The device agent prepares the run itself.
+    device_agents = getattr(args, "device_agents", None)
+    agent = device_agents.client(args) if device_agents is not None else None
+    if agent is None:
+        _prepare_remote_test_run(remote_test_executable_path, target_remote_results_dir, args, xml_output_path)
+
+    executable_name = os.path.basename(remote_test_executable_path)
+    if shard_index is not None:
+        executable_name = f"{executable_name}[shard {shard_index + 1}/{total_shards}]"
+    console_parser = None
+    # Timeouts are detected from the streamed output, so they imply --stream.
+    if args.stream or args.events_file or args.timeout or args.testcase_timeout:
+        console_parser = GTestConsoleParser(on_event=_live_progress_reporter(executable_name, args))
+    deadline = time.monotonic() + args.timeout if args.timeout else None
+    excluded_tests = {} # 'Suite.Case' names, in the order they finished or hung
+    shard_tests = None # The shard's 'Suite.Case' names, once its rest is run without GTest sharding
+    segments = 0
+
+    while True:
+        segments += 1
+        # Construct the test command
+        cmd_parts = []
+        if shard_index is not None and shard_tests is None:
+            cmd_parts.extend([f"GTEST_TOTAL_SHARDS={total_shards}", f"GTEST_SHARD_INDEX={shard_index}"])
+        cmd_parts.extend([remote_test_executable_path, f"--gtest_output=xml:{xml_output_path}"])
+        if shard_tests is not None:
+            gtest_filter = ":".join(name for name in shard_tests if name not in excluded_tests)
+        else:
+            gtest_filter = _gtest_filter_excluding(args.gtest_filter, excluded_tests)
+        if gtest_filter:
+            cmd_parts.append(f"--gtest_filter={gtest_filter}")
+        
+        test_cmd_on_device = " ".join(cmd_parts)
+        log_verbose(f"Exact test command on device: {test_cmd_on_device}", args)
+
+        # Standard print for command execution, not verbose specific
+        print(f"  Executing test on device: {test_cmd_on_device}") 
+        segment_start = len(console_parser.cases) if console_parser else 0
+        timeout_reason = None
+        result = None
+        if agent is not None:
+            try:
+                with _profile_stage(args, "execute", os.path.basename(remote_test_executable_path)):
+                    result, timeout_reason = _run_test_with_agent(agent, cmd_parts, xml_output_path, console_parser, deadline, args)
+            except DeviceAgentError as e:
+                device_agents.disable(args.target_id, e, args)
+                agent = None
+                _prepare_remote_test_run(remote_test_executable_path, target_remote_results_dir, args, xml_output_path)
+        if result is not None:
+            pass
+        elif deadline is not None or args.testcase_timeout:
+            with _profile_stage(args, "execute", os.path.basename(remote_test_executable_path)):
+                result, timeout_reason = _run_test_with_watchdog(test_cmd_on_device, console_parser, deadline, args)
+        else:
+            sdb_shell_cmd = [SDB_EXECUTABLE, "shell", test_cmd_on_device]
+            output_callback = console_parser.feed if console_parser else None
+            with _profile_stage(args, "execute", os.path.basename(remote_test_executable_path)):
+                result = execute_sdb_command(sdb_shell_cmd, args, check=False, output_callback=output_callback) # Don't check, GTest returns non-zero for failures
+
+        print("--- Device Test Output ---")
+        if result.stdout:
+            print(result.stdout.strip())
+        if result.stderr:
+            print(f"Stderr from device:\n{result.stderr.strip()}")
+        print("--- End Device Test Output ---")
+
+        if timeout_reason is None:
+            if console_parser is not None:
+                console_parser.finish()
+            break
+
+        hung_test = console_parser.current
+        console_parser.finish(reason=timeout_reason, result="timeout")
+        console_parser.timed_out = True
+        print(f"Warning: {executable_name}: {timeout_reason} Remote test process killed.")
+        # After a testcase timeout, the rest of the executable is run without the
+        # cases that already finished or hung; an executable timeout ends it. GTest
+        # shards the testcases selected by the filter, so excluding some would move
+        # others between shards: the rest of a shard is named explicitly instead.
+        segment_total = console_parser.total
+        segment_done = len(console_parser.cases) - segment_start
+        if hung_test is None or deadline is not None and time.monotonic() >= deadline \
+                or segment_total is None or segment_done >= segment_total:
+            break
+        if hung_test in excluded_tests:
+            # The executable ignored the --gtest_filter; running it again would hang again.
+            print(f"  Error: '{hung_test}' hung again although it was excluded with --gtest_filter; "
+                  f"not continuing '{executable_name}'.")
+            break
+        if segments >= TESTCASE_TIMEOUT_MAX_SEGMENTS:
+            print(f"  Error: '{executable_name}' was interrupted by {segments} testcase timeouts; "
+                  "giving up on its remaining tests.")
+            break
+        if shard_index is not None and shard_tests is None:
+            shard_tests = _shard_testcases(os.path.basename(remote_test_executable_path), shard_index, total_shards, args)
+            if shard_tests is None or hung_test not in shard_tests:
+                print(f"  Error: Cannot tell which testcases belong to '{executable_name}' from the test inventory; "
+                      "not continuing it.")
+                break
+        excluded_tests.update(dict.fromkeys(f"{case['suite']}.{case['name']}" for case in console_parser.cases[segment_start:]))
+        if shard_tests is not None and all(name in excluded_tests for name in shard_tests):
+            break
+        print(f"  Continuing '{executable_name}' with the remaining {segment_total - segment_done} test(s).")
+
+    if result.returncode != 0:
+        print(f"Warning: Test executable '{os.path.basename(remote_test_executable_path)}' exited with code {result.returncode}. This might indicate test failures. Check XML report.")
+    else:
+        print(f"Test executable '{os.path.basename(remote_test_executable_path)}' completed on device.")
+    # Note: Actual test pass/fail status is in the XML. This print just checks execution.
+    return console_parser
+
+
+def _prepare_remote_test_run(remote_test_executable_path, target_remote_results_dir, args, xml_output_path=None):
+    """
+    Creates the remote results directory and makes the test executable on the
+    device. A leftover xml_output_path of an earlier run is removed, so a test that
+    writes no XML cannot be reported with stale results.
+    """
+    # Ensure results directory exists on device
+    mkdir_cmd = [SDB_EXECUTABLE, "shell", f"mkdir -p {target_remote_results_dir}"
+                 + (f" && rm -f {xml_output_path}" if xml_output_path else "")]
+    log_verbose(f"Ensuring remote results directory exists: {target_remote_results_dir}", args)
+    test_name = os.path.basename(remote_test_executable_path)
+    with _profile_stage(args, "mkdir", test_name):
+        execute_sdb_command(mkdir_cmd, args)
+
+    # Make the test executable on the device
+    chmod_cmd = [SDB_EXECUTABLE, "shell", f"chmod +x {remote_test_executable_path}"]
+    log_verbose(f"Making test executable on device: {remote_test_executable_path}", args)
+    with _profile_stage(args, "chmod", test_name):
+        execute_sdb_command(chmod_cmd, args)
+
+
+def _shard_testcases(test_name, shard_index, total_shards, args):
+    """
+    Returns the "Suite.Case" names that GTest runs in shard shard_index of
+    test_name under --gtest_filter, according to the test inventory, or None if
+    the executable could not be listed. Like GTest, this deals the selected
+    testcases out to the shards in turn, in the order of the listing.
+    """
+    suites = _list_testcases([test_name], args)[test_name]
+    if suites is None:
+        return None
+    return selected_testcases(suites, args.gtest_filter)[shard_index::total_shards]
+
+
+def _gtest_filter_excluding(gtest_filter, excluded_tests):
+    """Returns gtest_filter extended with negative patterns for excluded_tests (an iterable of names)."""
+    if not excluded_tests:
+        return gtest_filter
+    exclusions = ":".join(excluded_tests)
+    if gtest_filter and "-" in gtest_filter:
+        return f"{gtest_filter}:{exclusions}"
+    return f"{gtest_filter or '*'}-{exclusions}"
+
+
+def _run_test_with_watchdog(test_cmd_on_device, console_parser, deadline, args):
+    """
+    Runs a test command on the device while a watchdog enforces the executable
+    deadline (monotonic time, or None) and the --testcase-timeout, which expires
+    when a running testcase produces no output for that many seconds.
+
+    On expiry the remote test process and its children are killed. If SDB still
+    does not return within TIMEOUT_KILL_GRACE seconds, the local SDB process is
+    killed as well. The command runs as its own SDB process rather than over a
+    persistent session, so it can be killed independently.
+
+    Returns:
+        tuple: (subprocess.CompletedProcess, timeout reason or None)
+    """
+    remote = {"pid": None}
+    local = {"process": None}
+
+    def on_line(line):
+        if remote["pid"] is None and line.startswith(REMOTE_PID_MARKER):
+            remote["pid"] = line[len(REMOTE_PID_MARKER):].strip()
+            return
+        console_parser.feed(line)
+
+    # 'exec' keeps the PID reported by the wrapper shell for the test itself.
+    wrapped_cmd = f"sh -c {shlex.quote(f'echo {REMOTE_PID_MARKER}$$; {_exec_command(test_cmd_on_device)}')}"
+    stop_event = threading.Event()
+    expired = {"reason": None}
+
+    def watchdog():
+        while not stop_event.wait(WATCHDOG_POLL_INTERVAL):
+            expired["reason"] = _timeout_reason(console_parser, deadline, args)
+            if expired["reason"] is None:
+                continue
+            if remote["pid"]:
+                kill_cmd = f"pkill -9 -P {remote['pid']} 2>/dev/null; kill -9 {remote['pid']}"
+                log_verbose(f"Killing hung test process {remote['pid']} on device", args)
+                try:
+                    execute_sdb_command([SDB_EXECUTABLE, "shell", kill_cmd], args, check=False)
+                except (RuntimeError, FileNotFoundError) as e:
+                    print(f"  Warning: Could not kill the remote test process: {e}")
+            if not stop_event.wait(TIMEOUT_KILL_GRACE) and local["process"] is not None:
+                log_verbose("SDB did not return after killing the remote test; killing it.", args)
+                local["process"].kill()
+            return
+
+    watchdog_thread = threading.Thread(target=watchdog, daemon=True)
+    watchdog_thread.start()
+    try:
+        result = execute_sdb_command([SDB_EXECUTABLE, "shell", wrapped_cmd], args, check=False, output_callback=on_line,
+                                     on_process_start=lambda process: local.update(process=process))
+    finally:
+        stop_event.set()
+        watchdog_thread.join()
+
+    # Hide the PID marker from the printed device output.
+    result.stdout = "".join(line for line in result.stdout.splitlines(keepends=True) if not line.startswith(REMOTE_PID_MARKER))
+    return result, expired["reason"]
+
+
+def _timeout_reason(console_parser, deadline, args):
+    """Returns why a running test has timed out, or None if it has not."""
+    now = time.monotonic()
+    if deadline is not None and now >= deadline:
+        return f"Executable timed out after {args.timeout}s."
+    if (args.testcase_timeout and console_parser.current is not None
+            and now - console_parser.last_activity >= args.testcase_timeout):
+        return f"Test '{console_parser.current}' timed out: no progress for {args.testcase_timeout}s."
+    return None
+
+
+def _run_test_with_agent(agent, cmd_parts, xml_output_path, console_parser, deadline, args):
+    """
+    Runs a test command through the device agent, enforcing the same timeouts as
+    _run_test_with_watchdog(). The XML results are received into the host results
+    directory as part of the run.
+
+    Returns:
+        tuple: (subprocess.CompletedProcess, timeout reason or None)
+
+    Raises:
+        DeviceAgentError: If the agent cannot run the test.
+    """
+    local_xml_filepath = os.path.join(args.host_results_dir, os.path.basename(xml_output_path))
+    check_timeout = None
+    if deadline is not None or args.testcase_timeout:
+        check_timeout = lambda: _timeout_reason(console_parser, deadline, args)
+    return agent.run(cmd_parts, xml_output_path, local_xml_filepath,
+                     output_callback=console_parser.feed if console_parser else None, check_timeout=check_timeout)
+
+
+def _exec_command(test_cmd_on_device):
+    """
+    Returns a shell snippet that replaces the shell with test_cmd_on_device. Leading
+    VAR=value assignments are turned into 'export' statements, since they cannot
+    precede 'exec' portably.
+    """
+    parts = test_cmd_on_device.split(" ")
+    assignments = []
+    while parts and re.match(r"^[A-Za-z_][A-Za-z0-9_]*=", parts[0]):
+        assignments.append(parts.pop(0))
+    exports = f"export {' '.join(assignments)}; " if assignments else ""
+    return f"{exports}exec {' '.join(parts)}"
+
+
+class GTestConsoleParser:
+    """
+    Incrementally parses GTest console output ('[ RUN      ]', '[       OK ]',
+    '[  FAILED  ]', '[  SKIPPED ]' markers) into per-testcase results.
+
+    Feed it output lines as they arrive; on_event, if given, is called with a dict
+    for every "case_started" and "case_finished" event. Finished testcases are kept
+    in 'cases' as records in the format of iter_gtest_xml, plus a "suite" key.
+    """
+
+    _TOTAL_RE = re.compile(r"^\[==========\] Running (\d+) tests?")
+    _RUN_RE = re.compile(r"^\[ RUN      \] (\S+)")
+    _END_RE = re.compile(r"^\[ *(OK|FAILED|SKIPPED) *\] (\S+?)(?:, where .*)? \((\d+) ms\)$")
+    _RESULTS = {"OK": "passed", "FAILED": "failed", "SKIPPED": "skipped"}
+
+    def __init__(self, on_event=None):
+        self.on_event = on_event
+        self.total = None
+        self.cases = []
+        self.current = None # Full name of the testcase currently running
+        self.current_started = None
+        self.last_activity = time.monotonic()
+        self.timed_out = False
+        self._current_output = []
+
+    def feed(self, line):
+        line = line.rstrip("\r\n")
+        self.last_activity = time.monotonic()
+        total_match = self._TOTAL_RE.match(line)
+        if total_match:
+            self.total = int(total_match.group(1))
+            return
+        run_match = self._RUN_RE.match(line)
+        if run_match:
+            self.current = run_match.group(1)
+            self.current_started = time.monotonic()
+            self._current_output = []
+            self._emit({"event": "case_started", "test": self.current})
+            return
+        end_match = self._END_RE.match(line)
+        if end_match and end_match.group(2) == self.current:
+            result = self._RESULTS[end_match.group(1)]
+            failure_text = "\n".join(self._current_output).strip() if result == "failed" else None
+            self._finish_current(result, int(end_match.group(3)) / 1000.0, failure_text or ("Failed" if result == "failed" else None))
+            return
+        if self.current is not None:
+            self._current_output.append(line)
+
+    def finish(self, reason="Test did not finish (the executable crashed or was killed).", result="failed"):
+        """Records a testcase that started but never finished with result and reason."""
+        if self.current is not None:
+            elapsed = time.monotonic() - self.current_started
+            output = "\n".join(self._current_output).strip()
+            self._finish_current(result, elapsed, f"{reason}\n{output}".strip())
+
+    def _finish_current(self, result, seconds, failure_message):
+        suite_name, _, case_name = self.current.rpartition(".")
+        case_data = {
+            "suite": suite_name or "UnknownSuite",
+            "name": case_name,
+            "status": "run" if result != "skipped" else "notrun",
+            "result": result,
+            "time": f"{seconds:.3f}",
+            "failure": {"message": failure_message, "type": ""} if failure_message else None,
+        }
+        self.cases.append(case_data)
+        self._emit({"event": "case_finished", "test": self.current, "result": result, "time": seconds})
+        self.current = None
+        self.current_started = None
+        self._current_output = []
+
+    def _emit(self, event):
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def counts(self):
+        """Returns {result: count} over the finished testcases."""
+        counts = {}
+        for case in self.cases: # "timeout" counts separately from "failed"
+            counts[case["result"]] = counts.get(case["result"], 0) + 1
+        return counts
+
+    def write_xml(self, xml_file_path):
+        """Writes the parsed testcases as a GTest-style XML file readable by iter_gtest_xml."""
+        suites = {}
+        for case in self.cases:
+            suites.setdefault(case["suite"], []).append(case)
+        root = ET.Element("testsuites", tests=str(len(self.cases)), name="AllTests")
+        for suite_name, cases in suites.items():
+            suite_element = ET.SubElement(root, "testsuite", name=suite_name, tests=str(len(cases)),
+                                          failures=str(sum(1 for case in cases if case["result"] in ("failed", "timeout"))),
+                                          disabled="0", errors="0",
+                                          time=f"{sum(float(case['time']) for case in cases):.3f}")
+            for case in cases:
+                case_element = ET.SubElement(suite_element, "testcase", name=case["name"], status=case["status"],
+                                             result="timeout" if case["result"] == "timeout" else "completed",
+                                             time=case["time"], classname=suite_name)
+                if case["failure"]:
+                    failure_element = ET.SubElement(case_element, "failure", message=case["failure"]["message"].split("\n")[0], type="")
+                    failure_element.text = case["failure"]["message"]
+        ET.ElementTree(root).write(xml_file_path, encoding="utf-8", xml_declaration=True)
+
+
+def _live_progress_reporter(executable_name, args):
+    """
+    Returns an on_event callback for GTestConsoleParser that prints one progress
+    line per finished testcase and appends every event to the --events-file log.
+    """
+    device = args.target_id or "default"
+    finished = {"count": 0, "failed": 0}
+
+    def on_event(event):
+        event = dict(event, executable=executable_name, device=device, timestamp=time.time())
+        if args.event_log is not None:
+            args.event_log.emit(event)
+        if event["event"] == "case_finished":
+            finished["count"] += 1
+            if event["result"] == "failed":
+                finished["failed"] += 1
+            print(f"  [{device}] {executable_name}: {event['test']} {event['result']} "
+                  f"({event['time'] * 1000:.0f} ms) [{finished['count']} done, {finished['failed']} failed]")
+    return on_event
+
+
+class StageProfiler:
+    """
+    Records how long each stage of a run (discover, mkdir, push, chmod, execute,
+    pull, parse, report) took per test executable and device, the bytes it
+    transferred and the number of SDB processes spawned per device (--profile).
+
+    Stages are kept as a flat list of spans relative to the start of the run, which
+    is written as JSON with per-stage and per-test totals, and as a Chrome trace
+    (viewable in chrome://tracing or ui.perfetto.dev) with one track per device
+    and thread.
+    """
+
+    STAGES = ("discover", "mkdir", "push", "chmod", "execute", "pull", "parse", "report")
+
+    def __init__(self, started=None):
+        self._lock = threading.Lock()
+        # A profiler in a ResultProcessor worker shares the run's start time, so
+        # that its spans can be merged into the run's profile.
+        self.started = time.monotonic() if started is None else started
+        self.spans = []
+        self.sdb_processes = {} # device -> number of SDB processes spawned
+
+    @contextlib.contextmanager
+    def stage(self, stage, test_name, target_id, nbytes=0):
+        """
+        Times the enclosed block as one span of stage. The span dict is yielded, so
+        the block can set its "bytes" once known.
+        """
+        span = {"stage": stage, "test": test_name, "device": target_id or "default", "bytes": nbytes,
+                "thread": threading.current_thread().name}
+        started = time.monotonic()
+        try:
+            yield span
+        finally:
+            self.add_span(span, started, time.monotonic() - started)
+
+    def add_span(self, span, started, duration):
+        """Adds a span of duration seconds that started at monotonic time started."""
+        span = dict(span, start=started - self.started, duration=duration)
+        with self._lock:
+            self.spans.append(span)
+
+    def merge_spans(self, spans):
+        """Adds spans recorded by another profiler with the same start time."""
+        with self._lock:
+            self.spans.extend(spans)
+
+    def timed_records(self, records, test_name, target_id):
+        """
+        Passes records through unchanged and adds the time spent reading them as one
+        "parse" span starting at the first record.
+        """
+        parse_time = 0.0
+        started = None
+        iterator = iter(records)
+        while True:
+            read_started = time.monotonic()
+            if started is None:
+                started = read_started
+            try:
+                record = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                parse_time += time.monotonic() - read_started
+            yield record
+        self.add_span({"stage": "parse", "test": test_name, "device": target_id or "default", "bytes": 0,
+                       "thread": threading.current_thread().name}, started, parse_time)
+
+    def count_sdb_process(self, target_id):
+        with self._lock:
+            device = target_id or "default"
+            self.sdb_processes[device] = self.sdb_processes.get(device, 0) + 1
+
+    def summary(self):
+        """Returns {stage: {"count", "total", "max", "bytes"}} in STAGES order."""
+        summary = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            totals = summary.setdefault(span["stage"], {"count": 0, "total": 0.0, "max": 0.0, "bytes": 0})
+            totals["count"] += 1
+            totals["total"] += span["duration"]
+            totals["max"] = max(totals["max"], span["duration"])
+            totals["bytes"] += span["bytes"]
+        order = {stage: index for index, stage in enumerate(self.STAGES)}
+        return dict(sorted(summary.items(), key=lambda item: order.get(item[0], len(order))))
+
+    def write_json(self, path):
+        with self._lock:
+            spans = list(self.spans)
+            sdb_processes = dict(self.sdb_processes)
+        per_test = {}
+        for span in spans:
+            stages = per_test.setdefault(span["test"] or "(run)", {})
+            stages[span["stage"]] = stages.get(span["stage"], 0.0) + span["duration"]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": self.summary(), "per_test": per_test, "sdb_processes": sdb_processes,
+                       "spans": spans}, f, indent=1)
+
+    def write_chrome_trace(self, path):
+        with self._lock:
+            spans = list(self.spans)
+        device_pids = {}
+        thread_tids = {}
+        events = []
+        for span in spans:
+            pid = device_pids.setdefault(span["device"], len(device_pids) + 1)
+            tid = thread_tids.setdefault((pid, span["thread"]), len(thread_tids) + 1)
+            events.append({"name": span["stage"], "cat": "stage", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": round(span["start"] * 1e6), "dur": round(span["duration"] * 1e6),
+                           "args": {"test": span["test"], "bytes": span["bytes"]}})
+        for device, pid in device_pids.items():
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"device {device}"}})
+        for (pid, thread), tid in thread_tids.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def print_summary(self):
+        print("\n--- Stage Profile ---")
+        print(f"  {'stage':<9} {'count':>6} {'total (s)':>10} {'mean (s)':>9} {'max (s)':>9} {'bytes':>13}")
+        for stage, totals in self.summary().items():
+            print(f"  {stage:<9} {totals['count']:>6} {totals['total']:>10.3f} {totals['total'] / totals['count']:>9.3f} "
+                  f"{totals['max']:>9.3f} {totals['bytes']:>13}")
+        with self._lock:
+            sdb_processes = dict(self.sdb_processes)
+        per_device = ", ".join(f"{device}: {count}" for device, count in sorted(sdb_processes.items()))
+        print(f"  SDB processes spawned: {sum(sdb_processes.values())}{f' ({per_device})' if per_device else ''}")
+        print("---------------------")
+
+
+def _profile_stage(args, stage, test_name=None, nbytes=0):
+    """
+    Returns a context manager timing a stage with the --profile profiler of args,
+    or a no-op one if the run is not profiled. Both yield a dict whose "bytes" the
+    block may set.
+    """
+    profiler = getattr(args, "profiler", None)
+    if profiler is None:
+        return contextlib.nullcontext({})
+    return profiler.stage(stage, test_name or getattr(args, "test_name", None), getattr(args, "target_id", None), nbytes)
+
+
+class TestEventLog:
+    """
+    Thread-safe writer of a JSON Lines stream of live test events (--events-file).
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+
+    def emit(self, event):
+        with self._lock:
+            self._file.write(json.dumps(event) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def parse_telemetry_sample(output):
+    """
+    Parses the output of TELEMETRY_SAMPLE_COMMAND into a dict with the cumulative
+    CPU jiffies ("cpu_busy", "cpu_total"), "mem_percent" and "temp", the hottest
+    thermal zone in °C. Values the device did not report are None.
+    """
+    sample = {"cpu_busy": None, "cpu_total": None, "mem_percent": None, "temp": None}
+    memory = {}
+    temperatures = []
+    for line in output.splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        if fields[0] == "cpu":
+            try:
+                jiffies = [int(value) for value in fields[1:]]
+            except ValueError:
+                continue
+            if len(jiffies) >= 4:
+                # user nice system idle [iowait irq softirq steal ...]; iowait counts as idle.
+                sample["cpu_total"] = sum(jiffies[:8])
+                sample["cpu_busy"] = sample["cpu_total"] - jiffies[3] - (jiffies[4] if len(jiffies) > 4 else 0)
+        elif fields[0] in ("MemTotal:", "MemAvailable:") and len(fields) > 1 and fields[1].isdigit():
+            memory[fields[0]] = int(fields[1])
+        elif len(fields) == 1 and fields[0].lstrip("-").isdigit():
+            value = int(fields[0])
+            temperatures.append(value / 1000 if abs(value) >= TELEMETRY_MILLIDEGREE_MIN else float(value))
+    if memory.get("MemTotal:") and "MemAvailable:" in memory:
+        sample["mem_percent"] = 100.0 * (memory["MemTotal:"] - memory["MemAvailable:"]) / memory["MemTotal:"]
+    if temperatures:
+        sample["temp"] = max(temperatures)
+    return sample
+
+
+class DeviceMonitor:
+    """
+    Samples the health of the devices of a run (--telemetry-interval and
+    --max-device-temp): CPU load from /proc/stat, memory use from /proc/meminfo and
+    the temperature of the hottest thermal zone, read with one shell command per
+    sample. CPU load is the busy share of the jiffies since the previous sample of
+    the same device.
+
+    sampling() collects a timeline of samples in a background thread while an
+    executable runs, and wait_until_cool() holds a device back from the queue while
+    it is at or above max_temp. A device whose output has none of the values is not
+    sampled again.
+    """
+
+    def __init__(self, interval, max_temp):
+        self.interval = interval
+        self.max_temp = max_temp
+        self._lock = threading.Lock()
+        self._cpu_counters = {} # target_id -> (busy, total) jiffies of the last sample
+        self._unavailable = set()
+        self.devices = {} # target_id -> {"samples", "peak_temp", "holds", "held_for"}
+
+    def sample(self, args):
+        """
+        Reads one sample of the device in args.target_id. Returns a (unix time, CPU %,
+        memory %, °C) tuple whose values may be None, or None if the device cannot
+        be sampled.
+        """
+        target_id = args.target_id
+        with self._lock:
+            if target_id in self._unavailable:
+                return None
+        result = execute_sdb_command([SDB_EXECUTABLE, "shell", TELEMETRY_SAMPLE_COMMAND], args, check=False)
+        sampled_at = time.time()
+        values = parse_telemetry_sample(result.stdout)
+        with self._lock:
+            if values["cpu_total"] is None and values["mem_percent"] is None and values["temp"] is None:
+                if target_id not in self._unavailable:
+                    self._unavailable.add(target_id)
+                    print(f"  Warning: Cannot read telemetry from device '{target_id or 'default'}', not sampling it: "
+                          f"{(result.stdout or result.stderr).strip()[:200]}")
+                return None
+            cpu_percent = None
+            previous = self._cpu_counters.get(target_id)
+            if values["cpu_total"] is not None:
+                if previous is not None and values["cpu_total"] > previous[1]:
+                    cpu_percent = 100.0 * (values["cpu_busy"] - previous[0]) / (values["cpu_total"] - previous[1])
+                self._cpu_counters[target_id] = (values["cpu_busy"], values["cpu_total"])
+            device = self.devices.setdefault(target_id or "default",
+                                             {"samples": 0, "peak_temp": None, "holds": 0, "held_for": 0.0})
+            device["samples"] += 1
+            if values["temp"] is not None and (device["peak_temp"] is None or values["temp"] > device["peak_temp"]):
+                device["peak_temp"] = values["temp"]
+        return (round(sampled_at, 3), None if cpu_percent is None else round(cpu_percent, 1),
+                None if values["mem_percent"] is None else round(values["mem_percent"], 1),
+                None if values["temp"] is None else round(values["temp"], 1))
+
+    @contextlib.contextmanager
+    def sampling(self, args):
+        """
+        Samples the device of args every interval seconds, starting right away, while
+        the enclosed block runs. Yields the list the samples are appended to.
+        """
+        samples = []
+        stop = threading.Event()
+
+        def sample_until_stopped():
+            while True:
+                try:
+                    sample = self.sample(args)
+                except FileNotFoundError:
+                    return # Missing SDB; reported by the test run itself
+                if sample is None:
+                    return
+                samples.append(sample)
+                if stop.wait(self.interval):
+                    return
+
+        sampler = threading.Thread(target=sample_until_stopped, name=f"Telemetry-{args.target_id or 'default'}",
+                                   daemon=True)
+        sampler.start()
+        try:
+            yield samples
+        finally:
+            stop.set()
+            sampler.join()
+
+    def overheated(self, args):
+        """Returns True if the device of args is at or above max_temp."""
+        if self.max_temp is None:
+            return False
+        sample = self.sample(args)
+        return sample is not None and sample[3] is not None and sample[3] >= self.max_temp
+
+    def wait_until_cool(self, args, should_stop):
+        """
+        Blocks while the device of args is at or above max_temp, checking it every
+        TELEMETRY_COOLDOWN_POLL seconds. Returns False if should_stop() became true
+        first (e.g. because the other devices drained the queue), else True.
+        """
+        device_label = args.target_id or "default"
+        started = time.monotonic()
+        print(f"  [{device_label}] Device is at or above {self.max_temp:g} °C; "
+              "holding it back from the queue until it cools down.")
+        try:
+            while True:
+                poll_deadline = time.monotonic() + TELEMETRY_COOLDOWN_POLL
+                while time.monotonic() < poll_deadline:
+                    if should_stop():
+                        return False
+                    time.sleep(min(1.0, max(0.0, poll_deadline - time.monotonic())))
+                if not self.overheated(args):
+                    print(f"  [{device_label}] Cooled down after {time.monotonic() - started:.0f}s; resuming.")
+                    return True
+        finally:
+            with self._lock:
+                device = self.devices.setdefault(device_label, {"samples": 0, "peak_temp": None, "holds": 0,
+                                                                "held_for": 0.0})
+                device["holds"] += 1
+                device["held_for"] += time.monotonic() - started
+
+    def write_samples(self, path, samples, args):
+        """Writes the samples of one run on the device of args as JSON (see load_telemetry)."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"device": args.target_id or "default", "interval": self.interval, "samples": samples}, f)
+        except OSError as e:
+            print(f"  Warning: Cannot write telemetry samples to '{path}': {e}")
+
+    def print_summary(self):
+        with self._lock:
+            devices = {device: dict(stats) for device, stats in self.devices.items()}
+        if not devices:
+            return
+        print("\n--- Device Health ---")
+        for device, stats in sorted(devices.items()):
+            peak_temp = "n/a" if stats["peak_temp"] is None else f"{stats['peak_temp']:.1f} °C"
+            held = f", held back {stats['holds']} time(s) for {stats['held_for']:.0f}s to cool down" if stats["holds"] else ""
+            print(f"  {device}: {stats['samples']} sample(s), peak temperature {peak_temp}{held}")
+        print("---------------------")
+
+
+def _telemetry_sampling(args):
+    """
+    Returns a context manager sampling the device of args while the block runs (see
+    DeviceMonitor.sampling), or a no-op one yielding None if telemetry is off.
+    """
+    device_monitor = getattr(args, "device_monitor", None)
+    if device_monitor is None or not device_monitor.interval:
+        return contextlib.nullcontext(None)
+    return device_monitor.sampling(args)
+
+
+def _telemetry_path(local_xml_filepath):
+    """Returns where the telemetry samples of the run producing a result file are kept."""
+    return local_xml_filepath.replace("_console_results.xml", "_results.xml").replace("_results.xml", TELEMETRY_FILE_SUFFIX)
+
+
+def load_telemetry(path):
+    """
+    Reads telemetry samples written by DeviceMonitor.write_samples. Returns a dict
+    with "device", "interval" and "samples" (lists of unix time, CPU %, memory %
+    and °C), or None if there are none.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            telemetry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"  Warning: Cannot read telemetry samples from '{path}': {e}")
+        return None
+    return telemetry if telemetry.get("samples") else None
+
+
+def fetch_file_from_device(remote_path, local_path, args):
+    """
+    Fetches a file from the Tizen device to the host using SDB.
+
+    Args:
+        remote_path (str): Full path to the file on the device.
+        local_path (str): Full path to the destination on the host.
+        args: Parsed command-line arguments.
+
+    Returns:
+        bool: True if fetch was successful, False otherwise.
+    """
+    local_dir = os.path.dirname(local_path)
+    if not os.path.exists(local_dir):
+        try:
+            os.makedirs(local_dir)
+            log_verbose(f"Created local directory for results: {local_dir}", args)
+        except OSError as e:
+            print(f"  Error creating local directory '{local_dir}': {e}") # Keep non-verbose
+            return False
+
+    pull_cmd = [SDB_EXECUTABLE, "pull", remote_path, local_path]
+    log_verbose(f"Attempting to pull {remote_path} to {local_path}", args)
+    transfer = getattr(args, "transfer", None)
+    try:
+        with _profile_stage(args, "pull", getattr(args, "test_name", None) or os.path.basename(remote_path)) as stage:
+            if transfer is not None:
+                stage["bytes"] = transfer.pull(remote_path, local_path, args)
+            else:
+                execute_sdb_command(pull_cmd, args)
+                stage["bytes"] = os.path.getsize(local_path)
+        log_verbose(f"File '{os.path.basename(remote_path)}' fetched successfully.", args)
+        return True
+    except RuntimeError as e:
+        print(f"  Error fetching file: {e}")
+        # Check if the error is because the file doesn't exist on remote
+        if "No such file or directory" in str(e) or "file does not exist" in str(e).lower():
+             print(f"  Hint: The file '{remote_path}' may not exist on the device. Was the test run correctly and did it produce output?")
+        return False
+    except FileNotFoundError: # SDB not found
+        print(f"Error: SDB executable ('{args.sdb_path or SDB_EXECUTABLE}') not found.")
+        return False
+
+
+def fetch_results_bundle(local_xml_filepaths, args):
+    """
+    Fetches several result files from the device's results directory with a single
+    archive transfer. Each local path's file name is the name of the file on the device.
+
+    Returns:
+        set: The local paths that were fetched successfully.
+    """
+    local_dir = os.path.dirname(local_xml_filepaths[0])
+    wanted = {os.path.basename(path): path for path in local_xml_filepaths}
+    archive_name = f"vts_results_{os.getpid()}_{threading.get_ident()}.tar.gz"
+    remote_archive_path = os.path.join(DEFAULT_REMOTE_TEST_DIR, archive_name)
+
+    # Only archive files that exist, so one missing result does not fail the whole pull.
+    pack_cmd = (f"cd {DEFAULT_REMOTE_RESULTS_DIR} && set -- && "
+                f"for f in {' '.join(sorted(wanted))}; do [ -f \"$f\" ] && set -- \"$@\" \"$f\"; done; "
+                f"[ $# -gt 0 ] && tar -czf {remote_archive_path} \"$@\"")
+    fd, local_archive_path = tempfile.mkstemp(suffix=".tar.gz", prefix="vts_results_")
+    os.close(fd)
+    fetched = set()
+    try:
+        log_verbose(f"Fetching {len(wanted)} result file(s) in one archive", args)
+        execute_sdb_command([SDB_EXECUTABLE, "shell", pack_cmd], args)
+        if not fetch_file_from_device(remote_archive_path, local_archive_path, args):
+            return fetched
+        execute_sdb_command([SDB_EXECUTABLE, "shell", f"rm -f {remote_archive_path}"], args, check=False)
+        with tarfile.open(local_archive_path, "r:gz") as archive:
+            for member in archive.getmembers():
+                # Only extract the requested plain files; never trust paths from the device.
+                if member.isfile() and member.name in wanted:
+                    with archive.extractfile(member) as src, open(wanted[member.name], "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+                    fetched.add(wanted[member.name])
+    except RuntimeError as e:
+        print(f"  Error fetching results archive: {e}")
+    except (OSError, tarfile.TarError) as e:
+        print(f"  Error unpacking results archive in '{local_dir}': {e}")
+    finally:
+        os.remove(local_archive_path)
+
+    missing = len(wanted) - len(fetched)
+    if missing:
+        print(f"  Warning: {missing} result file(s) were not found on the device.")
+    return fetched
+
+
+def _suite_record(suite_element):
+    """Builds the summary dict of a <testsuite> element (without its testcases)."""
+    return {
+        "name": suite_element.get("name", "UnknownSuite"),
+        "tests": suite_element.get("tests", "0"),
+        "failures": suite_element.get("failures", "0"),
+        "disabled": suite_element.get("disabled", "0"),
+        "errors": suite_element.get("errors", "0"),
+        "time": suite_element.get("time", "0.0"),
+    }
+
+
+def _testcase_record(case_element):
+    """Builds the result dict of a complete <testcase> element."""
+    case_data = {
+        "name": case_element.get("name", "UnknownCase"),
+        "status": case_element.get("status", "unknown"), # e.g. "run", "notrun"
+        "result": case_element.get("result", "unknown"), # e.g. "completed" (can be inferred)
+        "time": case_element.get("time", "0.0"),
+        "failure": None
+    }
+    failure_element = case_element.find("failure")
+    if failure_element is not None:
+        # Timed-out cases (see GTestConsoleParser) keep their result; others are inferred as failed.
+        case_data["result"] = "timeout" if case_data["result"] == "timeout" else "failed"
+        case_data["failure"] = {
+            "message": failure_element.get("message", "No message"),
+            "type": failure_element.get("type", "") # Often not present, but good to capture
+        }
+        # Sometimes failure message is in text content
+        if failure_element.text and failure_element.text.strip():
+            case_data["failure"]["message"] = failure_element.text.strip()
+    elif case_data["status"] == "run": # If it ran and no failure tag, assume passed
+         case_data["result"] = "passed"
+    
+    # GTest also has <skipped> for disabled tests, but this is usually at suite level by 'disabled' count
+    # If a testcase has status="notrun" and its name is in a --gtest_filter=-..., it's disabled.
+    if case_data["status"] == "notrun" : # Could be due to filter or being disabled
+        # Heuristic: if suite disabled count > 0 and this is notrun, could be disabled.
+        # For simplicity, just mark as skipped if not run.
+         case_data["result"] = "skipped"
+    return case_data
+
+
+def iter_gtest_xml(xml_file_path):
+    """
+    Incrementally parses a GTest XML results file, yielding records as they are read.
+
+    Yields ("testsuite", suite_data) when a <testsuite> starts (its counts come from
+    the element's attributes) and ("testcase", case_data) for every <testcase> of
+    that suite. Elements are cleared as soon as they have been processed, so memory
+    use does not grow with the size of the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ET.ParseError: If the XML is malformed (possibly after some records were yielded).
+        ValueError: If the root element is neither <testsuites> nor <testsuite>.
+    """
+    depth = 0
+    current_suite = None
+    suite_depth = None
+    for event, element in ET.iterparse(xml_file_path, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 1 and element.tag not in ("testsuites", "testsuite"):
+                raise ValueError(f"Unexpected root tag '{element.tag}' in XML. Expected 'testsuites' or 'testsuite'.")
+            # Suites are either the root or direct children of a <testsuites> root.
+            if element.tag == "testsuite" and depth <= 2:
+                current_suite, suite_depth = element, depth
+                yield "testsuite", _suite_record(element)
+            continue
+
+        depth -= 1
+        if element.tag == "testcase" and current_suite is not None and depth == suite_depth:
+            yield "testcase", _testcase_record(element)
+            # Drop the processed testcase (and anything before it) from the suite.
+            current_suite.clear()
+        elif element is current_suite:
+            current_suite = None
+            element.clear()
+
+
+def parse_gtest_xml(xml_file_path):
+    """
+    Parses a GTest XML results file.
+    """
+    parsed_data = {"testsuites": [], "overall": {}}
+    overall_summary = {"tests": 0, "failures": 0, "disabled": 0, "errors": 0, "time": 0.0}
+
+    # GTest XML can have a single <testsuites> root or multiple <testsuite> roots (less common)
+    # Or sometimes a single <testsuite> as the root if only one suite ran.
+    try:
+        suite_data = None
+        for record_type, record in iter_gtest_xml(xml_file_path):
+            if record_type == "testcase":
+                suite_data["testcases"].append(record)
+                continue
+
+            suite_data = dict(record, testcases=[])
+            parsed_data["testsuites"].append(suite_data)
+            try:
+                overall_summary["tests"] += int(suite_data["tests"])
+                overall_summary["failures"] += int(suite_data["failures"])
+                overall_summary["disabled"] += int(suite_data["disabled"])
+                overall_summary["errors"] += int(suite_data["errors"])
+                overall_summary["time"] += float(suite_data["time"])
+            except ValueError:
+                print(f"Warning: Non-integer value for test counts/failures in suite '{suite_data['name']}'.")
+    except FileNotFoundError:
+        print(f"Error: XML results file not found at '{xml_file_path}'.")
+        return None
+    except ET.ParseError as e:
+        print(f"Error: Failed to parse XML file '{xml_file_path}': {e}")
+        return None
+    except ValueError as e: # Unexpected root
+        print(f"Warning: {e}")
+        return None
+
+    parsed_data["overall"] = {k: str(v) for k, v in overall_summary.items()}
+    parsed_data["overall"]["time"] = f"{overall_summary['time']:.3f}" # Format time
+
+    return parsed_data
+
+
+def summarize_gtest_xml(xml_file_path):
+    """
+    Computes the summary of a GTest XML results file without keeping its testcases.
+
+    Unlike parse_gtest_xml, memory use is independent of the number of testcases.
+    Returns a dict with the same "overall" entry as parse_gtest_xml, a "testsuites"
+    list of suite summaries (each with a "results" count per testcase result, e.g.
+    {"passed": 10, "failed": 1}) and an overall "results" count, or None on error.
+    """
+    summary = {"testsuites": [], "results": {}}
+    overall_summary = {"tests": 0, "failures": 0, "disabled": 0, "errors": 0, "time": 0.0}
+    try:
+        suite_data = None
+        for record_type, record in iter_gtest_xml(xml_file_path):
+            if record_type == "testcase":
+                result = record["result"]
+                suite_data["results"][result] = suite_data["results"].get(result, 0) + 1
+                summary["results"][result] = summary["results"].get(result, 0) + 1
+                continue
+
+            suite_data = dict(record, results={})
+            summary["testsuites"].append(suite_data)
+            try:
+                for key in ("tests", "failures", "disabled", "errors"):
+                    overall_summary[key] += int(suite_data[key])
+                overall_summary["time"] += float(suite_data["time"])
+            except ValueError:
+                print(f"Warning: Non-integer value for test counts/failures in suite '{suite_data['name']}'.")
+    except FileNotFoundError:
+        print(f"Error: XML results file not found at '{xml_file_path}'.")
+        return None
+    except ET.ParseError as e:
+        print(f"Error: Failed to parse XML file '{xml_file_path}': {e}")
+        return None
+    except ValueError as e: # Unexpected root
+        print(f"Warning: {e}")
+        return None
+
+    summary["overall"] = {k: str(v) for k, v in overall_summary.items()}
+    summary["overall"]["time"] = f"{overall_summary['time']:.3f}" # Format time
+    return summary
+
+
+def merge_gtest_results(parsed_results_list):
+    """
+    Merges several parsed GTest results (e.g. from the shards of one executable)
+    into a single result with the same structure as returned by parse_gtest_xml.
+    Test suites with the same name are combined.
+    """
+    merged_suites = {}
+    overall_summary = {"tests": 0, "failures": 0, "disabled": 0, "errors": 0, "time": 0.0}
+
+    for parsed_results in parsed_results_list:
+        for suite in parsed_results.get("testsuites", []):
+            merged_suite = merged_suites.setdefault(suite["name"], {
+                "name": suite["name"],
+                "tests": "0", "failures": "0", "disabled": "0", "errors": "0", "time": "0.0",
+                "testcases": []
+            })
+            try:
+                for key in ("tests", "failures", "disabled", "errors"):
+                    merged_suite[key] = str(int(merged_suite[key]) + int(suite.get(key, "0")))
+                merged_suite["time"] = f"{float(merged_suite['time']) + float(suite.get('time', '0.0')):.3f}"
+            except ValueError:
+                print(f"Warning: Non-numeric test counts/time in suite '{suite['name']}' while merging results.")
+            merged_suite["testcases"].extend(suite.get("testcases", []))
+
+        overall = parsed_results.get("overall", {})
+        try:
+            for key in ("tests", "failures", "disabled", "errors"):
+                overall_summary[key] += int(overall.get(key, "0"))
+            overall_summary["time"] += float(overall.get("time", "0.0"))
+        except ValueError:
+            print("Warning: Non-numeric overall test counts/time while merging results.")
+
+    merged_data = {"testsuites": list(merged_suites.values())}
+    merged_data["overall"] = {k: str(v) for k, v in overall_summary.items()}
+    merged_data["overall"]["time"] = f"{overall_summary['time']:.3f}" # Format time
+    return merged_data
+
+
+def iter_parsed_results(parsed_results):
+    """
+    Yields the records of a parsed results dict (as returned by parse_gtest_xml or
+    merge_gtest_results) in the same form as iter_gtest_xml.
+    """
+    for suite in parsed_results.get("testsuites", []):
+        yield "testsuite", {key: value for key, value in suite.items() if key != "testcases"}
+        for case in suite.get("testcases", []):
+            yield "testcase", case
+
+
+class ResultTally:
+    """
+    Counts the testcase results of a stream of records (see iter_gtest_xml), per
+    suite and overall, sums their durations, and remembers the testcases that
+    failed and the RUN_REPORT_SLOWEST_TESTCASES slowest ones by their full names
+    ("Suite.Case"). A tally holds no other testcases, so it is cheap to pass
+    between processes (see ResultProcessor).
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.suites = {} # suite name -> {"results": {result: count}, "time": seconds}
+        self.time = 0.0
+        self.failures = [] # (full name, result, failure message cut to RUN_REPORT_FAILURE_MESSAGE_CHARS)
+        self.slowest = [] # Min-heap of (seconds, full name)
+        self.complete = False
+        self.report_filepath = None # Set once the results are reported
+        self.junit_filepath = None # Set once the JUnit fragment is written (see JUnitFragmentWriter)
+        self.telemetry = [] # Device samples of the run(s), as read by load_telemetry() plus a "label"
+
+    def track(self, records):
+        """Passes records through unchanged while counting them."""
+        suite_name = "UnknownSuite"
+        for record_type, record in records:
+            if record_type == "testsuite":
+                suite_name = record.get("name", "UnknownSuite")
+            else:
+                result = record.get("result", "unknown")
+                self.results[result] = self.results.get(result, 0) + 1
+                suite = self.suites.setdefault(suite_name, {"results": {}, "time": 0.0})
+                suite["results"][result] = suite["results"].get(result, 0) + 1
+                try:
+                    duration = float(record.get("time") or 0.0)
+                except ValueError:
+                    duration = 0.0
+                suite["time"] += duration
+                self.time += duration
+                full_name = f"{suite_name}.{record.get('name', 'UnknownCase')}"
+                if result in ("failed", "timeout"):
+                    message = (record.get("failure") or {}).get("message", "")
+                    self.failures.append((full_name, result, message[:RUN_REPORT_FAILURE_MESSAGE_CHARS]))
+                if len(self.slowest) < RUN_REPORT_SLOWEST_TESTCASES:
+                    heapq.heappush(self.slowest, (duration, full_name))
+                elif duration > self.slowest[0][0]:
+                    heapq.heapreplace(self.slowest, (duration, full_name))
+            yield record_type, record
+        self.complete = True
+
+    @property
+    def failed_tests(self):
+        """Full names of the failed testcases, in the order they were seen."""
+        return [full_name for full_name, _, _ in self.failures]
+
+    @property
+    def passed(self):
+        """True if all records were seen and no testcase failed."""
+        return self.complete and not self.failed_tests
+
+
+class JUnitFragmentWriter:
+    """
+    Writes a stream of records (see iter_gtest_xml) of one test executable as JUnit
+    XML <testsuite> elements named "<executable>.<suite>", without a root element,
+    so that the fragments of all executables can be joined into the JUnit file of
+    the run (see RunSummary.write_junit). The testcases of a suite are spooled to a
+    temporary file until the suite's counts are known, so memory use stays bounded.
+    """
+
+    def __init__(self, fragment_path, test_executable_name):
+        self.fragment_path = fragment_path
+        self.test_executable_name = test_executable_name
+
+    def writing(self, records):
+        """Passes records through unchanged while writing them; the fragment only appears once all were seen."""
+        partial_path = f"{self.fragment_path}.tmp"
+        completed = False
+        try:
+            with open(partial_path, "w", encoding="utf-8") as f:
+                suite_name, body = None, None
+                counts = {"tests": 0, "failures": 0, "skipped": 0, "time": 0.0}
+                for record_type, record in records:
+                    if record_type == "testsuite":
+                        if body is not None:
+                            self._write_suite(f, suite_name, counts, body)
+                        suite_name = record.get("name", "UnknownSuite")
+                        body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode="w+", encoding="utf-8")
+                        counts = {"tests": 0, "failures": 0, "skipped": 0, "time": 0.0}
+                    elif body is not None:
+                        self._write_testcase(body, suite_name, record, counts)
+                    yield record_type, record
+                if body is not None:
+                    self._write_suite(f, suite_name, counts, body)
+            os.replace(partial_path, self.fragment_path)
+            completed = True
+        finally:
+            if not completed and os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    def _write_testcase(self, body, suite_name, record, counts):
+        result = record.get("result", "unknown")
+        try:
+            duration = float(record.get("time") or 0.0)
+        except ValueError:
+            duration = 0.0
+        counts["tests"] += 1
+        counts["time"] += duration
+        classname = html.escape(f"{self.test_executable_name}.{suite_name}")
+        body.write(f'    <testcase name="{html.escape(record.get("name", "UnknownCase"))}" classname="{classname}" '
+                   f'time="{duration:.3f}">\n')
+        message = (record.get("failure") or {}).get("message", "")
+        if result in ("failed", "timeout"):
+            counts["failures"] += 1
+            body.write(f'      <failure message="{html.escape(message.splitlines()[0] if message else result)}" '
+                       f'type="{result}">{html.escape(message)}</failure>\n')
+        elif result == "skipped":
+            counts["skipped"] += 1
+            body.write("      <skipped/>\n")
+        elif result == "flaky":
+            body.write(f"      <system-out>{html.escape(message)}</system-out>\n")
+        body.write("    </testcase>\n")
+
+    def _write_suite(self, f, suite_name, counts, body):
+        f.write(f'  <testsuite name="{html.escape(f"{self.test_executable_name}.{suite_name}")}" '
+                f'tests="{counts["tests"]}" failures="{counts["failures"]}" errors="0" skipped="{counts["skipped"]}" '
+                f'time="{counts["time"]:.3f}">\n')
+        body.seek(0)
+        shutil.copyfileobj(body, f)
+        body.close()
+        f.write("  </testsuite>\n")
+
+
+def create_timestamped_file(directory, prefix, suffix):
+    """
+    Creates an empty file named <prefix>_<timestamp><suffix> in directory and
+    returns its path. The file is created exclusively, with a counter appended to
+    the timestamp if that name is taken, so runs finishing within the same second
+    do not overwrite each other's output. Raises OSError if it cannot be created.
+    """
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    counter = 0
+    while True:
+        path = os.path.join(directory, f"{prefix}_{timestamp}{f'_{counter}' if counter else ''}{suffix}")
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return path
+        except FileExistsError:
+            counter += 1
+
+
+_HTML_REPORT_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        h1, h2 {{ color: #333; }}
+        table {{ border-collapse: collapse; width: 100%; margin-bottom: 20px; }}
+        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+        th {{ background-color: #f2f2f2; }}
+        .summary-table th {{ background-color: #e0e0e0; }}
+        .failed {{ background-color: #ffcccc; }}
+        .passed {{ background-color: #ccffcc; }}
+        .skipped {{ background-color: #ffffcc; }}
+        .timeout {{ background-color: #ffb366; }}
+        .flaky {{ background-color: #e6ccff; }}
+        .details {{ white-space: pre-wrap; font-family: monospace; }}
+        .timestamp {{ font-size: 0.9em; color: #555; margin-bottom:20px; }}
+        summary {{ cursor: pointer; margin-bottom: 10px; }}
+        .pages a {{ margin-right: 8px; }}
+        .note {{ background-color: #e6f0ff; border: 1px solid #99bbee; padding: 8px; margin-bottom: 20px; }}
+        .timeline {{ border: 1px solid #ddd; margin-bottom: 10px; }}
+        .legend span {{ margin-right: 15px; }}
+    </style>
+</head>
+<body>
+"""
+
+_HTML_CASE_TABLE_HEADER = "<table>\n<tr><th>Name</th><th>Status</th><th>Result</th><th>Time (s)</th><th>Failure Details</th></tr>\n"
+
+
+def _html_testcase_row(case):
+    """Returns the HTML table row for one testcase record."""
+    result_class = html.escape(case.get('result', 'unknown'))
+    failure_info = case.get('failure')
+    if failure_info:
+        details = f"<td class='details'>{html.escape(failure_info.get('message', 'No details'))}</td>"
+    else:
+        details = "<td>N/A</td>"
+    return (f"<tr class='{result_class}'>"
+            f"<td>{html.escape(case.get('name', 'N/A'))}</td>"
+            f"<td>{html.escape(case.get('status', 'N/A'))}</td>"
+            f"<td>{result_class}</td>"
+            f"<td>{html.escape(case.get('time', 'N/A'))}</td>"
+            f"{details}</tr>\n")
+
+
+# Telemetry timelines: (title, unit, index in a sample) per chart, and line colours
+_TELEMETRY_METRICS = (("CPU load", "%", 1), ("Memory use", "%", 2), ("Temperature", "°C", 3))
+_TELEMETRY_COLORS = ("#1f77b4", "#d62728", "#2ca02c", "#ff7f0e", "#9467bd", "#8c564b", "#e377c2", "#17becf")
+
+
+def _html_telemetry_timelines(series):
+    """
+    Returns HTML with one SVG timeline per telemetry metric and a line per
+    (label, samples) in series. Samples are (unix time, CPU %, memory %, °C)
+    sequences (see DeviceMonitor.sample), or None to break the line. Time is shown
+    in seconds from the first sample.
+    """
+    times = [sample[0] for _, samples in series for sample in samples if sample is not None]
+    if not times:
+        return "<p>No telemetry samples.</p>\n"
+    started = min(times)
+    duration = max(max(times) - started, 1.0)
+    width, height, left, right, top, bottom = 760, 150, 45, 10, 10, 20
+    plot_width, plot_height = width - left - right, height - top - bottom
+
+    parts = ["<p class='legend'>" + "".join(
+        f"<span style='color:{_TELEMETRY_COLORS[index % len(_TELEMETRY_COLORS)]}'>&#9632; {html.escape(label)}</span>"
+        for index, (label, _) in enumerate(series)) + "</p>\n"]
+    for title, unit, value_index in _TELEMETRY_METRICS:
+        values = [sample[value_index] for _, samples in series for sample in samples
+                  if sample is not None and sample[value_index] is not None]
+        if not values:
+            continue
+        if unit == "%":
+            low, high = 0.0, 100.0
+        else:
+            low, high = 5.0 * (int(min(values)) // 5), 5.0 * (int(max(values)) // 5 + 1)
+        parts.append(f"<h3>{title} ({unit})</h3>\n<svg class='timeline' width='{width}' height='{height}' "
+                     f"xmlns='http://www.w3.org/2000/svg' font-size='11'>\n")
+        parts.append(f"<line x1='{left}' y1='{top}' x2='{width - right}' y2='{top}' stroke='#eee'/>"
+                     f"<line x1='{left}' y1='{top + plot_height}' x2='{width - right}' y2='{top + plot_height}' stroke='#999'/>\n"
+                     f"<text x='{left - 4}' y='{top + 8}' text-anchor='end'>{high:g}</text>"
+                     f"<text x='{left - 4}' y='{top + plot_height}' text-anchor='end'>{low:g}</text>"
+                     f"<text x='{left}' y='{height - 4}'>0 s</text>"
+                     f"<text x='{width - right}' y='{height - 4}' text-anchor='end'>{duration:.0f} s</text>\n")
+        for index, (label, samples) in enumerate(series):
+            color = _TELEMETRY_COLORS[index % len(_TELEMETRY_COLORS)]
+            segments = [[]]
+            for sample in samples:
+                if sample is None or sample[value_index] is None:
+                    segments.append([])
+                    continue
+                x = left + plot_width * (sample[0] - started) / duration
+                y = top + plot_height * (1.0 - (min(max(sample[value_index], low), high) - low) / (high - low))
+                segments[-1].append(f"{x:.1f},{y:.1f}")
+            for points in segments:
+                if len(points) == 1:
+                    x, y = points[0].split(",")
+                    parts.append(f"<circle cx='{x}' cy='{y}' r='2' fill='{color}'><title>{html.escape(label)}</title></circle>\n")
+                elif points:
+                    parts.append(f"<polyline fill='none' stroke='{color}' stroke-width='1.5' points='{' '.join(points)}'>"
+                                 f"<title>{html.escape(label)}</title></polyline>\n")
+        parts.append("</svg>\n")
+    return "".join(parts)
+
+
+def telemetry_stats(samples):
+    """Returns the mean CPU %, peak memory % and peak °C of samples, each None if never sampled."""
+    def values(index):
+        return [sample[index] for sample in samples if sample is not None and sample[index] is not None]
+    cpu, memory, temperature = values(1), values(2), values(3)
+    return (round(sum(cpu) / len(cpu), 1) if cpu else None, max(memory) if memory else None,
+            max(temperature) if temperature else None)
+
+
+class _StreamingReportWriter:
+    """
+    Writes an HTML report from a stream of testsuite/testcase records.
+
+    The index page only holds the overall summary and one section per suite. Up to
+    rows_per_page testcase rows of a suite are buffered; a suite that ends within
+    that budget is shown inline in a collapsible section, while larger suites are
+    streamed into numbered pages of rows_per_page rows in pages_dir, linked from the
+    index. Memory use is therefore bounded by rows_per_page, not by the run size.
+    """
+
+    def __init__(self, body_file, index_filename, pages_dir, rows_per_page):
+        self.body_file = body_file
+        self.index_filename = index_filename
+        self.pages_dir = pages_dir
+        self.rows_per_page = rows_per_page
+        self.overall = {"tests": 0, "failures": 0, "disabled": 0, "errors": 0, "time": 0.0}
+        self.suite_count = 0
+        self._suite = None
+
+    def add_suite(self, suite):
+        self._finish_suite()
+        self.suite_count += 1
+        self._suite = suite
+        self._suite_results = {}
+        self._buffered_rows = []
+        self._page_file = None
+        self._page_paths = []
+        try:
+            for key in ("tests", "failures", "disabled", "errors"):
+                self.overall[key] += int(suite.get(key, "0"))
+            self.overall["time"] += float(suite.get("time", "0.0"))
+        except ValueError:
+            print(f"Warning: Non-integer value for test counts/failures in suite '{suite.get('name')}'.")
+
+    def add_testcase(self, case):
+        if self._suite is None:
+            self.add_suite({"name": "Unnamed Suite"})
+        result = case.get("result", "unknown")
+        self._suite_results[result] = self._suite_results.get(result, 0) + 1
+        row = _html_testcase_row(case)
+
+        if self._page_file is None and len(self._buffered_rows) < self.rows_per_page:
+            self._buffered_rows.append(row)
+            return
+        if self._page_file is None:
+            self._open_page() # Starts with the full buffer
+        if self._rows_in_page >= self.rows_per_page:
+            self._open_page()
+        self._page_file.write(row)
+        self._rows_in_page += 1
+
+    def _open_page(self):
+        more_pages = self._page_file is not None
+        if more_pages:
+            self._close_page(has_next=True)
+        else:
+            os.makedirs(self.pages_dir, exist_ok=True)
+        page_number = len(self._page_paths) + 1
+        page_path = os.path.join(self.pages_dir, f"suite{self.suite_count:04d}_page{page_number:04d}.html")
+        self._page_paths.append(page_path)
+        self._page_file = open(page_path, "w", encoding="utf-8")
+        suite_name = html.escape(self._suite.get("name", "Unnamed Suite"))
+        self._page_file.write(_HTML_REPORT_HEAD.format(title=f"{suite_name} - page {page_number}"))
+        self._page_file.write(f"<h1>Test Suite: {suite_name} (page {page_number})</h1>\n")
+        nav = [f"<a href='../{html.escape(self.index_filename)}'>Back to report</a>"]
+        if page_number > 1:
+            nav.append(f"<a href='{os.path.basename(self._page_paths[-2])}'>Previous page</a>")
+        self._page_file.write(f"<p class='pages'>{' '.join(nav)}</p>\n")
+        self._page_file.write(_HTML_CASE_TABLE_HEADER)
+        self._rows_in_page = 0
+        if not more_pages:
+            # The first page starts with the rows buffered so far.
+            self._page_file.writelines(self._buffered_rows)
+            self._rows_in_page = len(self._buffered_rows)
+            self._buffered_rows = []
+
+    def _close_page(self, has_next):
+        self._page_file.write("</table>\n")
+        if has_next:
+            next_page = f"suite{self.suite_count:04d}_page{len(self._page_paths) + 1:04d}.html"
+            self._page_file.write(f"<p class='pages'><a href='{next_page}'>Next page</a></p>\n")
+        self._page_file.write("</body>\n</html>")
+        self._page_file.close()
+
+    def _finish_suite(self):
+        suite = self._suite
+        if suite is None:
+            return
+        self._suite = None
+        results_text = ", ".join(f"{result}: {count}" for result, count in sorted(self._suite_results.items()))
+        has_failures = self._suite_results.get("failed", 0) + self._suite_results.get("timeout", 0) > 0
+        self.body_file.write(f"<h2>Test Suite: {html.escape(suite.get('name', 'Unnamed Suite'))}</h2>\n")
+        self.body_file.write(
+            f"<p>Tests: {html.escape(suite.get('tests', '0'))}, Failures: {html.escape(suite.get('failures', '0'))}, "
+            f"Disabled: {html.escape(suite.get('disabled', '0'))}, Errors: {html.escape(suite.get('errors', '0'))}, "
+            f"Time: {html.escape(suite.get('time', '0.0'))}s</p>\n")
+
+        if self._page_file is None and not self._buffered_rows:
+            self.body_file.write("<p>No test cases.</p>\n")
+            return
+        if self._page_file is None:
+            self.body_file.write(f"<details{' open' if has_failures else ''}><summary>Test cases ({results_text or 'none'})</summary>\n")
+            self.body_file.write(_HTML_CASE_TABLE_HEADER)
+            self.body_file.writelines(self._buffered_rows)
+            self.body_file.write("</table>\n</details>\n")
+            self._buffered_rows = []
+            return
+
+        self._close_page(has_next=False)
+        pages_dirname = os.path.basename(self.pages_dir)
+        links = " ".join(f"<a href='{html.escape(pages_dirname)}/{os.path.basename(path)}'>{number}</a>"
+                         for number, path in enumerate(self._page_paths, start=1))
+        self.body_file.write(f"<p>Test cases ({results_text}), {len(self._page_paths)} pages:</p>\n")
+        self.body_file.write(f"<p class='pages'>{links}</p>\n")
+        self._page_file = None
+
+    def finish(self):
+        self._finish_suite()
+
+
+def generate_html_report(parsed_results, report_file_path, rows_per_page=None, note=None, telemetry=None):
+    """
+    Generates a basic HTML report from GTest results.
+
+    parsed_results is either an iterable of records as yielded by iter_gtest_xml, in
+    which case the report is written without materializing the results, or a dict
+    as returned by parse_gtest_xml. Testcase rows are streamed to disk; suites with
+    more than rows_per_page testcases (default: REPORT_ROWS_PER_PAGE) are split into
+    separate pages in a '<report name>_files' directory next to the report.
+
+    If note is given, it is shown below the report title. If telemetry is given (see
+    load_telemetry, with a "label" per entry), it is shown as timelines below the
+    overall summary.
+
+    Errors raised while reading the records (e.g. ET.ParseError) propagate to the
+    caller; no partial report is left behind in that case.
+    """
+    if isinstance(parsed_results, dict):
+        records = iter_parsed_results(parsed_results)
+    else:
+        records = parsed_results
+    pages_dir = f"{os.path.splitext(report_file_path)[0]}_files"
+    body_path = f"{report_file_path}.body.tmp"
+    partial_report_path = f"{report_file_path}.tmp"
+
+    try:
+        with open(body_path, "w", encoding="utf-8") as body_file:
+            writer = _StreamingReportWriter(body_file, os.path.basename(report_file_path), pages_dir,
+                                            rows_per_page or REPORT_ROWS_PER_PAGE)
+            for record_type, record in records:
+                if record_type == "testsuite":
+                    writer.add_suite(record)
+                else:
+                    writer.add_testcase(record)
+            writer.finish()
+
+        # The overall summary is only known after all records have been seen, so the
+        # index is assembled from the head, the summary and the streamed body.
+        with open(partial_report_path, "w", encoding="utf-8") as f:
+            f.write(_HTML_REPORT_HEAD.format(title="Tizen VTS Test Report"))
+            f.write("    <h1>Tizen VTS Test Report</h1>\n")
+            f.write(f"<div class='timestamp'>Report generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>\n")
+            if note:
+                f.write(f"<div class='note'>{html.escape(note)}</div>\n")
+            f.write("<h2>Overall Summary</h2>\n")
+            f.write("<table class='summary-table'>\n<tr>")
+            overall = dict(writer.overall, time=f"{writer.overall['time']:.3f}")
+            headers = ["Total Tests", "Failures", "Disabled", "Errors", "Time (s)"]
+            keys = ["tests", "failures", "disabled", "errors", "time"]
+            for header, key in zip(headers, keys):
+                f.write(f"<th>{header}</th><td>{overall[key]}</td>")
+            f.write("</tr>\n</table>\n")
+            if telemetry:
+                f.write("<h2>Device Telemetry</h2>\n")
+                f.write(_html_telemetry_timelines([(entry["label"], entry["samples"]) for entry in telemetry]))
+            with open(body_path, "r", encoding="utf-8") as body_file:
+                shutil.copyfileobj(body_file, f)
+            f.write("</body>\n</html>")
+        os.replace(partial_report_path, report_file_path)
+        print(f"  HTML report written to {report_file_path}")
+    except IOError as e:
+        print(f"Error writing HTML report to '{report_file_path}': {e}")
+    finally:
+        for temp_path in (body_path, partial_report_path):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+_RUN_REPORT_SORT_SCRIPT = """<script>
+// Sorts a table.sortable by the clicked column; a second click reverses the order.
+document.querySelectorAll("table.sortable").forEach(function (table) {
+    table.querySelectorAll("th").forEach(function (header, column) {
+        header.addEventListener("click", function () {
+            var descending = header.dataset.order !== "desc";
+            header.dataset.order = descending ? "desc" : "asc";
+            var rows = Array.from(table.rows).slice(1);
+            rows.sort(function (a, b) {
+                var x = a.cells[column].textContent, y = b.cells[column].textContent;
+                var numeric = x !== "" && y !== "" && !isNaN(x) && !isNaN(y);
+                var order = numeric ? x - y : x.localeCompare(y);
+                return descending ? -order : order;
+            });
+            rows.forEach(function (row) { row.parentNode.appendChild(row); });
+        });
+    });
+});
+</script>
+"""
+
+
+class RunSummary:
+    """
+    Folds the ResultTally of each executable of a run into run-wide totals as soon
+    as it is reported (see ResultProcessor), and writes the whole run as one indexed
+    HTML report with sortable tables, a JSON summary and a JUnit XML file. Nothing
+    is parsed again: memory use grows with the number of suites and failed
+    testcases, not with the number of testcases.
+    """
+
+    def __init__(self):
+        self.executables = {} # test name -> ResultTally
+        self.results = {}
+        self.time = 0.0
+        self.slowest = [] # Min-heap of (seconds, test name, full testcase name)
+
+    def add(self, test_executable_name, tally):
+        self.executables[test_executable_name] = tally
+        for result, count in tally.results.items():
+            self.results[result] = self.results.get(result, 0) + count
+        self.time += tally.time
+        for duration, full_name in tally.slowest:
+            if len(self.slowest) < RUN_REPORT_SLOWEST_TESTCASES:
+                heapq.heappush(self.slowest, (duration, test_executable_name, full_name))
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (duration, test_executable_name, full_name))
+
+    @property
+    def tests(self):
+        return sum(self.results.values())
+
+    @property
+    def failures(self):
+        return self.results.get("failed", 0) + self.results.get("timeout", 0)
+
+    def summary_line(self):
+        """One line with the testcase counts of the run, e.g. for the console summary."""
+        counts = ", ".join(f"{result}: {count}" for result, count in sorted(self.results.items()))
+        return f"{self.tests} testcase(s) ({counts or 'none'}) in {self.time:.3f} s"
+
+    def device_timelines(self):
+        """
+        Returns (device, samples) per device, with the samples of all its runs in time
+        order; the line is broken (None) between runs more than three sampling
+        intervals apart.
+        """
+        runs_by_device = {}
+        for tally in self.executables.values():
+            for entry in tally.telemetry:
+                runs_by_device.setdefault(entry["device"], []).append(entry)
+        timelines = []
+        for device, runs in sorted(runs_by_device.items()):
+            samples = []
+            for entry in sorted(runs, key=lambda run: run["samples"][0][0]):
+                if samples and entry["samples"][0][0] - samples[-1][0] > 3 * entry["interval"]:
+                    samples.append(None)
+                samples.extend(entry["samples"])
+            timelines.append((device, samples))
+        return timelines
+
+    def write_reports(self, host_results_dir):
+        """
+        Writes run_report_<timestamp>.html, .json and _junit.xml (see
+        create_timestamped_file); returns the paths written.
+        """
+        try:
+            base_path = os.path.splitext(create_timestamped_file(host_results_dir, "run_report", ".html"))[0]
+        except OSError as e:
+            print(f"Error creating the run report in '{host_results_dir}': {e}")
+            return []
+        written = []
+        for path, write in ((f"{base_path}.html", self.write_html), (f"{base_path}.json", self.write_json),
+                            (f"{base_path}_junit.xml", self.write_junit)):
+            partial_path = f"{path}.tmp"
+            try:
+                with open(partial_path, "w", encoding="utf-8") as f:
+                    write(f)
+                os.replace(partial_path, path)
+                written.append(path)
+            except OSError as e:
+                print(f"Error writing run report to '{path}': {e}")
+            finally:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+        return written
+
+    def write_html(self, f):
+        result_keys = sorted(self.results)
+        f.write(_HTML_REPORT_HEAD.format(title="Tizen VTS Run Report"))
+        f.write("    <h1>Tizen VTS Run Report</h1>\n")
+        f.write(f"<div class='timestamp'>Report generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>\n")
+        has_telemetry = any(tally.telemetry for tally in self.executables.values())
+        f.write("<p><a href='#executables'>Executables</a> | <a href='#failures'>Failures</a> | "
+                "<a href='#slowest'>Slowest Testcases</a> | <a href='#suites'>Suites</a>")
+        f.write(" | <a href='#telemetry'>Device Telemetry</a></p>\n" if has_telemetry else "</p>\n")
+        f.write("<p>Click a column header to sort a table.</p>\n")
+        f.write("<h2>Overall Summary</h2>\n")
+        f.write("<table class='summary-table'>\n<tr>")
+        f.write(f"<th>Executables</th><td>{len(self.executables)}</td><th>Total Tests</th><td>{self.tests}</td>")
+        for result in result_keys:
+            f.write(f"<th>{html.escape(result.capitalize())}</th><td>{self.results[result]}</td>")
+        f.write(f"<th>Time (s)</th><td>{self.time:.3f}</td></tr>\n</table>\n")
+
+        f.write("<h2 id='executables'>Executables</h2>\n<table class='sortable'>\n<tr><th>Executable</th><th>Tests</th>")
+        f.write("".join(f"<th>{html.escape(result.capitalize())}</th>" for result in result_keys))
+        f.write("<th>Time (s)</th><th>Report</th></tr>\n")
+        for test_name, tally in sorted(self.executables.items()):
+            report_link = (f"<a href='{html.escape(os.path.basename(tally.report_filepath))}'>Report</a>"
+                           if tally.report_filepath else "N/A")
+            f.write(f"<tr class='{'passed' if tally.passed else 'failed'}'>"
+                    f"<td><a href='#suites-{html.escape(test_name)}'>{html.escape(test_name)}</a></td>"
+                    f"<td>{sum(tally.results.values())}</td>")
+            f.write("".join(f"<td>{tally.results.get(result, 0)}</td>" for result in result_keys))
+            f.write(f"<td>{tally.time:.3f}</td><td>{report_link}</td></tr>\n")
+        f.write("</table>\n")
+
+        f.write(f"<h2 id='failures'>Failures</h2>\n")
+        if self.failures:
+            f.write("<table class='sortable'>\n<tr><th>Executable</th><th>Testcase</th><th>Result</th><th>Failure Details</th></tr>\n")
+            for test_name, tally in sorted(self.executables.items()):
+                for full_name, result, message in tally.failures:
+                    f.write(f"<tr class='{html.escape(result)}'><td>{html.escape(test_name)}</td><td>{html.escape(full_name)}</td>"
+                            f"<td>{html.escape(result)}</td><td class='details'>{html.escape(message)}</td></tr>\n")
+            f.write("</table>\n")
+        else:
+            f.write("<p>No testcase failed.</p>\n")
+
+        f.write(f"<h2 id='slowest'>Slowest Testcases</h2>\n<table class='sortable'>\n"
+                "<tr><th>Executable</th><th>Testcase</th><th>Time (s)</th></tr>\n")
+        for duration, test_name, full_name in sorted(self.slowest, reverse=True):
+            f.write(f"<tr><td>{html.escape(test_name)}</td><td>{html.escape(full_name)}</td><td>{duration:.3f}</td></tr>\n")
+        f.write("</table>\n")
+
+        f.write("<h2 id='suites'>Suites</h2>\n")
+        for test_name, tally in sorted(self.executables.items()):
+            f.write(f"<details id='suites-{html.escape(test_name)}'{'' if tally.passed else ' open'}>"
+                    f"<summary>{html.escape(test_name)} ({len(tally.suites)} suites)</summary>\n")
+            f.write("<table class='sortable'>\n<tr><th>Suite</th><th>Tests</th>")
+            f.write("".join(f"<th>{html.escape(result.capitalize())}</th>" for result in result_keys))
+            f.write("<th>Time (s)</th></tr>\n")
+            for suite_name, suite in tally.suites.items():
+                f.write(f"<tr><td>{html.escape(suite_name)}</td><td>{sum(suite['results'].values())}</td>")
+                f.write("".join(f"<td>{suite['results'].get(result, 0)}</td>" for result in result_keys))
+                f.write(f"<td>{suite['time']:.3f}</td></tr>\n")
+            f.write("</table>\n</details>\n")
+
+        if has_telemetry:
+            f.write("<h2 id='telemetry'>Device Telemetry</h2>\n<table class='sortable'>\n"
+                    "<tr><th>Executable</th><th>Run</th><th>Samples</th><th>Mean CPU (%)</th>"
+                    "<th>Peak Memory (%)</th><th>Peak Temperature (°C)</th></tr>\n")
+            for test_name, tally in sorted(self.executables.items()):
+                for entry in tally.telemetry:
+                    stats = "".join(f"<td>{'' if value is None else value}</td>" for value in telemetry_stats(entry["samples"]))
+                    f.write(f"<tr><td>{html.escape(test_name)}</td><td>{html.escape(entry['label'])}</td>"
+                            f"<td>{len(entry['samples'])}</td>{stats}</tr>\n")
+            f.write("</table>\n")
+            f.write(_html_telemetry_timelines(self.device_timelines()))
+        f.write(_RUN_REPORT_SORT_SCRIPT)
+        f.write("</body>\n</html>")
+
+    def write_json(self, f):
+        json.dump({
+            "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "tests": self.tests,
+            "results": self.results,
+            "time": round(self.time, 3),
+            "executables": {
+                test_name: {
+                    "passed": tally.passed,
+                    "tests": sum(tally.results.values()),
+                    "results": tally.results,
+                    "time": round(tally.time, 3),
+                    "report": tally.report_filepath,
+                    "suites": {suite_name: {"results": suite["results"], "time": round(suite["time"], 3)}
+                               for suite_name, suite in tally.suites.items()},
+                    "failures": [{"name": full_name, "result": result, "message": message}
+                                 for full_name, result, message in tally.failures],
+                    "telemetry": [{"label": entry["label"], "device": entry["device"], "interval": entry["interval"],
+                                   "samples": entry["samples"]} for entry in tally.telemetry],
+                } for test_name, tally in sorted(self.executables.items())
+            },
+            "slowest": [{"executable": test_name, "name": full_name, "time": round(duration, 3)}
+                        for duration, test_name, full_name in sorted(self.slowest, reverse=True)],
+        }, f, indent=1)
+
+    def write_junit(self, f):
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<testsuites name="Tizen VTS" tests="{self.tests}" failures="{self.failures}" errors="0" '
+                f'skipped="{self.results.get("skipped", 0)}" time="{self.time:.3f}">\n')
+        for test_name, tally in sorted(self.executables.items()):
+            if tally.junit_filepath is None:
+                continue
+            try:
+                with open(tally.junit_filepath, "r", encoding="utf-8") as fragment:
+                    shutil.copyfileobj(fragment, f)
+            except OSError as e:
+                print(f"Warning: Cannot read the JUnit results of '{test_name}', leaving them out: {e}")
+        f.write("</testsuites>\n")
@@ -0,0 +1,341 @@
+// vts_agent: device-resident test runner for the Tizen VTS harness.
+//
+// The harness deploys this agent once per session, starts it in the background and
+// connects to it through 'sdb forward'. Over that single TCP connection it sends run
+// requests; the agent runs them (several at a time if requested) and streams their
+// console output, XML results and exit codes back. This replaces the separate
+// 'sdb shell' calls for mkdir, chmod and the test itself, and the 'sdb pull' of
+// each result file.
+//
+// Protocol: text lines with tab-separated fields.
+//   Host -> agent:
+//     RUN  <id> <xml_path> [VAR=value...] <executable> [arg...]
+//     KILL <id>
+//     PING <id>
+//     QUIT
+//   Agent -> host:
+//     OUT  <id> <line>       One line of the test's stdout/stderr.
+//     XML  <id> <size>       Followed by <size> raw bytes: the file at <xml_path>.
+//     EXIT <id> <code>       Exit code; 128 + signal number if the test was killed.
+//     ERR  <id> <message>    The request could not be started.
+//     PONG <id>              Answer to PING.
+//
+// The harness-side counterpart is DeviceAgent in harness/vts_harness.py, and
+// harness/vts_agent_standin.py implements the same protocol on the host for
+// testing without hardware.
+
+#include <cerrno>
+#include <csignal>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <map>
+#include <string>
+#include <vector>
+
+#include <arpa/inet.h>
+#include <fcntl.h>
+#include <netinet/in.h>
+#include <poll.h>
+#include <sys/socket.h>
+#include <sys/stat.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+namespace {
+
+const int kDefaultPort = 5599;
+
+struct Run {
+    std::string id;
+    pid_t pid;
+    int output_fd;
+    std::string xml_path;
+    std::string partial_line;
+};
+
+int client_fd = -1;
+
+void SendAll(const char* data, size_t length) {
+    while (length > 0 && client_fd >= 0) {
+        ssize_t written = write(client_fd, data, length);
+        if (written < 0) {
+            if (errno == EINTR) continue;
+            return; // The connection is gone; the main loop notices on the next read.
+        }
+        data += written;
+        length -= static_cast<size_t>(written);
+    }
+}
+
+void SendLine(const std::string& line) {
+    std::string framed = line + "\n";
+    SendAll(framed.data(), framed.size());
+}
+
+std::vector<std::string> Split(const std::string& text, char separator) {
+    std::vector<std::string> fields;
+    size_t start = 0;
+    for (;;) {
+        size_t end = text.find(separator, start);
+        fields.push_back(text.substr(start, end == std::string::npos ? std::string::npos : end - start));
+        if (end == std::string::npos) return fields;
+        start = end + 1;
+    }
+}
+
+bool IsAssignment(const std::string& word) {
+    size_t equals = word.find('=');
+    if (equals == std::string::npos || equals == 0) return false;
+    for (size_t i = 0; i < equals; ++i) {
+        char c = word[i];
+        if (!(c == '_' || (c >= 'A' && c <= 'Z') || (c >= 'a' && c <= 'z') || (i > 0 && c >= '0' && c <= '9'))) return false;
+    }
+    return true;
+}
+
+void MakeDirs(const std::string& path) {
+    for (size_t slash = path.find('/', 1); slash != std::string::npos; slash = path.find('/', slash + 1)) {
+        mkdir(path.substr(0, slash).c_str(), 0755);
+    }
+    mkdir(path.c_str(), 0755);
+}
+
+// Handles "RUN <id> <xml_path> [VAR=value...] <executable> [arg...]".
+void StartRun(const std::vector<std::string>& fields, std::map<int, Run>& runs) {
+    const std::string& id = fields[1];
+    if (fields.size() < 4) {
+        SendLine("ERR\t" + id + "\tMalformed RUN request");
+        return;
+    }
+    const std::string& xml_path = fields[2];
+    size_t command_start = 3;
+    while (command_start < fields.size() && IsAssignment(fields[command_start])) ++command_start;
+    if (command_start == fields.size()) {
+        SendLine("ERR\t" + id + "\tNo executable in RUN request");
+        return;
+    }
+    const std::string& executable = fields[command_start];
+
+    // What the harness used to do with separate 'sdb shell' calls.
+    size_t slash = xml_path.rfind('/');
+    if (slash != std::string::npos && slash > 0) MakeDirs(xml_path.substr(0, slash));
+    unlink(xml_path.c_str()); // Never return a stale result file
+    struct stat executable_stat;
+    if (stat(executable.c_str(), &executable_stat) != 0) {
+        SendLine("ERR\t" + id + "\t" + executable + ": " + strerror(errno));
+        return;
+    }
+    chmod(executable.c_str(), executable_stat.st_mode | S_IXUSR | S_IXGRP | S_IXOTH);
+
+    int pipe_fds[2];
+    if (pipe(pipe_fds) != 0) {
+        SendLine("ERR\t" + id + "\tpipe: " + strerror(errno));
+        return;
+    }
+    pid_t pid = fork();
+    if (pid < 0) {
+        SendLine("ERR\t" + id + "\tfork: " + strerror(errno));
+        close(pipe_fds[0]);
+        close(pipe_fds[1]);
+        return;
+    }
+    if (pid == 0) {
+        // Own process group, so KILL also reaches processes the test spawned.
+        setpgid(0, 0);
+        signal(SIGPIPE, SIG_DFL);
+        int null_fd = open("/dev/null", O_RDONLY);
+        if (null_fd >= 0) dup2(null_fd, STDIN_FILENO);
+        dup2(pipe_fds[1], STDOUT_FILENO);
+        dup2(pipe_fds[1], STDERR_FILENO);
+        for (int fd = STDERR_FILENO + 1; fd < 1024; ++fd) close(fd);
+        for (size_t i = 3; i < command_start; ++i) putenv(const_cast<char*>(fields[i].c_str()));
+        std::vector<char*> argv;
+        for (size_t i = command_start; i < fields.size(); ++i) argv.push_back(const_cast<char*>(fields[i].c_str()));
+        argv.push_back(nullptr);
+        execv(executable.c_str(), argv.data());
+        fprintf(stderr, "vts_agent: cannot execute %s: %s\n", executable.c_str(), strerror(errno));
+        _exit(127);
+    }
+    close(pipe_fds[1]);
+    fcntl(pipe_fds[0], F_SETFD, FD_CLOEXEC);
+    runs[pipe_fds[0]] = Run{id, pid, pipe_fds[0], xml_path, ""};
+}
+
+void SendResultFile(const Run& run) {
+    int fd = open(run.xml_path.c_str(), O_RDONLY);
+    if (fd < 0) return;
+    struct stat file_stat;
+    if (fstat(fd, &file_stat) == 0) {
+        SendLine("XML\t" + run.id + "\t" + std::to_string(static_cast<long long>(file_stat.st_size)));
+        char buffer[65536];
+        off_t remaining = file_stat.st_size;
+        while (remaining > 0) {
+            ssize_t count = read(fd, buffer, sizeof(buffer) < static_cast<size_t>(remaining) ? sizeof(buffer) : static_cast<size_t>(remaining));
+            if (count <= 0) {
+                // The file shrank while being sent; pad so the host stays in sync.
+                std::memset(buffer, ' ', sizeof(buffer));
+                count = sizeof(buffer) < static_cast<size_t>(remaining) ? sizeof(buffer) : static_cast<size_t>(remaining);
+            }
+            SendAll(buffer, static_cast<size_t>(count));
+            remaining -= count;
+        }
+    }
+    close(fd);
+}
+
+// Forwards a chunk of test output; returns false once the test closed its output.
+bool ForwardOutput(Run& run) {
+    char buffer[4096];
+    ssize_t count = read(run.output_fd, buffer, sizeof(buffer));
+    if (count < 0 && errno == EINTR) return true;
+    if (count > 0) {
+        run.partial_line.append(buffer, static_cast<size_t>(count));
+        size_t newline;
+        while ((newline = run.partial_line.find('\n')) != std::string::npos) {
+            SendLine("OUT\t" + run.id + "\t" + run.partial_line.substr(0, newline));
+            run.partial_line.erase(0, newline + 1);
+        }
+        return true;
+    }
+    if (!run.partial_line.empty()) SendLine("OUT\t" + run.id + "\t" + run.partial_line);
+    return false;
+}
+
+void FinishRun(const Run& run) {
+    int status = 0;
+    while (waitpid(run.pid, &status, 0) < 0 && errno == EINTR) {
+    }
+    int code = WIFEXITED(status) ? WEXITSTATUS(status) : 128 + (WIFSIGNALED(status) ? WTERMSIG(status) : 0);
+    close(run.output_fd);
+    SendResultFile(run);
+    SendLine("EXIT\t" + run.id + "\t" + std::to_string(code));
+}
+
+void KillAll(std::map<int, Run>& runs) {
+    for (auto& entry : runs) {
+        kill(-entry.second.pid, SIGKILL);
+        close(entry.second.output_fd);
+        waitpid(entry.second.pid, nullptr, 0);
+    }
+    runs.clear();
+}
+
+// Serves one harness connection. Returns false if the harness asked the agent to quit.
+bool Serve(int fd) {
+    client_fd = fd;
+    std::map<int, Run> runs; // Output fd -> run
+    std::string request_buffer;
+    for (;;) {
+        std::vector<pollfd> poll_fds;
+        poll_fds.push_back(pollfd{client_fd, POLLIN, 0});
+        for (const auto& entry : runs) poll_fds.push_back(pollfd{entry.first, POLLIN, 0});
+        if (poll(poll_fds.data(), poll_fds.size(), -1) < 0) {
+            if (errno == EINTR) continue;
+            break;
+        }
+
+        for (size_t i = 1; i < poll_fds.size(); ++i) {
+            if (!(poll_fds[i].revents & (POLLIN | POLLHUP | POLLERR))) continue;
+            auto run = runs.find(poll_fds[i].fd);
+            if (!ForwardOutput(run->second)) {
+                FinishRun(run->second);
+                runs.erase(run);
+            }
+        }
+
+        if (!(poll_fds[0].revents & (POLLIN | POLLHUP | POLLERR))) continue;
+        char buffer[4096];
+        ssize_t count = read(client_fd, buffer, sizeof(buffer));
+        if (count < 0 && errno == EINTR) continue;
+        if (count <= 0) break; // Harness disconnected
+        request_buffer.append(buffer, static_cast<size_t>(count));
+        size_t newline;
+        while ((newline = request_buffer.find('\n')) != std::string::npos) {
+            std::vector<std::string> fields = Split(request_buffer.substr(0, newline), '\t');
+            request_buffer.erase(0, newline + 1);
+            if (fields[0] == "QUIT") {
+                KillAll(runs);
+                close(client_fd);
+                client_fd = -1;
+                return false;
+            }
+            if (fields.size() < 2) continue;
+            if (fields[0] == "RUN") {
+                StartRun(fields, runs);
+            } else if (fields[0] == "PING") {
+                SendLine("PONG\t" + fields[1]);
+            } else if (fields[0] == "KILL") {
+                for (const auto& entry : runs) {
+                    if (entry.second.id == fields[1]) kill(-entry.second.pid, SIGKILL);
+                }
+            }
+        }
+    }
+    KillAll(runs);
+    close(client_fd);
+    client_fd = -1;
+    return true;
+}
+
+} // namespace
+
+int main(int argc, char** argv) {
+    int port = kDefaultPort;
+    bool daemonize = false;
+    for (int i = 1; i < argc; ++i) {
+        if (std::strcmp(argv[i], "--port") == 0 && i + 1 < argc) {
+            port = std::atoi(argv[++i]);
+        } else if (std::strcmp(argv[i], "--daemon") == 0) {
+            daemonize = true;
+        } else {
+            fprintf(stderr, "Usage: %s [--port PORT] [--daemon]\n", argv[0]);
+            return 2;
+        }
+    }
+    signal(SIGPIPE, SIG_IGN);
+
+    int listen_fd = socket(AF_INET, SOCK_STREAM, 0);
+    int reuse = 1;
+    setsockopt(listen_fd, SOL_SOCKET, SO_REUSEADDR, &reuse, sizeof(reuse));
+    sockaddr_in address;
+    std::memset(&address, 0, sizeof(address));
+    address.sin_family = AF_INET;
+    address.sin_port = htons(static_cast<uint16_t>(port));
+    address.sin_addr.s_addr = htonl(INADDR_LOOPBACK); // Only reachable through 'sdb forward'
+    if (bind(listen_fd, reinterpret_cast<sockaddr*>(&address), sizeof(address)) != 0 || listen(listen_fd, 1) != 0) {
+        fprintf(stderr, "vts_agent: cannot listen on port %d: %s\n", port, strerror(errno));
+        return 1;
+    }
+    fcntl(listen_fd, F_SETFD, FD_CLOEXEC);
+
+    if (daemonize) {
+        // Return to 'sdb shell' only once the port is bound, so the harness can connect right away.
+        pid_t pid = fork();
+        if (pid < 0) return 1;
+        if (pid > 0) {
+            printf("vts_agent listening on port %d (pid %d)\n", port, pid);
+            return 0;
+        }
+        setsid();
+        int null_fd = open("/dev/null", O_RDWR);
+        if (null_fd >= 0) {
+            dup2(null_fd, STDIN_FILENO);
+            dup2(null_fd, STDOUT_FILENO);
+            dup2(null_fd, STDERR_FILENO);
+        }
+    }
+
+    for (;;) {
+        int fd = accept(listen_fd, nullptr, nullptr);
+        if (fd < 0) {
+            if (errno == EINTR) continue;
+            return 1;
+        }
+        fcntl(fd, F_SETFD, FD_CLOEXEC);
+        if (!Serve(fd)) break;
+    }
+    close(listen_fd);
+    return 0;
+}